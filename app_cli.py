@@ -1,6 +1,8 @@
-import time
+import asyncio
 from deps import *
 
+USE_ASYNC = False  # Run reading, parsing and file writing as tasks of one asyncio event loop instead of threads
+
 
 class ProgramCLI(Program):
     def __init__(self):
@@ -15,54 +17,81 @@ class ProgramCLI(Program):
 
         self.parser = StringParser(self.data_format['0'])
         self.writer = FileWriter(__file__, self.file_name, self.extension)
-        self.writer_thread: ThreadFileWriter | None = None
+        self.writer_thread: ThreadFileWriter | AsyncFileWriter | None = None
 
         self.port = SerialPort()
         self.port_name = ''
         self.baud = 115200
-        self.serial_reader = SerialReader(self.port)
-        self.serial_thread: ThreadSerial | None = None
+        __queue = AsyncQueue if USE_ASYNC else Queue
+        self.queue = __queue()
+        self.queue_csv = __queue()
+        self.queue_coord = __queue()
+        self.queue_raw = __queue()
 
-        self.queue = Queue()
-        self.queue_csv = Queue()
-        self.queue_coord = Queue()
+        self.serial_reader = SerialReader(self.port, capture=self.queue_raw)
+        self.serial_thread: ThreadSerial | AsyncSerial | None = None
 
-        self.data = Data(self.data_format['0'])
+        self.data = Data(ParserBase.field_names(self.data_format['0']))
 
     def start(self):
         self.__prompt_user()
-        self.port.connect(self.port_name, self.baud)
+        # The async reader reconnects the port itself
+        self.port.connect(self.port_name, self.baud, auto_reconnect=not USE_ASYNC)
+        if USE_ASYNC:
+            try:
+                asyncio.run(self.__prog_async())
+            except KeyboardInterrupt:
+                pass
+            return
+
         self.serial_thread = ThreadSerial(self.serial_reader, self.parser, self.queue)
         self.serial_thread.start()
 
-        self.writer_thread = ThreadFileWriter(self.writer, self.queue_csv, self.queue_coord)
+        self.writer_thread = ThreadFileWriter(self.writer, self.queue_csv, self.queue_coord, self.queue_raw)
         self.writer_thread.start()
 
         self.__prog()
 
     def stop(self):
-        self.serial_thread.stop()
-        self.writer_thread.stop()
+        # Async tasks are already stopped when the event loop returns
+        if not USE_ASYNC:
+            self.serial_thread.stop()
+            self.writer_thread.stop()
         self.port.disconnect()
 
     def __prog(self):
         try:
             while True:
-                if self.queue.available():
-                    dat_dict: dict = self.queue.pop()
-                    dat = list(dat_dict.values())
-                    self.data.push(dat)
-                    self.queue_csv.push(dat)
-                    self.queue_coord.push(
-                        GeoCoordinate(dat_dict[self.key_lat], dat_dict[self.key_lon], dat_dict[self.key_alt])
-                    )
-
-                    print(self.data.back())
-
-                time.sleep(0.1)
+                dat_dict: dict = self.queue.get(timeout=0.100)
+                if dat_dict is not None:
+                    self.__process(dat_dict)
         except KeyboardInterrupt:
             pass
 
+    async def __prog_async(self):
+        self.serial_thread = AsyncSerial(self.serial_reader, self.parser, self.queue)
+        self.serial_thread.start()
+
+        self.writer_thread = AsyncFileWriter(self.writer, self.queue_csv, self.queue_coord, self.queue_raw)
+        self.writer_thread.start()
+
+        try:
+            async for dat_dict in self.queue:
+                self.__process(dat_dict)
+        finally:
+            await self.serial_thread.stop()
+            await self.writer_thread.stop()
+
+    def __process(self, dat_dict: dict):
+        dat = list(dat_dict.values())
+        self.data.push(dat)
+        self.queue_csv.push(dat)
+        self.queue_coord.push(
+            GeoCoordinate.parse(dat_dict[self.key_lat], dat_dict[self.key_lon], dat_dict[self.key_alt])
+        )
+
+        print(self.data.back())
+
     def __prompt_user(self):
         while True:
             self.port.refresh()
@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import threading
 
 import time
@@ -12,6 +13,14 @@ pd.set_option("display.max_colwidth", None)
 APP_NAME = __name__
 USE_DEBUG = False
 USE_MOCK = False
+USE_REPLAY = False  # Play recorded files instead of serial ports, see REPLAY_FILES
+REPLAY_FILES = {0: 'data/data_luna_data_dev0_0.raw'}  # Device id : raw capture or saved data file
+REPLAY_SPEED = 1.0  # 1.0 is real time, N is N times faster, None is as fast as possible
+USE_REACTOR = False  # Read every serial port on one I/O thread instead of one thread per port
+USE_ASYNC = False  # Run reading, parsing, backend and file writing on one asyncio event loop thread
+PUSH_INTERVAL = 0.200  # Minimum time in s between two pushes to a browser
+PORTS_INTERVAL = 1.000  # Serial port list refresh period in s
+STATS_INTERVAL = 1.000  # Memory and latency push period in s
 ALL_BAUD_OPT = [{'label': k, 'value': k} for k in ALL_BAUD_STR]
 
 if sys.version_info < (3, 10):
@@ -39,10 +48,11 @@ class ProgramGUI(Program):
                 html.Div([
                     Content.content
                 ], className='mt-5 pt-5 pb-5'),
-                Component.interval_load,
-                Component.interval_slow,
-                Component.interval_fast,
-                Component.interval_once
+                Component.interval_once,
+                Component.push_data,
+                Component.push_serial,
+                Component.push_stats,
+                Component.chart_cursor
             ], fluid=True),
             html.Div([], id='hidden-div', style={'display': 'none'}),
             html.P('', id='data-counter', style={'display': 'none'}),
@@ -60,9 +70,9 @@ class ProgramGUI(Program):
         self.extension = self.settings['file_extension']
 
         # Home location
-        self.home_geo = GeoCoordinate(self.settings['home_position']['latitude'],
-                                      self.settings['home_position']['longitude'],
-                                      self.settings['home_position']['altitude'])
+        self.home_geo = GeoCoordinate.parse(self.settings['home_position']['latitude'],
+                                            self.settings['home_position']['longitude'],
+                                            self.settings['home_position']['altitude'])
 
         self.kml_keys = {
             dev_id: {
@@ -72,8 +82,18 @@ class ProgramGUI(Program):
             } for dev_id in self.settings['kml_keys']
         }
 
+        self.state_key = self.settings['state_key'] if 'state_key' in self.settings.tree else None
+        self.state_last = [None] * NUM_MAX_SERIAL
+
         self.to_plot: list = self.settings['plot']
         self.trim_length = self.settings['data_points']
+
+        # Chart decimation: about chart_points points per trace, whatever the window size
+        self.decimation = self.settings['decimation'] if 'decimation' in self.settings.tree else {}
+        self.chart_method = self.decimation.get('method', Chart.DECIMATE_MINMAX)
+        self.chart_points = self.decimation.get('points', 1000)
+        self.chart_buckets = self.chart_points // 2 if self.chart_method == Chart.DECIMATE_MINMAX else self.chart_points
+        self.chart_bucket = Chart.bucket_rows(self.trim_length, self.chart_points, self.chart_method)
         self.all_charts_info = []
         self.all_charts_obj = []
         self.data_ready = False
@@ -87,7 +107,8 @@ class ProgramGUI(Program):
         self.index_to_id = lambda index: self.index_id_list[index] if index < len(self.index_id_list) else -1
 
         self.data_format_mod = [
-            dev_field(dev_id, e) for dev_id, data_list in self.data_format_dict.tree.items() for e in data_list
+            dev_field(dev_id, e) for dev_id, data_list in self.data_format_dict.tree.items()
+            for e in ParserBase.field_names(data_list)
         ]
 
         self.data_options = [{'label': k, 'value': k} for k in self.data_format_mod]
@@ -121,37 +142,86 @@ class ProgramGUI(Program):
         self.serial_ports = [SerialPort() for _ in range(NUM_MAX_SERIAL)]
         self.port_names = [''] * NUM_MAX_SERIAL
         self.port_bauds = [115200] * NUM_MAX_SERIAL
-        self.serial_readers = [SerialReader(self.serial_ports[i]) for i in range(NUM_MAX_SERIAL)]
-        self.queue_serials = [Queue() for _ in range(NUM_MAX_SERIAL)]
+        # Same interface, AsyncQueue is used from the event loop only, see USE_ASYNC
+        self.queue_type = AsyncQueue if USE_ASYNC else Queue
+        self.queue_serials = [self.queue_type() for _ in range(NUM_MAX_SERIAL)]
+        self.serial_event = asyncio.Event() if USE_ASYNC else threading.Event()
+        for q_ser in self.queue_serials:
+            q_ser.subscribe(self.serial_event)
+
+        # Antenna tracker: pointing predicted between GPS fixes, sent on its own serial port
+        self.tracker_settings = self.settings['tracker'] if 'tracker' in self.settings.tree else {}
+        self.tracker_port = SerialPort()
+        self.tracker = ThreadTracker(
+            self.tracker_port, self.home_geo,
+            rate=self.tracker_settings.get('rate', 50.0),
+            alpha=self.tracker_settings.get('alpha', 0.85),
+            beta=self.tracker_settings.get('beta', 0.6),
+            max_extrapolation=self.tracker_settings.get('max_extrapolation', 2.0),
+            command=self.tracker_settings.get('command', '{az:.2f},{el:.2f}\n')
+        )
 
         # Backend: Device 0 Data Parser and File Writer Components
+        self.binary_formats = self.settings['binary'] if 'binary' in self.settings.tree else {}
         self.parsers = [
-            StringParser(
+            (BytesParser(
+                data_format=self.data_format_dict[str(i)],
+                **self.binary_formats[str(i)]
+            ) if str(i) in self.binary_formats else StringParser(
                 data_format=self.data_format_dict[str(i)],
                 delimiter=self.delimiters[str(i)],
                 header=self.headers[str(i)] if str(i) in self.headers else None
-            )
+            ))
             if str(i) in self.data_format_dict.tree else None
             for i in range(NUM_MAX_SERIAL)
         ]
+        # Raw bytes of each device are captured to the data_*.raw files for offline re-parsing
+        self.queue_raws = [self.queue_type() for _ in range(NUM_MAX_SERIAL)]
+        self.serial_readers = [self.__make_reader(i, parser) for i, parser in enumerate(self.parsers)]
+        self.replayed_rows = [isinstance(reader.port, ReplayPort) and reader.port.data_file
+                              for reader in self.serial_readers]
 
         self.writers = [FileWriter(__file__, self.file_name, self.extension, device_id=i) for i in
                         range(NUM_MAX_SERIAL)]
-        self.queue_csvs = [Queue() for _ in range(NUM_MAX_SERIAL)]
-        self.queue_coords = [Queue() for _ in range(NUM_MAX_SERIAL)]
-
-        # Serial Device 0 Thread
-        self.serial_threads = [ThreadSerial(
-            reader, parser, q_ser
+        self.queue_csvs = [self.queue_type() for _ in range(NUM_MAX_SERIAL)]
+        self.queue_coords = [self.queue_type() for _ in range(NUM_MAX_SERIAL)]
+
+        # Latency of each pipeline stage since byte arrival
+        self.stats = LatencyStats()
+        self.data_arrival = 0.0
+        self.render_seq = 0
+
+        # Server push to the browsers, see /events
+        self.publisher = Publisher(interval=PUSH_INTERVAL)
+        self.published_seq = -1
+        self.published_ports = None
+        self.stats_time = 0.0
+        self.ports_time = 0.0
+
+        # Serial Device 0 Thread, or task of the event loop
+        self.serial_threads = [(AsyncSerial if USE_ASYNC else ThreadSerial)(
+            reader, parser, q_ser, stats=self.stats
         ) for reader, parser, q_ser in zip(self.serial_readers, self.parsers, self.queue_serials)]
 
-        # File Writer Thread
-        self.writer_threads = [ThreadFileWriter(
-            writer, q_csv, q_coord
-        ) for writer, q_csv, q_coord in zip(self.writers, self.queue_csvs, self.queue_coords)]
+        # Or a single I/O thread for all serial ports, see USE_REACTOR
+        self.reactor = ThreadReactor(stats=self.stats)
+
+        # File Writer Thread, or task of the event loop
+        self.writer_threads = [(AsyncFileWriter if USE_ASYNC else ThreadFileWriter)(
+            writer, q_csv, q_coord, q_raw, stats=self.stats
+        ) for writer, q_csv, q_coord, q_raw in zip(self.writers, self.queue_csvs, self.queue_coords, self.queue_raws)]
+
+        # Event loop running every async task and the backend, see USE_ASYNC
+        self.event_loop = ThreadEventLoop()
 
         # Program DataFrame
-        self.data = Data(self.data_format_mod)
+        self.retention = self.settings['data_retention'] if 'data_retention' in self.settings.tree else {}
+        self.data = Data(
+            self.data_format_mod,
+            trim_len=self.retention.get('max_rows', self.trim_length),
+            max_age=self.retention.get('max_age'),
+            max_bytes=self.retention.get('max_bytes')
+        )
         self.data_len = tuple(len(self.data_format_dict.tree[e]) for e in self.data_format_dict.tree)
         self.data_back = [None] * len(self.data_format_mod)
         self.data_no = 0
@@ -161,6 +231,11 @@ class ProgramGUI(Program):
         self.__init_callbacks()
 
         Component.uplink_dd.options = self.uplink_dict['commands']
+        for dropdown in [Component.dropdown_plot_x, Component.dropdown_plot_y, Component.dropdown_plot_z,
+                         Component.dropdown_plot_r, Component.dropdown_plot_theta]:
+            dropdown.options = self.data_options
+        Component.dropdown_plot_xyz_type.options = Chart.LINE_TYPES
+        Component.dropdown_plot_rt_type.options = Chart.POLAR_TYPES
 
         # Backend Thread (Main program)
         self.backend_status = True
@@ -181,54 +256,54 @@ class ProgramGUI(Program):
         self.charts_geo_info = []
         self.charts_geo_obj = []
 
+        self.__publish_serial()
+
+    def __make_reader(self, i: int, parser: ParserBase) -> SerialReader:
+        __binary = {'terminator': parser.terminator, 'encoding': None} if isinstance(parser, BytesParser) else {}
+        if USE_REPLAY and i in REPLAY_FILES:
+            # Replayed bytes are not captured again
+            reader = ReplayReader(
+                REPLAY_FILES[i],
+                speed=REPLAY_SPEED,
+                prefix=self.headers[str(i)] if str(i) in self.headers else '',
+                delimiter=self.delimiters[str(i)] if str(i) in self.delimiters else ',',
+                **__binary
+            )
+            return reader
+        return SerialReader(self.serial_ports[i], capture=self.queue_raws[i], **__binary)
+
     def __init_callbacks(self):
         app = self.app
 
-        # Loading hold
-        @app.callback(
-            Output(Component.interval_fast, 'disabled'),
-            Output(Component.interval_slow, 'disabled'),
-            Input(Component.interval_load, 'n_intervals')
-        )
-        def done_loading(*_):
-            return False, False
-
         # Render Data table
         @app.callback(
             Output(Component.sidebar_dataframe, 'children'),
-            Input(Component.interval_fast, 'n_intervals')
+            Input(Component.push_data, 'data')
         )
-        def render_table(_intervals):
-            latest_data = pd.DataFrame({
-                'key': self.data_format_mod,
-                'value': self.data.back().to_list() if self.data.available() else [None] * len(self.data_format_mod)
-            })
-
-            # BEGIN USER ADD OPTIONAL DATA SECTION
-            # for i in reversed(range(len(self.data_format_dict))):
-            #     latest_data = add_front_df(latest_data, f'[{i}] Elevation', f'{self.elevation[i]}°')
-            #     latest_data = add_front_df(latest_data, f'[{i}] Azimuth', f'{self.azimuth[i]}°')
-            #     latest_data = add_front_df(latest_data, f'[{i}] Line of Sight', f'{self.los[i]} m')
-            #     latest_data = add_front_df(latest_data, f'[{i}] Ground Distance', f'{self.hcd[i]} m')
-            # END USER ADD OPTIONAL DATA SECTION
-
-            return dbc.Table.from_dataframe(
-                latest_data,
-                bordered=True, responsive=True, hover=True, striped=True
-            )
+        def render_table(_data):
+            return self.__render_table()
 
         # Render Page Content Section on URL change
         @app.callback(
             Output(Content.content, 'children'),
+            Output(Component.chart_cursor, 'data', allow_duplicate=True),
             Input('url', 'pathname'),
         )
         def render_content(url):
+            # Pages are served with the current state, later changes are pushed
+            self.__sync_serial_components()
             if url == '/':
-                return Content.plot
+                # Serve the current charts, they stream from the sequence number their figures were built at
+                Component.plot_col1.children, Component.plot_col2.children, Component.plot_col3.children = \
+                    Content.unflatten(self.all_charts_obj + self.charts_geo_obj)
+                Component.sidebar_dataframe.children = self.__render_table()
+                return Content.plot, {}
             elif url == '/settings':
-                return Content.settings
+                Component.memory_usage.children = self.__render_memory_usage()
+                Component.latency_stats.children = self.__render_latency_stats()
+                return Content.settings, no_update
 
-            return Content.page_404(url)
+            return Content.page_404(url), no_update
 
         # Uplink on submit
         @app.callback(
@@ -246,13 +321,10 @@ class ProgramGUI(Program):
                 *(Output(dropdown_port, 'options') for dropdown_port in Component.dropdown_ports),
                 *(Output(dropdown_baud, 'options') for dropdown_baud in Component.dropdown_bauds)
             ],
-            Input(Component.interval_fast, 'n_intervals')
+            Input(Component.push_serial, 'data')
         )
-        def render_serial_options(_interval):
-            self.serial_ports[0].refresh()
-            all_ports = self.serial_ports[0].port_pair.keys()
-            new_opt = [{'label': k, 'value': k} for k in all_ports]
-            return [*([new_opt] * NUM_MAX_SERIAL), *([ALL_BAUD_OPT] * NUM_MAX_SERIAL)]
+        def render_serial_options(_serial):
+            return self.__render_serial_options()
 
         # Lock serial elements on connection and disconnection
         @app.callback(
@@ -263,7 +335,7 @@ class ProgramGUI(Program):
                 *(Output(dropdown_baud, 'disabled') for dropdown_baud in Component.dropdown_bauds),
             ],
             [
-                Input(Component.interval_fast, 'n_intervals'),
+                Input(Component.push_serial, 'data'),
                 *(Input(btn_connect, 'n_clicks') for btn_connect in Component.btn_connects),
                 *(Input(btn_disconnect, 'n_clicks') for btn_disconnect in Component.btn_disconnects),
             ],
@@ -295,61 +367,21 @@ class ProgramGUI(Program):
                     self.__stop(i)
                     self.__disconnect_serial(i)
 
-            ret_val1 = []
-            ret_val2 = []
-            ret_val3 = []
-            ret_val4 = []
-
-            for i in range(NUM_MAX_SERIAL):
-                if self.serial_connections[i]:
-                    ret_val1.append('mx-1 btn-primary disabled')
-                    ret_val2.append('mx-1 btn-danger')
-                    ret_val3.append(True)
-                    ret_val4.append(True)
-                elif i >= len(self.data_format_dict):
-                    ret_val1.append('mx-1 btn-primary disabled')
-                    ret_val2.append('mx-1 btn-danger disabled')
-                    ret_val3.append(True)
-                    ret_val4.append(True)
-                else:
-                    ret_val1.append('mx-1 btn-primary')
-                    ret_val2.append('mx-1 btn-danger disabled')
-                    ret_val3.append(False)
-                    ret_val4.append(False)
-
-            return [*ret_val1, *ret_val2, *ret_val3, *ret_val4]
-
-        # Refresh Data View Dropdown
-        @app.callback(
-            [
-                Output(Component.dropdown_plot_x, 'options'),
-                Output(Component.dropdown_plot_y, 'options'),
-                Output(Component.dropdown_plot_z, 'options'),
-                Output(Component.dropdown_plot_r, 'options'),
-                Output(Component.dropdown_plot_theta, 'options'),
-                Output(Component.dropdown_plot_xyz_type, 'options'),
-                Output(Component.dropdown_plot_rt_type, 'options'),
-            ],
-            [
-                Input(Component.interval_slow, 'n_intervals'),
-            ]
-        )
-        def render_data_view_options(_interval):
-            return self.data_options, self.data_options, self.data_options, self.data_options, self.data_options, \
-                Chart.LINE_TYPES, Chart.POLAR_TYPES
+            return self.__render_serial_state()
 
-        # Render charts
+        # Render charts, only when the chart layout changes. New points are streamed by stream_charts.
         @app.callback(
             [
                 Output(Component.plot_col1, 'children'),
                 Output(Component.plot_col2, 'children'),
                 Output(Component.plot_col3, 'children'),
+                Output(Component.chart_cursor, 'data', allow_duplicate=True),
             ],
             [
                 Input(Component.interval_once, 'n_intervals'),
-                Input(Component.interval_slow, 'n_intervals'),
                 Input(Component.btn_add_chart_xyz, 'n_clicks'),
                 Input(Component.btn_add_chart_polar, 'n_clicks'),
+                Input(Component.btn_pop_chart, 'n_clicks'),
             ],
             [
                 State(Component.dropdown_plot_x, 'value'),
@@ -361,14 +393,14 @@ class ProgramGUI(Program):
                 State(Component.dropdown_plot_rt_type, 'value'),
             ]
         )
-        def render_chart(_intervals_1, _intervals_2, _clicks_xyz, _clicks_polar,
+        def render_chart(_intervals, _clicks_xyz, _clicks_polar, _clicks_pop,
                          x_val, y_vals, z_val, r_val, theta_val, line_type, polar_type):
             event = ctx.triggered_id
 
             event_first_load = (event == Component.interval_once.id and self.first_load)
             event_click_xyz = (event == Component.btn_add_chart_xyz.id and x_val and y_vals and line_type)
             event_click_polar = (event == Component.btn_add_chart_polar.id and r_val and theta_val and polar_type)
-            event_polling = (event == Component.interval_slow.id and not self.first_load)
+            event_clear = (event == Component.btn_pop_chart.id)
 
             # First Load
             if event_first_load:
@@ -376,38 +408,20 @@ class ProgramGUI(Program):
                 for plot_item in self.to_plot:
                     plot_type = plot_item['plot_type']
                     if plot_type == Chart.PLOT_XYZ:
-                        __z_key = plot_item['z'] if 'z' in plot_item else None
-                        __new_chart = Component.make_plot_area(
-                            data=self.data.df.tail(self.trim_length),
-                            x_key=plot_item['x'],
-                            y_keys=plot_item['y'],
-                            z_key=__z_key,
-                            line_style=plot_item['style'],
-                            plot_type=plot_type
-                        )
-                        self.all_charts_info.append(Chart.dict_info(
+                        self.__add_chart(Chart.dict_info(
                             x=plot_item['x'],
                             y=plot_item['y'],
-                            z=__z_key,
+                            z=plot_item['z'] if 'z' in plot_item else None,
                             style=plot_item['style'],
                             plot_type=plot_item['plot_type']
                         ))
-                        self.all_charts_obj.append(__new_chart)
                     elif plot_type == Chart.PLOT_POLAR:
-                        __new_chart = Component.make_plot_area(
-                            data=self.data.df.tail(self.trim_length),
-                            r_key=plot_item['r'],
-                            theta_key=plot_item['theta'],
-                            line_style=plot_item['style'],
-                            plot_type=plot_type
-                        )
-                        self.all_charts_info.append(Chart.dict_info(
+                        self.__add_chart(Chart.dict_info(
                             r=plot_item['r'],
                             theta=plot_item['theta'],
                             style=plot_item['style'],
                             plot_type=plot_item['plot_type']
                         ))
-                        self.all_charts_obj.append(__new_chart)
                     elif plot_type == Chart.PLOT_MESH:
                         pass
                         # __new_chart = Chart.make_mesh_render()
@@ -435,97 +449,310 @@ class ProgramGUI(Program):
 
             # When Click Add XYZ Chart
             elif event_click_xyz:
-                __new_chart = Component.make_plot_area(
-                    data=self.data.df.tail(self.trim_length),
-                    x_key=x_val,
-                    y_keys=y_vals,
-                    z_key=z_val,
-                    line_style=line_type,
-                    plot_type=Chart.PLOT_XYZ
-                )
-                self.all_charts_info.append(Chart.dict_info(
+                self.__add_chart(Chart.dict_info(
                     x=x_val,
                     y=y_vals,
                     z=z_val,
                     style=line_type,
                     plot_type=Chart.PLOT_XYZ
                 ))
-                self.all_charts_obj.append(__new_chart)
 
             # When Click Add Polar Chart
             elif event_click_polar:
-                self.all_charts_info.append(Chart.dict_info(
+                self.__add_chart(Chart.dict_info(
                     r=r_val,
                     theta=theta_val,
                     style=polar_type,
                     plot_type=Chart.PLOT_POLAR
                 ))
-                __new_chart = Component.make_plot_area(
-                    data=self.data.df.tail(self.trim_length),
-                    r_key=r_val,
-                    theta_key=theta_val,
-                    line_style=polar_type,
-                    plot_type=Chart.PLOT_POLAR
+
+            # Clear the data and start the charts over, in this callback so nothing is rebuilt from stale rows
+            elif event_clear:
+                self.data.clear()
+                for i in range(len(self.all_charts_info)):
+                    self.__build_chart(i)
+
+            # Every chart streams from the sequence number its figure was built at
+            return *Content.unflatten(self.all_charts_obj + self.charts_geo_obj), {}
+
+        # Stream new points to the charts, and redraw a chart in detail when it is zoomed
+        @app.callback(
+            Output({'type': Chart.GRAPH_TYPE, 'index': ALL}, 'extendData'),
+            Output({'type': Chart.GRAPH_TYPE, 'index': ALL}, 'figure'),
+            Output(Component.chart_cursor, 'data'),
+            Input(Component.push_data, 'data'),
+            Input({'type': Chart.GRAPH_TYPE, 'index': ALL}, 'relayoutData'),
+            State({'type': Chart.GRAPH_TYPE, 'index': ALL}, 'id'),
+            State(Component.chart_cursor, 'data')
+        )
+        def stream_charts(_data, relayouts, chart_ids, cursors):
+            event = ctx.triggered_id
+            cursors = dict(cursors or {})
+            extend_data = [no_update] * len(chart_ids)
+            figures = [no_update] * len(chart_ids)
+
+            for j, (chart_id, relayout) in enumerate(zip(chart_ids, relayouts)):
+                __index = chart_id['index']
+                __chart = self.all_charts_info[__index]
+
+                # Zoomed in or reset: redraw the chart for the new x range
+                if event == chart_id:
+                    __x_range = Chart.x_range(relayout)
+                    if __x_range is not None or 'xaxis.autorange' in (relayout or {}):
+                        figures[j], cursors[str(__index)] = self.__chart_figure(__index, __x_range)
+                    continue
+
+                # Zoomed charts are left as they are until reset
+                if event != Component.push_data.id or Chart.x_range(relayout) is not None:
+                    continue
+
+                __cursor = cursors.get(str(__index), __chart['seq'])
+                __rows, __seq = self.data.tail_since(
+                    __cursor, columns=Chart.data_keys(**__chart), max_rows=self.trim_length
                 )
-                self.all_charts_obj.append(__new_chart)
-
-            # Data Polling/Updating
-            elif event_polling and self.data_ready:
-                for i, __chart in enumerate(self.all_charts_info):
-                    if __chart['plot_type'] in [Chart.PLOT_XYZ, Chart.PLOT_POLAR]:
-                        # then plot
-                        plot_data = self.data.df.tail(self.trim_length)
-                        try:
-                            self.all_charts_obj[i] = Component.make_plot_area(
-                                data=plot_data,
-                                x_key=__chart['x'],
-                                y_keys=__chart['y'],
-                                z_key=__chart['z'],
-                                r_key=__chart['r'],
-                                theta_key=__chart['theta'],
-                                line_style=__chart['style'],
-                                plot_type=__chart['plot_type']
-                            )
-                        except ValueError:
-                            pass
-                            # print(plot_data.dtypes)
-                            # for yk in __chart['y']:
-                            #     print(plot_data[yk])
-
-                    elif __chart['plot_type'] == Chart.PLOT_MESH:
-                        pass
-                        # self.all_plots[i] = Chart.make_mesh_render()
-
-                # BEGIN USER ADD OPTIONAL PLOT SECTION (Chart)
-                # for i, __chart in enumerate(self.charts_geo_info):
-                #     plot_data = self.data_geo.df
-                #     try:
-                #         self.charts_geo_obj[i] = Component.make_plot_area(
-                #             data=plot_data,
-                #             x_key=__chart['x'],
-                #             y_keys=__chart['y'],
-                #             z_key=__chart['z'],
-                #             r_key=__chart['r'],
-                #             theta_key=__chart['theta'],
-                #             line_style=__chart['style'],
-                #             plot_type=__chart['plot_type']
-                #         )
-                #     except ValueError:
-                #         print(plot_data.dtypes)
-                #         for yk in __chart['y']:
-                #             print(plot_data[yk])
-                # END USER ADD OPTIONAL PLOT SECTION (Chart)
-
-            return Content.unflatten(self.all_charts_obj + self.charts_geo_obj)
 
+                # Only complete buckets are sent, the rest waits for the next update
+                __buckets = len(__rows) // self.chart_bucket
+                if __buckets == 0:
+                    continue
+                __leftover = len(__rows) - __buckets * self.chart_bucket
+                cursors[str(__index)] = __seq - __leftover
+                __rows = Chart.decimate(
+                    __rows.iloc[:len(__rows) - __leftover], __buckets, self.chart_method, **__chart
+                )
+                extend_data[j] = Chart.make_extend_data(__rows, max_points=self.__chart_max_points(__index), **__chart)
+
+            # Age of the newest rendered row since its bytes arrived
+            if self.data.seq != self.render_seq and any(e is not no_update for e in extend_data):
+                self.render_seq = self.data.seq
+                self.stats.record('render', time.monotonic() - self.data_arrival)
+
+            return extend_data, figures, cursors
+
+        # Render live data store memory usage
+        @app.callback(
+            Output(Component.memory_usage, 'children'),
+            Input(Component.push_stats, 'data')
+        )
+        def render_memory_usage(_stats):
+            return self.__render_memory_usage()
+
+        # Render pipeline latency table
         @app.callback(
-            Output('hidden-div', 'children'),
-            Input(Component.btn_pop_chart, 'n_clicks')
+            Output(Component.latency_stats, 'children'),
+            Input(Component.push_stats, 'data')
+        )
+        def render_latency_stats(_stats):
+            return self.__render_latency_stats()
+
+        # Server push to the browsers, see assets/push.js
+        @app.server.route('/events')
+        def events_endpoint():
+            return Response(self.publisher.stream(), mimetype='text/event-stream', headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            })
+
+        # Pipeline latency and backlog as JSON
+        @app.server.route('/stats')
+        def stats_endpoint():
+            return jsonify({
+                'latency_ms': self.stats.summary(),
+                'serial': {i: self.serial_threads[i].backlog for i in range(NUM_MAX_SERIAL) if self.serial_connections[i]},
+                'file': {i: self.writer_threads[i].lag for i in range(NUM_MAX_SERIAL) if self.serial_connections[i]},
+                'data': {'rows': len(self.data), 'bytes': self.data.memory_usage()},
+                'push': {'subscribers': self.publisher.subscribers},
+                'tracker': self.tracker.pointing if self.tracker.status else {},
+                'reactor': self.reactor.throughput if self.reactor.status else {}
+            })
+
+    def __render_table(self):
+        latest_data = pd.DataFrame({
+            'key': self.data_format_mod,
+            'value': self.data.back().to_list() if self.data.available() else [None] * len(self.data_format_mod)
+        })
+
+        # BEGIN USER ADD OPTIONAL DATA SECTION
+        # for i in reversed(range(len(self.data_format_dict))):
+        #     latest_data = add_front_df(latest_data, f'[{i}] Elevation', f'{self.elevation[i]}°')
+        #     latest_data = add_front_df(latest_data, f'[{i}] Azimuth', f'{self.azimuth[i]}°')
+        #     latest_data = add_front_df(latest_data, f'[{i}] Line of Sight', f'{self.los[i]} m')
+        #     latest_data = add_front_df(latest_data, f'[{i}] Ground Distance', f'{self.hcd[i]} m')
+        # END USER ADD OPTIONAL DATA SECTION
+
+        return dbc.Table.from_dataframe(
+            latest_data,
+            bordered=True, responsive=True, hover=True, striped=True
+        )
+
+    def __render_serial_options(self) -> list:
+        all_ports = self.serial_ports[0].port_pair.keys()
+        new_opt = [{'label': k, 'value': k} for k in all_ports]
+        return [*([new_opt] * NUM_MAX_SERIAL), *([ALL_BAUD_OPT] * NUM_MAX_SERIAL)]
+
+    def __render_serial_state(self) -> list:
+        ret_val1 = []
+        ret_val2 = []
+        ret_val3 = []
+        ret_val4 = []
+
+        for i in range(NUM_MAX_SERIAL):
+            if self.serial_connections[i]:
+                ret_val1.append('mx-1 btn-primary disabled')
+                ret_val2.append('mx-1 btn-danger')
+                ret_val3.append(True)
+                ret_val4.append(True)
+            elif i >= len(self.data_format_dict):
+                ret_val1.append('mx-1 btn-primary disabled')
+                ret_val2.append('mx-1 btn-danger disabled')
+                ret_val3.append(True)
+                ret_val4.append(True)
+            else:
+                ret_val1.append('mx-1 btn-primary')
+                ret_val2.append('mx-1 btn-danger disabled')
+                ret_val3.append(False)
+                ret_val4.append(False)
+
+        return [*ret_val1, *ret_val2, *ret_val3, *ret_val4]
+
+    def __render_memory_usage(self):
+        return 'Live data: {} rows, {:.2f} MiB (history is kept in the data files)'.format(
+            len(self.data), self.data.memory_usage() / 2 ** 20
+        )
+
+    def __render_latency_stats(self):
+        summary = self.stats.summary()
+        if not summary:
+            return 'No data yet'
+        latency = pd.DataFrame.from_dict(summary, orient='index').round(3)
+        latency.insert(0, 'stage (ms)', latency.index)
+        return dbc.Table.from_dataframe(
+            latency,
+            bordered=True, responsive=True, hover=True, striped=True
+        )
+
+    def __sync_serial_components(self):
+        """
+        Set the serial options and state on the components, so that served pages are up to date
+
+        :return:
+        """
+        __options = self.__render_serial_options()
+        __state = self.__render_serial_state()
+        for i in range(NUM_MAX_SERIAL):
+            Component.dropdown_ports[i].options = __options[i]
+            Component.dropdown_bauds[i].options = __options[NUM_MAX_SERIAL + i]
+            Component.btn_connects[i].className = __state[i]
+            Component.btn_disconnects[i].className = __state[NUM_MAX_SERIAL + i]
+            Component.dropdown_ports[i].disabled = __state[2 * NUM_MAX_SERIAL + i]
+            Component.dropdown_bauds[i].disabled = __state[3 * NUM_MAX_SERIAL + i]
+
+    def __publish_serial(self):
+        self.published_ports = list(self.serial_ports[0].port_pair.keys())
+        self.publisher.publish('serial', {
+            'connected': list(self.serial_connections),
+            'ports': self.published_ports
+        })
+
+    def __publish_state(self):
+        """
+        Push what changed to the browsers: new data at once, port list and statistics periodically
+
+        :return:
+        """
+        __now = time.monotonic()
+        if __now - self.ports_time >= PORTS_INTERVAL:
+            self.ports_time = __now
+            self.serial_ports[0].refresh()
+            if list(self.serial_ports[0].port_pair.keys()) != self.published_ports:
+                self.__publish_serial()
+
+        __seq = self.data.seq
+        if __seq == self.published_seq:
+            return
+        self.published_seq = __seq
+        self.publisher.publish('data', {'seq': __seq})
+        if __now - self.stats_time >= STATS_INTERVAL:
+            self.stats_time = __now
+            self.publisher.publish('stats', {'seq': __seq, 'rows': len(self.data)})
+
+    def __add_chart(self, info: dict):
+        self.all_charts_info.append(info)
+        self.all_charts_obj.append(None)
+        self.__build_chart(len(self.all_charts_info) - 1)
+
+    def __build_chart(self, i: int):
+        """
+        Build the chart area from the latest data and remember the sequence number it was built at
+
+        :param i: Chart index
+        :return:
+        """
+        __chart = self.all_charts_info[i]
+        plot_data, __chart['seq'] = self.__chart_data(i)
+        try:
+            self.all_charts_obj[i] = Component.make_plot_area(
+                data=plot_data,
+                x_key=__chart['x'],
+                y_keys=__chart['y'],
+                z_key=__chart['z'],
+                r_key=__chart['r'],
+                theta_key=__chart['theta'],
+                line_style=__chart['style'],
+                plot_type=__chart['plot_type'],
+                index=i
+            )
+        except ValueError:
+            pass
+
+    def __chart_figure(self, i: int, x_range: tuple = None):
+        """
+        Build only the figure of a chart, optionally zoomed in on an x range
+
+        :param i: Chart index
+        :param x_range: (min, max) of the x axis, default is the whole window
+        :return: Figure and the sequence number it was built at
+        """
+        __chart = self.all_charts_info[i]
+        plot_data, __seq = self.__chart_data(i, x_range)
+        __graph = Component.make_new_chart(
+            plot_data, __chart['x'], __chart['y'], __chart['z'], __chart['r'], __chart['theta'],
+            __chart['style'], __chart['plot_type']
         )
-        def pop_data(_clicks):
-            while self.data.available():
-                self.data.pop()
-            return []
+        if x_range is not None:
+            return Chart.zoom(__graph.figure, x_range), __seq
+        return __graph.figure, __seq
+
+    def __chart_max_points(self, i: int) -> int:
+        # Rows kept for any series are kept for all of them, see Chart.decimate
+        if self.chart_bucket == 1:
+            return self.trim_length
+        return self.chart_points * (len(Chart.data_keys(**self.all_charts_info[i])) - 1)
+
+    def __chart_data(self, i: int, x_range: tuple = None) -> tuple[pd.DataFrame, int]:
+        """
+        Decimated rows of a chart, so that each trace has about chart_points points
+
+        :param i: Chart index
+        :param x_range: (min, max) of the x axis, default is the whole window
+        :return: Rows and the sequence number of the last row included
+        """
+        __chart = self.all_charts_info[i]
+        plot_data, __seq = self.data.tail_since(0, max_rows=self.trim_length)
+        if x_range is not None:
+            try:
+                __x = pd.to_numeric(plot_data[__chart['x']], errors='coerce')
+                plot_data = plot_data[(__x >= float(x_range[0])) & (__x <= float(x_range[1]))]
+            except (TypeError, ValueError):
+                pass
+            return Chart.decimate(plot_data, self.chart_buckets, self.chart_method, **__chart), __seq
+
+        # Whole buckets only, newer rows are streamed once their bucket is complete
+        __leftover = len(plot_data) % self.chart_bucket
+        plot_data = plot_data.iloc[:len(plot_data) - __leftover]
+        return Chart.decimate(
+            plot_data, len(plot_data) // self.chart_bucket, self.chart_method, **__chart
+        ), __seq - __leftover
 
     def __start(self, i):
         """
@@ -536,27 +763,46 @@ class ProgramGUI(Program):
         if not self.serial_connections[i]:
             return
 
-        self.serial_threads[i].start()
+        if USE_ASYNC:
+            self.event_loop.call(self.serial_threads[i].start)
+            self.event_loop.call(self.writer_threads[i].start)
+            return
+        if USE_REACTOR:
+            self.reactor.attach(i, self.serial_readers[i], self.parsers[i], self.queue_serials[i])
+        else:
+            self.serial_threads[i].start()
         self.writer_threads[i].start()
 
     def __stop(self, i):
-        self.serial_threads[i].stop()
+        if USE_ASYNC:
+            if self.event_loop.status:
+                self.event_loop.run(self.serial_threads[i].stop())
+                self.event_loop.run(self.writer_threads[i].stop())
+            return
+        if USE_REACTOR:
+            self.reactor.detach(i)
+        else:
+            self.serial_threads[i].stop()
         self.writer_threads[i].stop()
 
     def __connect_serial(self, i):
-        self.serial_connections[i] = self.serial_ports[i].connect(
+        # The reactor and the async readers reconnect their ports themselves
+        # serial_ports stay the hardware ports listed in the UI, the reader may play a file instead
+        self.serial_connections[i] = self.serial_readers[i].port.connect(
             self.port_names[i], self.port_bauds[i],
-            auto_reconnect=True
+            auto_reconnect=not (USE_REACTOR or USE_ASYNC)
         )
         if self.serial_connections[i]:
             self.serial_connected_lut.add(self.port_names[i])
+        self.__publish_serial()
         return self.serial_connections[i]
 
     def __disconnect_serial(self, i):
-        self.serial_ports[i].disconnect()
+        self.serial_readers[i].port.disconnect()
         if self.port_names[i] in self.serial_connected_lut:
             self.serial_connected_lut.remove(self.port_names[i])
         self.serial_connections[i] = False
+        self.__publish_serial()
 
     def __backend_mock(self):
         i = 0
@@ -567,6 +813,7 @@ class ProgramGUI(Program):
             ]
             dat[2] = dat[2] % 360
             self.data.push(dat)
+            self.__publish_state()
             i += 1
             time.sleep(0.100)
 
@@ -576,94 +823,134 @@ class ProgramGUI(Program):
             self.__backend_mock()
 
         while self.backend_status:
-            for i, did in enumerate(self.data_format_dict.tree):
-                if self.queue_serials[i].available():
-                    # <--- General data --->
-                    dat_dict: dict = self.queue_serials[i].pop()
+            self.__publish_state()
 
-                    # BEGIN USER DATA MODIFICATION
-                    if i == 1 and dat_dict['Altitude (m)'] is not None:
-                        try:
-                            dat_dict['Altitude (m)'] = dat_dict['Altitude (m)'] * 0.3048
-                        except Exception:
-                            pass
-                    # END USER DATA MODIFICATION
+            # Sleep until any serial queue receives data
+            if not self.serial_event.wait(0.100):
+                continue
+            self.serial_event.clear()
+            self.__process_serials()
 
-                    dat = list(dat_dict.values())
+    async def __backend_async(self):
+        """
+        Same as the backend thread, as a task of the event loop next to the serial and file writer tasks
 
+        :return:
+        """
+        if USE_MOCK:
+            await asyncio.to_thread(self.__backend_mock)
+
+        while self.backend_status:
+            self.__publish_state()
+
+            # Wait until any serial queue receives data
+            try:
+                await asyncio.wait_for(self.serial_event.wait(), 0.100)
+            except asyncio.TimeoutError:
+                continue
+            self.serial_event.clear()
+            self.__process_serials()
+
+    def __process_serials(self):
+        backend_latency = []
+        for i, did in enumerate(self.data_format_dict.tree):
+            for dat_dict, arrival in zip(*self.queue_serials[i].get_many_stamped()):
+                # <--- General data --->
+
+                # BEGIN USER DATA MODIFICATION
+                # Rows replayed from a saved data file are already modified
+                if i == 1 and not self.replayed_rows[i] and dat_dict['Altitude (m)'] is not None:
+                    try:
+                        dat_dict['Altitude (m)'] = dat_dict['Altitude (m)'] * 0.3048
+                    except Exception:
+                        pass
+                # END USER DATA MODIFICATION
+
+                dat = list(dat_dict.values())
+
+                if i == 0:
+                    start_idx = 0
+                else:
+                    start_idx = self.data_len[i - 1]
+
+                valid_count = 0
+                for j, x in enumerate(dat, start_idx):
+                    if x is not None:
+                        self.data_back[j] = x
+                        valid_count += 1
+
+                if valid_count > 0:
+                    self.data.push(self.data_back)
+                    self.data_arrival = arrival
+                    print(f'Update from {i} -> {self.data_back}')
+
+                # <--- Begin coordinate data --->
+                if did in self.kml_keys:
+                    curr_coord = GeoCoordinate.parse(
+                        dat_dict[self.kml_keys[did]['lat']],
+                        dat_dict[self.kml_keys[did]['lon']],
+                        dat_dict[self.kml_keys[did]['alt']]
+                    )
+                    self.queue_coords[i].push(curr_coord)
+                    if did == self.tracker_settings.get('device') and curr_coord.valid():
+                        self.tracker.update(arrival, curr_coord)
+
+                    coord_pair = GeoPair(self.home_geo, curr_coord)
+                    self.los[i] = coord_pair.line_of_sight
+                    self.hcd[i] = coord_pair.ground_distance
+                    self.azimuth[i] = coord_pair.azimuth
+                    self.elevation[i] = coord_pair.elevation_approx
+
+                    # USER
                     if i == 0:
-                        start_idx = 0
+                        while self.data_geo.available():
+                            self.data_geo.pop()
+                        self.data_geo.push([5,
+                                            self.azimuth[0],
+                                            self.elevation[0],
+                                            self.los[0],
+                                            self.hcd[0]])
+                # <--- End coordinate data --->
+
+                self.queue_csvs[i].push(dat, stamp=arrival)
+                self.data_no += 1
+                backend_latency.append(time.monotonic() - arrival)
+
+                # Force data files to disk on state changes
+                if self.state_key in dat_dict and dat_dict[self.state_key] is not None:
+                    if self.state_last[i] is not None and dat_dict[self.state_key] != self.state_last[i]:
+                        self.writer_threads[i].request_sync()
+                    self.state_last[i] = dat_dict[self.state_key]
+
+        self.stats.record_many('backend', backend_latency)
+        self.data_ready = False
+
+        for i, __chart in enumerate(self.all_charts_info):
+            if __chart['plot_type'] in [Chart.PLOT_XYZ, Chart.PLOT_POLAR]:
+                # check for data validity before plot
+                while self.data.available():
+                    check_bool = True
+                    data_back = self.data.back()
+
+                    if __chart['x'] is not None:
+                        check_bool &= not isinstance(data_back[__chart['x']], str)
+                    if __chart['y'] is not None:
+                        for y_key in __chart['y']:
+                            check_bool &= not isinstance(data_back[y_key], str)
+                    if __chart['z'] is not None:
+                        check_bool &= not isinstance(data_back[__chart['z']], str)
+                    if __chart['r'] is not None:
+                        check_bool &= not isinstance(data_back[__chart['r']], str)
+                    if __chart['theta'] is not None:
+                        check_bool &= not isinstance(data_back[__chart['theta']], str)
+
+                    if check_bool:
+                        break
                     else:
-                        start_idx = self.data_len[i - 1]
-
-                    valid_count = 0
-                    for j, x in enumerate(dat, start_idx):
-                        if x is not None:
-                            self.data_back[j] = x
-                            valid_count += 1
-
-                    if valid_count > 0:
-                        self.data.push(self.data_back)
-                        print(f'Update from {i} -> {self.data_back}')
-
-                    # <--- Begin coordinate data --->
-                    if did in self.kml_keys:
-                        curr_coord = GeoCoordinate(
-                            dat_dict[self.kml_keys[did]['lat']],
-                            dat_dict[self.kml_keys[did]['lon']],
-                            dat_dict[self.kml_keys[did]['alt']]
-                        )
-                        self.queue_coords[i].push(curr_coord)
-
-                        coord_pair = GeoPair(self.home_geo, curr_coord)
-                        self.los[i] = coord_pair.line_of_sight
-                        self.hcd[i] = coord_pair.ground_distance
-                        self.azimuth[i] = coord_pair.azimuth
-                        self.elevation[i] = coord_pair.elevation_approx
-
-                        # USER
-                        if i == 0:
-                            while self.data_geo.available():
-                                self.data_geo.pop()
-                            self.data_geo.push([5,
-                                                self.azimuth[0],
-                                                self.elevation[0],
-                                                self.los[0],
-                                                self.hcd[0]])
-                    # <--- End coordinate data --->
-
-                    self.queue_csvs[i].push(dat)
-                    self.data_no += 1
-
-            self.data_ready = False
-
-            for i, __chart in enumerate(self.all_charts_info):
-                if __chart['plot_type'] in [Chart.PLOT_XYZ, Chart.PLOT_POLAR]:
-                    # check for data validity before plot
-                    while self.data.available():
-                        check_bool = True
-
-                        if __chart['x'] is not None:
-                            check_bool &= not isinstance(self.data.back()[__chart['x']], str)
-                        if __chart['y'] is not None:
-                            for y_key in __chart['y']:
-                                check_bool &= not isinstance(self.data.back()[y_key], str)
-                        if __chart['z'] is not None:
-                            check_bool &= not isinstance(self.data.back()[__chart['z']], str)
-                        if __chart['r'] is not None:
-                            check_bool &= not isinstance(self.data.back()[__chart['r']], str)
-                        if __chart['theta'] is not None:
-                            check_bool &= not isinstance(self.data.back()[__chart['theta']], str)
-
-                        if check_bool:
-                            break
-                        else:
-                            if self.data.available():
-                                self.data.pop()
-
-            self.data_ready = True
-
-            time.sleep(0.010)
+                        if self.data.available():
+                            self.data.pop()
+
+        self.data_ready = True
 
     def start(self):
         """
@@ -674,18 +961,45 @@ class ProgramGUI(Program):
         import logging
         logging.getLogger('werkzeug').setLevel(logging.ERROR)
 
-        self.backend_thread.start()
+        if USE_ASYNC:
+            self.event_loop.start()
+            self.event_loop.submit(self.__backend_async())
+        else:
+            self.backend_thread.start()
+        if USE_REACTOR and not USE_ASYNC:
+            self.reactor.start()
+        if USE_REPLAY:
+            for i in REPLAY_FILES:
+                self.port_names[i] = REPLAY_FILES[i]
+                self.__connect_serial(i)
+                self.__start(i)
+        if self.tracker_settings.get('enabled', False):
+            self.tracker_port.connect(
+                self.tracker_settings['port'], self.tracker_settings.get('baud', 9600),
+                auto_reconnect=True, override=True
+            )
+            self.tracker.start()
         self.app.run(host='localhost',
                      port=8080,
                      debug=USE_DEBUG)
 
     def stop(self):
+        self.publisher.close()
+        if self.tracker.status:
+            self.tracker.stop()
+            self.tracker_port.disconnect(destructor=True)
         for i in range(NUM_MAX_SERIAL):
             self.__stop(i)
-            self.serial_ports[i].disconnect(destructor=True)
+            self.serial_readers[i].port.disconnect(destructor=True)
+        if self.reactor.status:
+            self.reactor.stop()
 
         self.backend_status = False
-        self.backend_thread.join(timeout=2.000)
+        if USE_ASYNC:
+            # Cancels the backend task if still running
+            self.event_loop.stop()
+        else:
+            self.backend_thread.join(timeout=2.000)
         self.backend_thread = None
 
 
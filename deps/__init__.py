@@ -10,18 +10,36 @@ from .base.__Parser import ParserBase
 from .myparser import StringParser
 from .myparser import BytesParser
 
-from .mygis import GeoCoordinate, GeoPair
+from .mygis import GeoCoordinate, GeoPair, GeoPairArray
 from .mylogger import Logger
 
 from .myfile import FileUtil
 from .myfile import FileWriter
+from .myfile import CaptureFile
 
 from .myserial import SerialPort
 from .myserial import SerialReader
 from .myserial import ALL_BAUD, ALL_BAUD_STR
 
+from .myreplay import ReplayPort
+from .myreplay import ReplayReader
+
 from .mythread import ThreadSerial
 from .mythread import ThreadFileWriter
+from .mythread import ThreadReactor
+
+from .myasync import AsyncQueue
+from .myasync import AsyncSerialReader
+from .myasync import AsyncSerial
+from .myasync import AsyncFileWriter
+from .myasync import ThreadEventLoop
+
+from .mytracker import AlphaBetaFilter
+from .mytracker import ThreadTracker
 
 from .mydata import Queue
 from .mydata import Data
+
+from .mystats import LatencyStats
+
+from .mypush import Publisher
@@ -0,0 +1,62 @@
+import asyncio
+from .__Logger import LoggerBase
+
+
+class AsyncBase:
+    def __init__(self, timeout: float = 1.000):
+        """
+        Same life cycle as ThreadBase, as an asyncio task instead of a thread.
+        start is called from the event loop, stop is awaited on it.
+
+        :param timeout: Task stopping timeout in s, the task is cancelled after it
+        """
+        self._on = False
+        self._timeout = timeout
+        self._async_task: asyncio.Task | None = None
+
+    def start(self):
+        self._setup_task()
+        self._logger.info('Task is started!')
+
+    async def stop(self):
+        await self._destroy_task()
+        self._logger.info('Task is stopped and destroyed!')
+
+    def _setup_task(self):
+        self._on = True
+        self._async_task = asyncio.get_running_loop().create_task(self._task())
+
+    async def _destroy_task(self):
+        if isinstance(self._async_task, asyncio.Task):
+            self._on = False
+            self._wake()
+            try:
+                await asyncio.wait_for(self._async_task, self._timeout)
+            except asyncio.TimeoutError:
+                self._logger.warn('Task did not stop in time and is cancelled!')
+            except Exception as e:
+                self._logger.error('Task failed: {}'.format(e))
+            self._async_task = None
+
+    def _wake(self):
+        """
+        Wake the task up from its waits when stopping, so it does not wait for its timeouts
+
+        :return:
+        """
+        pass
+
+    async def _task(self):
+        raise NotImplementedError()
+
+    @property
+    def status(self):
+        return self._on
+
+    @property
+    def _logger(self) -> LoggerBase:
+        raise NotImplementedError()
+
+    @property
+    def task(self):
+        return self._async_task
@@ -1,12 +1,18 @@
+import io
+import time
+from collections import deque
 from .__Logger import LoggerBase
 from .__HardwarePort import SerialPort
 
 
 class AbstractCommunication:
-    def get_message(self, terminator: str = None) -> str:
+    def get_message(self, terminator: str | bytes = None) -> str | bytes:
         raise NotImplementedError()
 
-    def read(self):
+    def get_messages(self, terminator: str | bytes = None) -> list[str | bytes]:
+        raise NotImplementedError()
+
+    def read(self, timeout: float = None):
         raise NotImplementedError()
 
     def clear(self):
@@ -16,73 +22,375 @@ class AbstractCommunication:
         raise NotImplementedError()
 
 
+class StreamBuffer:
+    def __init__(self, capacity: int = 2 ** 18):
+        """
+        Fixed-size byte buffer with a moving read cursor.
+
+        Bytes are filled at the write cursor (optionally in place with ``readinto``)
+        and taken from the read cursor, so taking a frame only copies that frame.
+        Unread bytes are moved back to the front only when the write cursor
+        runs out of room. When the buffer is full, the oldest bytes are dropped
+        and counted as overflow.
+
+        :param capacity: Buffer size in bytes, default is 256 KiB
+        """
+        self.__capacity = capacity
+        self.__buffer = bytearray(capacity)
+        self.__view = memoryview(self.__buffer)
+        self.__head = 0
+        self.__tail = 0
+        self.__overflow = 0
+
+    def fill(self, readinto, size: int) -> int:
+        """
+        Fill the buffer in place by calling readinto on a writable view
+
+        :param readinto: Function that fills a writable buffer and returns number of bytes written
+        :param size: Maximum number of bytes to fill
+        :return: Number of bytes filled
+        """
+        size = min(size, self.__capacity)
+        if size < 1:
+            return 0
+        self.__reserve(size)
+        __n = readinto(self.__view[self.__tail:self.__tail + size]) or 0
+        self.__tail += __n
+        return __n
+
+    def extend(self, data: bytes) -> int:
+        """
+        Append bytes to the buffer
+
+        :param data: Bytes to append
+        :return: Number of bytes appended
+        """
+        if len(data) > self.__capacity:
+            self.__overflow += len(data) - self.__capacity
+            data = data[-self.__capacity:]
+        __n = len(data)
+        self.__reserve(__n)
+        self.__view[self.__tail:self.__tail + __n] = data
+        self.__tail += __n
+        return __n
+
+    def find(self, sub: bytes) -> int:
+        __idx = self.__buffer.find(sub, self.__head, self.__tail)
+        return __idx if __idx == -1 else __idx - self.__head
+
+    def rfind(self, sub: bytes) -> int:
+        __idx = self.__buffer.rfind(sub, self.__head, self.__tail)
+        return __idx if __idx == -1 else __idx - self.__head
+
+    def take(self, size: int, skip: int = 0) -> bytes:
+        """
+        Take bytes from the read cursor and advance it
+
+        :param size: Number of bytes to take
+        :param skip: Number of extra bytes to discard after that, e.g. terminator
+        :return: Bytes taken
+        """
+        __data = bytes(self.__view[self.__head:self.__head + size])
+        self.__head = min(self.__head + size + skip, self.__tail)
+        if self.__head == self.__tail:
+            self.__head, self.__tail = 0, 0
+        return __data
+
+    def last(self, size: int) -> bytes:
+        """
+        Copy the most recently written bytes without moving the read cursor
+
+        :param size: Number of bytes
+        :return: Bytes
+        """
+        return bytes(self.__view[max(self.__tail - size, 0):self.__tail])
+
+    def clear(self):
+        self.__head, self.__tail = 0, 0
+
+    def getvalue(self) -> bytes:
+        return bytes(self.__view[self.__head:self.__tail])
+
+    def __reserve(self, size: int):
+        if self.__tail + size <= self.__capacity:
+            return
+        __len = self.__tail - self.__head
+        __drop = max(__len + size - self.__capacity, 0)
+        if __drop > 0:
+            # Full: drop the oldest (never completed) bytes
+            self.__overflow += __drop
+            self.__head += __drop
+            __len -= __drop
+        self.__view[:__len] = self.__view[self.__head:self.__tail]
+        self.__head, self.__tail = 0, __len
+
+    def __len__(self):
+        return self.__tail - self.__head
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    @property
+    def overflow(self):
+        """
+        Number of bytes dropped because the buffer was full
+
+        :return: Overflow counter
+        """
+        return self.__overflow
+
+
 class SerialReader(AbstractCommunication):
     def __init__(self, port: SerialPort,
-                 terminator: str = '\n',
-                 encoding: str = 'ascii',
-                 errors: str = 'ignore'):
+                 terminator: str | bytes = '\n',
+                 encoding: str | None = 'ascii',
+                 errors: str = 'ignore',
+                 buffer_size: int = 2 ** 18,
+                 capture=None):
         """
         SerialReader object for reading data from serial port.
 
+        If a capture queue is given, every received chunk is also pushed to it
+        as a tuple of (time.monotonic_ns() at arrival, bytes), e.g. for raw capture files.
+        The arrival time of each chunk is kept until it is taken, so every message can be
+        stamped with the arrival of the chunk completing it (``get_messages_stamped``).
+
         :param port: SerialPort object, not serial.Serial object!
         :param terminator: Terminator string to read each message, default is newline
-        :param encoding: Encoding, default is "ascii"
+        :param encoding: Encoding, default is "ascii". If None, messages are raw bytes (binary framing)
         :param errors: Encoding errors handling, default is "ignore"
+        :param buffer_size: Maximum number of unparsed bytes kept, default is 256 KiB
+        :param capture: Queue (any object with push) receiving raw chunks, default is None
         """
         self.__port = port
-        self.__encoding = {'encoding': encoding, 'errors': errors}
-        self.__terminator = terminator.encode(**self.__encoding)
-        self.__stream = b''
-        self.__buffer = []
-        self.__available = False
+        self.__encoding = {'encoding': encoding, 'errors': errors} if encoding is not None else None
+        self.__terminator = self.__encode(terminator)
+        self.__stream = StreamBuffer(buffer_size)
+        self.__capture = capture
+        self.__last_read = 0.0
+        self.__received = 0
+        self.__arrivals: deque[tuple[int, float]] = deque()
         self.__logger = LoggerBase(target='LOG_READER')
 
-    def get_message(self, terminator: str = None) -> str:
+    def get_message(self, terminator: str | bytes = None) -> str | bytes:
+        return self.get_message_stamped(terminator)[0]
+
+    def get_message_stamped(self, terminator: str | bytes = None) -> tuple[str | bytes, float]:
+        """
+        Get the first complete message with its arrival time
+
+        :param terminator: Terminator string, default is the reader's terminator
+        :return: Message (empty if none) and time.monotonic() arrival of its last byte in s, 0 if unknown
+        """
         if terminator is None:
             terminator = self.__terminator
         else:
-            terminator = terminator.encode(**self.__encoding)
+            terminator = self.__encode(terminator)
 
         __idx = self.__stream.find(terminator)
         if __idx == -1:
-            return ''
-        __msg = self.__stream[:__idx]
+            # No complete message, empty of the message type
+            return self.__decode(b''), 0.0
+        __end = self.__position + __idx + len(terminator)
+        __msg = self.__stream.take(__idx, len(terminator))
+
+        # Remove Carriage Return
+        if terminator == b'\n' and self.__encoding is not None:
+            __msg = __msg.replace(b'\r', b'')
+
+        return self.__decode(__msg), self.__stamp([__end])[0]
+
+    def get_messages(self, terminator: str | bytes = None) -> list[str | bytes]:
+        """
+        Get every complete message in the stream at once.
+        Incomplete trailing bytes are kept for the next read.
 
-        if len(__msg) == len(self.__stream):
-            self.clear()
+        :param terminator: Terminator string, default is the reader's terminator
+        :return: List of messages, may contain empty strings for empty lines
+        """
+        return self.get_messages_stamped(terminator)[0]
+
+    def get_messages_stamped(self, terminator: str | bytes = None,
+                             skip_empty: bool = False) -> tuple[list[str | bytes], list[float]]:
+        """
+        Same as get_messages, with the arrival time of each message,
+        i.e. of the chunk its terminator came in.
+
+        :param terminator: Terminator string, default is the reader's terminator
+        :param skip_empty: Leave out empty messages (empty lines) and their arrivals, default is False
+        :return: List of messages and list of time.monotonic() arrivals in s, 0 if unknown
+        """
+        if terminator is None:
+            terminator = self.__terminator
         else:
-            self.__stream = self.__stream[__idx + 1:]
+            terminator = self.__encode(terminator)
+
+        __idx = self.__stream.rfind(terminator)
+        if __idx == -1:
+            return [], []
+        __start = self.__position
+        __chunk = self.__stream.take(__idx, len(terminator))
+
+        # Stream position right after each terminator
+        __ends = []
+        __end = __start
+        for __part in __chunk.split(terminator):
+            __end += len(__part) + len(terminator)
+            __ends.append(__end)
 
         # Remove Carriage Return
-        if terminator == b'\n':
-            __msg = __msg.replace(b'\r', b'')
+        if terminator == b'\n' and self.__encoding is not None:
+            __chunk = __chunk.replace(b'\r', b'')
+
+        __msgs = self.__decode(__chunk).split(self.__decode(terminator))
+        __stamps = self.__stamp(__ends)
+        if skip_empty:
+            __stamps = [stamp for msg, stamp in zip(__msgs, __stamps) if len(msg) > 0]
+            __msgs = [msg for msg in __msgs if len(msg) > 0]
+        return __msgs, __stamps
 
-        return __msg.decode(**self.__encoding)
+    def read(self, timeout: float = None):
+        """
+        Read incoming bytes into the stream buffer.
 
-    def read(self):
-        self.__stream += self.__read()
+        Without timeout, only the bytes already waiting are read (polling).
+        With timeout, the call blocks until at least one byte arrives or
+        the timeout elapses, then reads everything else that is waiting.
+
+        :param timeout: Maximum blocking time in s, default is None (non-blocking)
+        :return: Number of bytes read
+        """
+        return self.__read(timeout)
 
     def clear(self):
-        self.__stream = b''
+        self.__stream.clear()
+        self.__arrivals.clear()
+
+    @property
+    def __position(self) -> int:
+        # Stream position of the read cursor, counted in bytes received so far
+        return self.__received - len(self.__stream)
+
+    def __stamp(self, ends: list[int]) -> list[float]:
+        """
+        Arrival times of taken messages, forgetting the chunks taken entirely
 
-    def __read(self) -> bytes:
+        :param ends: Increasing stream positions right after each message
+        :return: Arrival time of the chunk holding the last byte of each message, 0 if unknown
+        """
+        __arrivals = self.__arrivals
+        __stamps = []
+        for __end in ends:
+            while __arrivals and __arrivals[0][0] < __end:
+                __arrivals.popleft()
+            __stamps.append(__arrivals[0][1] if __arrivals else 0.0)
+        self.__forget()
+        return __stamps
+
+    def __forget(self):
+        # Drop arrivals of chunks already taken (or dropped on overflow)
+        __position = self.__position
+        while self.__arrivals and self.__arrivals[0][0] <= __position:
+            self.__arrivals.popleft()
+
+    def __read(self, timeout: float = None) -> int:
         if not self.__port.is_connected():
-            return b''
+            if timeout is not None:
+                time.sleep(timeout)
+            return 0
         try:
-            __no_bytes = self.__port.device.in_waiting
-            __byte = self.__port.device.read(__no_bytes)
-            return __byte
+            __device = self.__port.device
+            __no_bytes = __device.in_waiting
+            if __no_bytes == 0 and timeout is not None:
+                # Block on the first byte, then drain whatever came with it
+                if __device.timeout != timeout:
+                    __device.timeout = timeout
+                __no_read = self.__stream.fill(__device.readinto, 1)
+                if __no_read:
+                    __no_read += self.__stream.fill(__device.readinto, __device.in_waiting)
+            else:
+                __no_read = self.__stream.fill(__device.readinto, __no_bytes)
         except OSError:
             self.__port.drop()
-            return b''
+            return 0
+        if __no_read:
+            __now = time.monotonic_ns()
+            self.__last_read = __now / 1e9
+            self.__received += __no_read
+            self.__arrivals.append((self.__received, self.__last_read))
+            self.__forget()
+            if self.__capture is not None:
+                self.__capture.push((__now, self.__stream.last(__no_read)))
+        return __no_read
 
     def available(self) -> bool:
         return len(self.__stream) > 0 and self.__stream.find(self.__terminator) != -1
 
+    def __encode(self, __data: str | bytes) -> bytes:
+        if isinstance(__data, bytes):
+            return __data
+        return __data.encode(**self.__encoding)
+
+    def __decode(self, __data: bytes) -> str | bytes:
+        if self.__encoding is None:
+            return __data
+        return __data.decode(**self.__encoding)
+
     @property
     def port(self):
         return self.__port
 
+    @property
+    def capture(self):
+        return self.__capture
+
+    @property
+    def fileno(self) -> int | None:
+        """
+        File descriptor of the connected device, to wait on it (selectors, event loop).
+        Devices without one (e.g. replay, or any port on Windows) have to be polled.
+
+        :return: File descriptor, None if not connected or not available
+        """
+        if not self.__port.is_connected():
+            return None
+        try:
+            return self.__port.device.fileno()
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            return None
+
+    @property
+    def last_read(self) -> float:
+        """
+        Arrival time of the latest received bytes
+
+        :return: time.monotonic() in s, 0 if nothing was read yet
+        """
+        return self.__last_read
+
+    @capture.setter
+    def capture(self, capture):
+        self.__capture = capture
+
     @property
     def stream(self):
-        return self.__stream
+        return self.__stream.getvalue()
+
+    @property
+    def backlog(self) -> int:
+        """
+        Number of bytes received but not yet taken as messages
+
+        :return: Backlog size in bytes
+        """
+        return len(self.__stream)
+
+    @property
+    def overflow(self) -> int:
+        """
+        Number of bytes dropped because the stream buffer was full
+
+        :return: Overflow counter
+        """
+        return self.__stream.overflow
@@ -11,6 +11,7 @@ class SerialPort:
         self.__device: serial.Serial | None = None
         self.__name: str | None = None
         self.__baud = 115200
+        self.__override = False
         self.__port_pair = self.ports()
         self.__logger = LoggerBase(target='LOG_SERIAL')
         self.__thread_reconnect: threading.Thread | None = None
@@ -64,6 +65,7 @@ class SerialPort:
 
         self.__name = __name
         self.__baud = int(baud)
+        self.__override = override
 
         try:
             self.__device = serial.Serial(self.__name, baudrate=self.__baud, timeout=2)
@@ -138,12 +140,37 @@ class SerialPort:
         self.disconnect()
         self.__init__()
 
+    def reconnect(self) -> bool:
+        """
+        Single attempt to reconnect the latest connected device, without auto reconnect.
+        The device is looked up in a refreshed port list, unless it was connected with override.
+
+        :return: Connection successful or not
+        """
+        if self.is_connected():
+            return True
+        if self.__name is None:
+            return False
+        if not self.__override:
+            self.refresh()
+        try:
+            return self.connect(self.__name, self.__baud, auto_reconnect=False, override=self.__override,
+                                attempt_reconnect=True)
+        except (serial.SerialException, FileNotFoundError):
+            return False
+
     def drop(self):
         """
         **DANGER!** Drop the port, for internal usage. Do not use.
+        The lost device is closed (releasing its descriptor) and forgotten, so it can be reconnected.
 
         :return:
         """
+        if isinstance(self.__device, serial.Serial):
+            try:
+                self.__device.close()
+            except (serial.SerialException, OSError):
+                pass
         self.__device = None
 
     def __setup_auto_reconnect(self):
@@ -165,16 +192,11 @@ class SerialPort:
         while self.__flag_reconnect:
             if not self.is_connected():
                 self.__logger.warn('Attempting to reconnect "{}"...'.format(self.__name))
-                try:
-                    for i in range(attempt_no):
-                        result = self.connect(self.__name, self.__baud,
-                                              auto_reconnect=False,
-                                              attempt_reconnect=True)
-                        if result:
-                            break
-                        time.sleep(2.000 / attempt_no)
-                except serial.SerialException or FileNotFoundError:
-                    pass
+                for i in range(attempt_no):
+                    result = self.reconnect()
+                    if result:
+                        break
+                    time.sleep(2.000 / attempt_no)
             if result:
                 time.sleep(0.100)
             else:
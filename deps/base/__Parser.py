@@ -1,13 +1,39 @@
 from collections.abc import Iterable
 from collections.abc import Sized
+from .__CustomException import ConstructorException
 
 
 class ParserBase:
+    # Declared type: struct format character (for binary layouts)
+    BINARY_TYPES = {
+        'bool': '?',
+        'int8': 'b', 'uint8': 'B',
+        'int16': 'h', 'uint16': 'H',
+        'int32': 'i', 'uint32': 'I',
+        'int64': 'q', 'uint64': 'Q',
+        'float32': 'f', 'float64': 'd',
+        'int': 'i', 'float': 'f'
+    }
+    TYPES = ('auto', 'str', *BINARY_TYPES)
+
     def __init__(self,
-                 data_format: Iterable[str] | Sized,
+                 data_format: Iterable[str | dict] | Sized,
                  *args,
                  **kwargs):
-        self.__data_format = data_format
+        """
+        Data format entries are either field names, or dictionaries with a
+        field name and a declared type, e.g. {"name": "Packet Counter", "type": "int"}.
+        Fields without a declared type are "auto" (type is guessed per value).
+        Sized types such as "uint16" or "float32" are read as int or float from text.
+
+        :param data_format: Data format, iterable, sized
+        """
+        self.__data_format = ParserBase.field_names(data_format)
+        self.__data_types = ParserBase.field_types(data_format)
+
+        for dtype in self.__data_types:
+            if dtype not in self.TYPES:
+                raise ConstructorException('Unknown data type "{}"!'.format(dtype))
 
     def parse(self, *args, **kwargs) -> dict:
         raise NotImplementedError
@@ -28,6 +54,59 @@ class ParserBase:
     def data_format(self):
         return self.__data_format
 
+    @property
+    def data_types(self):
+        return self.__data_types
+
+    @staticmethod
+    def field_names(data_format: Iterable[str | dict]) -> list[str]:
+        """
+        Field names of a data format
+
+        :param data_format: Data format entries
+        :return: List of field names
+        """
+        return [e['name'] if isinstance(e, dict) else e for e in data_format]
+
+    @staticmethod
+    def field_types(data_format: Iterable[str | dict]) -> list[str]:
+        """
+        Declared field types of a data format, "auto" if not declared
+
+        :param data_format: Data format entries
+        :return: List of field types
+        """
+        return [e.get('type', 'auto') if isinstance(e, dict) else 'auto' for e in data_format]
+
+    @staticmethod
+    def make_converter(dtype: str):
+        """
+        Make a converter function from string value to declared type.
+        Values that do not fit the declared type fall back to type guessing.
+
+        :param dtype: Declared type
+        :return: Converter function
+        """
+        if dtype == 'auto':
+            return ParserBase.final_type
+
+        if dtype == 'str':
+            return ParserBase.__str_or_none
+
+        cast = float if dtype.startswith('float') else int
+
+        def __convert(value):
+            try:
+                return cast(value)
+            except (ValueError, TypeError):
+                return ParserBase.final_type(value)
+
+        return __convert
+
+    @staticmethod
+    def __str_or_none(value) -> None | str:
+        return value or None
+
     @staticmethod
     def final_type(value) -> None | str | float | int:
         if value is None or value == '':
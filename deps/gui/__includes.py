@@ -6,8 +6,9 @@ from skimage import io as iio
 import plotly.express as px
 import plotly.graph_objs as go
 
-from dash import dcc, html, Dash, Input, Output, State, ctx
+from dash import dcc, html, Dash, Input, Output, State, ctx, ALL, no_update
 import dash_bootstrap_components as dbc
+from flask import jsonify, Response
 # import dash_vtk as vtk
 # from dash_vtk.utils import to_mesh_state
 # from dash_vtk.utils import to_volume_state
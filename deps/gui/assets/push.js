@@ -0,0 +1,38 @@
+// Server push: every topic of the /events stream is written to the dcc.Store "push-<topic>",
+// which triggers the callbacks depending on it. EventSource reconnects by itself.
+(function () {
+    var pending = {};
+
+    function flush() {
+        var clientside = window.dash_clientside;
+        if (!clientside || !clientside.set_props || !document.getElementById('_dash-app-content')) {
+            // Dash layout not rendered yet, keep the latest payloads
+            setTimeout(flush, 200);
+            return;
+        }
+        Object.keys(pending).forEach(function (topic) {
+            clientside.set_props('push-' + topic, {data: pending[topic]});
+        });
+        pending = {};
+    }
+
+    function connect() {
+        var source = new EventSource('/events');
+        source.addEventListener('update', function (event) {
+            var topics = JSON.parse(event.data);
+            var waiting = Object.keys(pending).length > 0;
+            Object.keys(topics).forEach(function (topic) {
+                pending[topic] = topics[topic];
+            });
+            if (!waiting) {
+                flush();
+            }
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', connect);
+    } else {
+        connect();
+    }
+})();
@@ -1,6 +1,7 @@
 import numpy as np
 
 from .__includes import *
+from ..mytools import minmax_indices, lttb_indices
 
 
 class Chart:
@@ -16,6 +17,25 @@ class Chart:
     POLAR_TYPES = ['bar', 'scatter']
     CHART_PLOT_TYPES = ['']
     MARGIN = dict(l=20, r=20, t=100, b=20)
+    GRAPH_TYPE = 'live-chart'
+
+    DECIMATE_MINMAX = 'minmax'
+    DECIMATE_LTTB = 'lttb'
+
+    CAMERA = dict(eye=dict(x=1.5, y=2, z=0.1))
+    LEGEND = dict(
+        x=0.025,
+        y=0.975,
+        traceorder="normal",
+        font=dict(
+            family="sans-serif",
+            size=12,
+            color="black"
+        )
+    )
+
+    # Figure templates by chart spec, see Chart.template
+    __templates: dict[tuple, dict] = {}
 
     @staticmethod
     def make_chart_title(y: str, x: str, z: str = None):
@@ -25,117 +45,143 @@ class Chart:
 
     @staticmethod
     def make_line_chart_2d(data: pd.DataFrame, x_key: str, y_keys: list[str]):
-        fig = px.line(
-            data, x=x_key, y=y_keys, title=Chart.make_chart_title(','.join(y_keys), x_key),
-        )
-        fig.update_layout(margin=Chart.MARGIN)
-        fig.update_layout(legend=dict(
-            x=0.025,
-            y=0.975,
-            traceorder="normal",
-            font=dict(
-                family="sans-serif",
-                size=12,
-                color="black"
-            )
+        return Chart.__make_dcc(Chart.make_figure(
+            data, x=x_key, y=y_keys, style=Chart.STYLE_LINE, plot_type=Chart.PLOT_XYZ
         ))
-        return Chart.__make_dcc(fig)
 
     @staticmethod
     def make_line_chart_3d(data: pd.DataFrame, x_key: str, y_key: str, z_key: str):
-        camera = dict(
-            eye=dict(x=1.5, y=2, z=0.1)
-        )
-        fig = px.line_3d(
-            data, x=x_key, y=y_key, z=z_key, title='3D: ' + Chart.make_chart_title(y_key, x_key, z_key)
-        )
-        fig.update_layout(margin=Chart.MARGIN, scene_camera=camera)
-        fig.update_layout(legend=dict(
-            x=0.025,
-            y=0.975,
-            traceorder="normal",
-            font=dict(
-                family="sans-serif",
-                size=12,
-                color="black"
-            )
+        return Chart.__make_dcc(Chart.make_figure(
+            data, x=x_key, y=y_key, z=z_key, style=Chart.STYLE_LINE, plot_type=Chart.PLOT_XYZ
         ))
-        return Chart.__make_dcc(fig)
 
     @staticmethod
     def make_scatter_chart_2d(data: pd.DataFrame, x_key: str, y_keys: list[str]):
-        fig = px.scatter(
-            data, x=x_key, y=y_keys, title=Chart.make_chart_title(','.join(y_keys), x_key),
-        )
-        fig.update_layout(margin=Chart.MARGIN)
-        fig.update_layout(legend=dict(
-            x=0.025,
-            y=0.975,
-            traceorder="normal",
-            font=dict(
-                family="sans-serif",
-                size=12,
-                color="black"
-            )
+        return Chart.__make_dcc(Chart.make_figure(
+            data, x=x_key, y=y_keys, style=Chart.STYLE_SCATTER, plot_type=Chart.PLOT_XYZ
         ))
-        return Chart.__make_dcc(fig)
 
     @staticmethod
     def make_scatter_chart_3d(data: pd.DataFrame, x_key: str, y_key: str, z_key: str):
-        camera = dict(
-            eye=dict(x=1.5, y=2, z=0.1)
-        )
-        fig = px.scatter_3d(
-            data, x=x_key, y=y_key, z=z_key, title='3D: {}'.format(Chart.make_chart_title(y_key, x_key, z_key))
-        )
-        fig.update_layout(margin=Chart.MARGIN, scene_camera=camera)
-        fig.update_layout(legend=dict(
-            x=0.025,
-            y=0.975,
-            traceorder="normal",
-            font=dict(
-                family="sans-serif",
-                size=12,
-                color="black"
-            )
+        return Chart.__make_dcc(Chart.make_figure(
+            data, x=x_key, y=y_key, z=z_key, style=Chart.STYLE_SCATTER, plot_type=Chart.PLOT_XYZ
         ))
-        return Chart.__make_dcc(fig)
 
     @staticmethod
     def make_bar_polar_chart(data: pd.DataFrame, r: str | list[str], theta: str):
-        fig = px.bar_polar(
-            data, r, theta, title='Polar: r: {} - theta: {}'.format(r, theta),
-        )
-        fig.update_layout(margin=Chart.MARGIN)
-        fig.update_layout(legend=dict(
-            x=0.025,
-            y=0.975,
-            traceorder="normal",
-            font=dict(
-                family="sans-serif",
-                size=12,
-                color="black"
-            )
+        return Chart.__make_dcc(Chart.make_figure(
+            data, r=r, theta=theta, style=Chart.STYLE_BAR, plot_type=Chart.PLOT_POLAR
         ))
-        return Chart.__make_dcc(fig)
 
     @staticmethod
     def make_scatter_polar_chart(data: pd.DataFrame, r: str | list[str], theta: str):
-        fig = px.scatter_polar(
-            data, r, theta, title='Polar: r: {} - theta: {}'.format(r, theta),
-        )
-        fig.update_layout(margin=Chart.MARGIN)
-        fig.update_layout(legend=dict(
-            x=0.025,
-            y=0.975,
-            traceorder="normal",
-            font=dict(
-                family="sans-serif",
-                size=12,
-                color="black"
-            )
+        return Chart.__make_dcc(Chart.make_figure(
+            data, r=r, theta=theta, style=Chart.STYLE_SCATTER, plot_type=Chart.PLOT_POLAR
         ))
-        return Chart.__make_dcc(fig)
+
+    @staticmethod
+    def make_figure(data: pd.DataFrame, **info) -> dict:
+        """
+        Figure of a chart from its cached template, only the trace arrays are new.
+        Traces are in the same order as make_extend_data appends to them.
+
+        :param data: Chart rows, see data_keys for the columns
+        :param info: Chart info, see dict_info
+        :return: Figure as a plain dictionary
+        """
+        __template = Chart.template(**info)
+        __arrays = Chart.__trace_arrays(data, **info)
+        return {
+            'data': [{**trace, **arrays} for trace, arrays in zip(__template['data'], __arrays)],
+            'layout': __template['layout']
+        }
+
+    @staticmethod
+    def template(*, x=None, y=None, z=None, r=None, theta=None, style=None, plot_type=None, **kwargs) -> dict:
+        """
+        Figure template of a chart: layout and empty traces, built once per chart spec.
+        The returned dictionary is shared, do not modify it.
+
+        :return: Figure as a plain dictionary, without trace arrays
+        """
+        __y = tuple(y) if isinstance(y, list) else y
+        __key = (plot_type, style, x, __y, z, r, theta)
+        if __key not in Chart.__templates:
+            Chart.__templates[__key] = Chart.__make_template(
+                x=x, y=y, z=z, r=r, theta=theta, style=style, plot_type=plot_type
+            ).to_plotly_json()
+        return Chart.__templates[__key]
+
+    @staticmethod
+    def zoom(figure: dict, x_range: tuple) -> dict:
+        """
+        Same figure with its x axis set to a range, the template layout is left untouched
+
+        :param figure: Figure from make_figure
+        :param x_range: (min, max) of the x axis
+        :return: Figure as a plain dictionary
+        """
+        __layout = figure['layout']
+        return {
+            **figure,
+            'layout': {**__layout, 'xaxis': {**__layout.get('xaxis', {}), 'range': list(x_range)}}
+        }
+
+    @staticmethod
+    def __make_template(*, x, y, z, r, theta, style, plot_type) -> go.Figure:
+        if plot_type == Chart.PLOT_POLAR:
+            __title = 'Polar: r: {} - theta: {}'.format(r, theta)
+            __hover = '{}=%{{r}}<br>{}=%{{theta}}<extra></extra>'.format(r, theta)
+            if style == Chart.STYLE_BAR:
+                __traces = [go.Barpolar(hovertemplate=__hover, showlegend=False)]
+            else:
+                __traces = [go.Scatterpolar(mode='markers', hovertemplate=__hover, showlegend=False)]
+            __layout = dict(polar=dict(angularaxis=dict(direction='clockwise', rotation=90)))
+        elif z is not None:
+            __y_key = y if isinstance(y, str) else y[0]
+            __title = '3D: ' + Chart.make_chart_title(__y_key, x, z)
+            __hover = '{}=%{{x}}<br>{}=%{{y}}<br>{}=%{{z}}<extra></extra>'.format(x, __y_key, z)
+            __traces = [go.Scatter3d(
+                mode='markers' if style == Chart.STYLE_SCATTER else 'lines', hovertemplate=__hover, showlegend=False
+            )]
+            __layout = dict(
+                scene=dict(xaxis_title=x, yaxis_title=__y_key, zaxis_title=z),
+                scene_camera=Chart.CAMERA
+            )
+        else:
+            __y_keys = [y] if isinstance(y, str) else y
+            __title = Chart.make_chart_title(','.join(__y_keys), x)
+            __traces = [go.Scattergl(
+                name=key,
+                mode='markers' if style == Chart.STYLE_SCATTER else 'lines',
+                hovertemplate='variable={}<br>{}=%{{x}}<br>value=%{{y}}<extra></extra>'.format(key, x),
+                showlegend=True
+            ) for key in __y_keys]
+            __layout = dict(
+                xaxis_title=x,
+                yaxis_title='value' if len(__y_keys) > 1 else __y_keys[0],
+                legend_title='variable'
+            )
+
+        fig = go.Figure(data=__traces)
+        fig.update_layout(title=__title, margin=Chart.MARGIN, legend=Chart.LEGEND, **__layout)
+        return fig
+
+    @staticmethod
+    def __trace_arrays(data: pd.DataFrame, *, x=None, y=None, z=None, r=None, theta=None, plot_type=None,
+                       **kwargs) -> list[dict]:
+        __missing = [k for k in Chart.data_keys(x=x, y=y, z=z, r=r, theta=theta, plot_type=plot_type)
+                     if k not in data.columns]
+        if __missing:
+            raise ValueError('Columns not in data: {}'.format(__missing))
+        if plot_type == Chart.PLOT_POLAR:
+            return [dict(r=data[r].to_numpy(), theta=data[theta].to_numpy())]
+        if z is not None:
+            __y_key = y if isinstance(y, str) else y[0]
+            return [dict(x=data[x].to_numpy(), y=data[__y_key].to_numpy(), z=data[z].to_numpy())]
+        __y_keys = [y] if isinstance(y, str) else y
+        __x = data[x].to_numpy()
+        return [dict(x=__x, y=data[k].to_numpy()) for k in __y_keys]
 
     # @staticmethod
     # def make_mesh_render():
@@ -167,6 +213,119 @@ class Chart:
             }
         )
 
+    @staticmethod
+    def graph_id(index: int):
+        """
+        Pattern-matching id of a live chart graph
+
+        :param index: Chart index
+        :return: Graph id
+        """
+        return {'type': Chart.GRAPH_TYPE, 'index': index}
+
+    @staticmethod
+    def data_keys(*, x=None, y=None, z=None, r=None, theta=None, plot_type=None, **kwargs) -> list[str]:
+        """
+        Data columns used by a chart, see dict_info
+
+        :return: Column names
+        """
+        if plot_type == Chart.PLOT_POLAR:
+            return [r, theta]
+        __y_keys = [y] if isinstance(y, str) else list(y)
+        if z is not None:
+            return [x, __y_keys[0], z]
+        return [x, *__y_keys]
+
+    @staticmethod
+    def bucket_rows(rows: int, points: int, method: str = DECIMATE_MINMAX) -> int:
+        """
+        Number of data rows per decimation bucket, so a window of rows fits in points per trace
+
+        :param rows: Window size in rows
+        :param points: Maximum number of points per trace, about the chart width in pixels
+        :param method: Decimation method, min/max keeps 2 points per bucket, LTTB keeps 1
+        :return: Rows per bucket, 1 means no decimation (nor waiting for complete buckets)
+        """
+        if method == Chart.DECIMATE_MINMAX:
+            __rows = -(-rows // max(points // 2, 1))
+            # Min/max keeps both rows of 2-row buckets, nothing to reduce
+            return __rows if __rows > 2 else 1
+        return max(1, -(-rows // max(points, 1)))
+
+    @staticmethod
+    def decimate(data: pd.DataFrame, n_buckets: int, method: str = DECIMATE_MINMAX, *,
+                 x=None, y=None, z=None, r=None, plot_type=None, **kwargs) -> pd.DataFrame:
+        """
+        Reduce the rows of a chart to n_buckets buckets, see dict_info for the keys.
+        Rows kept for any trace are kept for all traces sharing the x column.
+
+        :param data: Chart rows
+        :param n_buckets: Number of buckets
+        :param method: Min/max (default) or LTTB, LTTB falls back to min/max below 3 buckets
+        :return: Kept rows
+        """
+        if n_buckets < 1 or len(data) <= n_buckets:
+            return data
+        if plot_type == Chart.PLOT_POLAR:
+            __keys = [r]
+        elif z is not None:
+            __keys = [y if isinstance(y, str) else y[0], z]
+        else:
+            __keys = [y] if isinstance(y, str) else y
+
+        if method == Chart.DECIMATE_LTTB and n_buckets >= 3:
+            __x = Chart.__numeric(data[x]) if x is not None and plot_type != Chart.PLOT_POLAR \
+                else np.arange(len(data), dtype=np.float64)
+            __idx = [lttb_indices(__x, Chart.__numeric(data[k]), n_buckets) for k in __keys]
+        else:
+            __idx = [minmax_indices(Chart.__numeric(data[k]), n_buckets) for k in __keys]
+        return data.iloc[np.unique(np.concatenate(__idx))]
+
+    @staticmethod
+    def x_range(relayout: dict | None) -> tuple | None:
+        """
+        X axis range of a zoomed 2D chart from its relayoutData
+
+        :param relayout: relayoutData of the graph
+        :return: (min, max), or None if not zoomed
+        """
+        if not relayout:
+            return None
+        if 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+            return relayout['xaxis.range[0]'], relayout['xaxis.range[1]']
+        if 'xaxis.range' in relayout:
+            return tuple(relayout['xaxis.range'])
+        return None
+
+    @staticmethod
+    def __numeric(series: pd.Series) -> np.ndarray:
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+    @staticmethod
+    def make_extend_data(data: pd.DataFrame, *, x=None, y=None, z=None, r=None, theta=None, plot_type=None,
+                         max_points: int = None, **kwargs):
+        """
+        Make the extendData value appending new rows to a chart, traces are in the same order as make_* builds them
+
+        :param data: New rows, see data_keys for the columns
+        :param max_points: Maximum number of points kept per trace
+        :return: extendData value
+        """
+        if plot_type == Chart.PLOT_POLAR:
+            __update = dict(r=[data[r].tolist()], theta=[data[theta].tolist()])
+        elif z is not None:
+            __y_key = y if isinstance(y, str) else y[0]
+            __update = dict(x=[data[x].tolist()], y=[data[__y_key].tolist()], z=[data[z].tolist()])
+        else:
+            __y_keys = [y] if isinstance(y, str) else y
+            __x = data[x].tolist()
+            __update = dict(x=[__x] * len(__y_keys), y=[data[k].tolist() for k in __y_keys])
+        __traces = list(range(len(next(iter(__update.values())))))
+        if max_points is None:
+            return [__update, __traces]
+        return [__update, __traces, max_points]
+
     @staticmethod
     def dict_info(*, x=None, y=None, z=None, r=None, theta=None, style=None, model=None, plot_type=None, **kwargs):
         d = dict(
@@ -3,7 +3,6 @@ import pandas
 from .__includes import *
 from .mychart import Chart
 
-INTERVAL_SLOW = 1000
 INTERVAL_FAST = 500
 
 
@@ -33,20 +32,6 @@ class BaseComponent:
 
         # Interval
 
-        self.interval_slow = dcc.Interval(
-            id='interval-slow',
-            interval=INTERVAL_SLOW,
-            disabled=True,
-            n_intervals=0
-        )
-
-        self.interval_fast = dcc.Interval(
-            id='interval-fast',
-            interval=INTERVAL_FAST,
-            disabled=True,
-            n_intervals=0
-        )
-
         self.interval_once = dcc.Interval(
             id='interval-once',
             interval=INTERVAL_FAST,
@@ -54,12 +39,11 @@ class BaseComponent:
             max_intervals=1
         )
 
-        self.interval_load = dcc.Interval(
-            id='interval-load',
-            interval=2000,
-            n_intervals=0,
-            max_intervals=1
-        )
+        # Server push, assets/push.js writes each topic of the /events stream to its store
+
+        self.push_data = dcc.Store(id='push-data')
+        self.push_serial = dcc.Store(id='push-serial')
+        self.push_stats = dcc.Store(id='push-stats')
 
         # Global Components
 
@@ -93,6 +77,13 @@ class BaseComponent:
 
         self.sidebar_dataframe = html.Div([])
 
+        self.memory_usage = html.P('', id='memory-usage')
+
+        # Last data sequence number streamed to each chart, per browser
+        self.chart_cursor = dcc.Store(id='chart-cursor', data={})
+
+        self.latency_stats = html.Div([], id='latency-stats')
+
         self.dropdown_plot_x = dcc.Dropdown(
             options=[], id='dropdown-plot-x'
         )
@@ -228,8 +219,11 @@ class BaseComponent:
             data: pandas.DataFrame,
             x_key: str = None, y_keys: list[str] | str = None, z_key: str = None,
             r_key: str = None, theta_key: str = None,
-            line_style: str = Chart.STYLE_LINE, plot_type: str = Chart.PLOT_XYZ):
+            line_style: str = Chart.STYLE_LINE, plot_type: str = Chart.PLOT_XYZ,
+            index: int = None):
         __graph = Component.make_new_chart(data, x_key, y_keys, z_key, r_key, theta_key, line_style, plot_type)
+        if index is not None:
+            __graph.id = Chart.graph_id(index)
         return html.Div([
             __graph
         ])
@@ -270,6 +264,15 @@ class Content:
             persistence='true', persistence_type='session'
         ),
 
+        h3('Memory'),
+
+        Component.memory_usage,
+
+        h3('Latency'),
+
+        html.P('Rolling percentiles since byte arrival, also available as JSON at /stats.'),
+        Component.latency_stats,
+
         html.P('', id='test-box')
     ], fluid=True)], className='mb-5')
 
@@ -0,0 +1,737 @@
+import time
+import itertools
+import asyncio
+import threading
+import concurrent.futures
+from collections.abc import Iterable, AsyncIterator, Coroutine
+from collections import deque
+from .base.__AsyncBase import AsyncBase
+from .base.__ThreadBase import ThreadBase
+from .base.__Parser import ParserBase
+from .base.__HardwareCommunication import SerialReader
+from .myfile import FileWriter
+from .mydata import Queue
+from .mythread import parse_and_push
+from .mystats import LatencyStats
+from .mylogger import Logger
+
+
+class AsyncQueue:
+    DROP_OLDEST = Queue.DROP_OLDEST
+    DROP_NEWEST = Queue.DROP_NEWEST
+    BLOCK = Queue.BLOCK
+
+    def __init__(self, maxlen: int = None, policy: str = DROP_OLDEST):
+        """
+        Queue for handing items between tasks of one asyncio event loop, same interface as Queue.
+
+        Pushing never waits (``put`` does, for "block" policy), so synchronous code on the loop
+        (parsers, SerialReader capture) can push too. Consumers await ``wait``, ``get`` or iterate
+        with ``async for``, or subscribe an ``asyncio.Event`` to be woken up by several queues.
+        Not thread-safe: use it from the event loop thread only.
+
+        :param maxlen: Maximum number of items, default is unbounded
+        :param policy: What to do when full: drop the oldest item (default), drop the new item,
+            or make ``put`` wait (``push`` drops the new item)
+        """
+        self.__queue = deque()
+        self.__stamps = deque()
+        self.__maxlen = maxlen
+        self.__policy = policy
+        self.__not_empty = asyncio.Event()
+        self.__not_full = asyncio.Event()
+        self.__events: list[asyncio.Event] = []
+        self.__dropped = 0
+
+    def push(self, item, stamp: float = None) -> bool:
+        """
+        Push an item without waiting, see policy for full queue
+
+        :param item: Item
+        :param stamp: time.monotonic() stamp of the item, default is now
+        :return: Item is pushed or not
+        """
+        if not self.__make_room():
+            return False
+        self.__queue.append(item)
+        self.__stamps.append(time.monotonic() if stamp is None else stamp)
+        self.__notify()
+        return True
+
+    def push_many(self, items: Iterable, stamp: float = None, stamps: Iterable[float] = None) -> int:
+        """
+        Push many items at once without waiting, see policy for full queue
+
+        :param items: Items
+        :param stamp: time.monotonic() stamp of the items, default is now
+        :param stamps: time.monotonic() stamp of each item instead, default is None
+        :return: Number of items pushed
+        """
+        if stamps is None:
+            stamps = itertools.repeat(time.monotonic() if stamp is None else stamp)
+        __count = 0
+        if self.__maxlen is None:
+            __len = len(self.__queue)
+            self.__queue.extend(items)
+            __count = len(self.__queue) - __len
+            self.__stamps.extend(itertools.islice(stamps, __count))
+        else:
+            for item, __stamp in zip(items, stamps):
+                if self.__make_room():
+                    self.__queue.append(item)
+                    self.__stamps.append(__stamp)
+                    __count += 1
+        if __count > 0:
+            self.__notify()
+        return __count
+
+    async def put(self, item, timeout: float = None, stamp: float = None) -> bool:
+        """
+        Push an item, waiting for room when full with "block" policy
+
+        :param item: Item
+        :param timeout: Maximum waiting time in s, default is forever
+        :param stamp: time.monotonic() stamp of the item, default is now
+        :return: Item is pushed or not
+        """
+        if self.__policy == AsyncQueue.BLOCK and self.__maxlen is not None:
+            __deadline = None if timeout is None else time.monotonic() + timeout
+            while len(self.__queue) >= self.__maxlen:
+                self.__not_full.clear()
+                __remaining = None if __deadline is None else __deadline - time.monotonic()
+                if not await self.__wait(self.__not_full, __remaining):
+                    break
+        return self.push(item, stamp)
+
+    def pop(self):
+        if self.__queue.__len__() == 0:
+            return None
+        self.__stamps.popleft()
+        item = self.__queue.popleft()
+        self.__taken()
+        return item
+
+    async def get(self, timeout: float = None):
+        """
+        Pop an item, waiting until one is available
+
+        :param timeout: Maximum waiting time in s, default is forever
+        :return: Item, or None on timeout
+        """
+        if not await self.wait(timeout):
+            return None
+        return self.pop()
+
+    def get_many(self, max_n: int = None) -> list:
+        """
+        Pop up to max_n items at once without waiting, see ``wait``
+
+        :param max_n: Maximum number of items, default is all
+        :return: List of items, may be empty
+        """
+        return self.get_many_stamped(max_n)[0]
+
+    def get_many_stamped(self, max_n: int = None) -> tuple[list, list[float]]:
+        """
+        Same as get_many, also returning the stamp of each item
+
+        :param max_n: Maximum number of items, default is all
+        :return: List of items and list of their time.monotonic() stamps, may be empty
+        """
+        __n = len(self.__queue) if max_n is None else min(max_n, len(self.__queue))
+        items = [self.__queue.popleft() for _ in range(__n)]
+        stamps = [self.__stamps.popleft() for _ in range(__n)]
+        self.__taken()
+        return items, stamps
+
+    async def wait(self, timeout: float = None) -> bool:
+        """
+        Wait until an item is available
+
+        :param timeout: Maximum waiting time in s, default is forever
+        :return: Item is available or not
+        """
+        if self.__queue.__len__() > 0:
+            return True
+        await self.__wait(self.__not_empty, timeout)
+        return self.__queue.__len__() > 0
+
+    def subscribe(self, event: asyncio.Event):
+        """
+        Set the event whenever an item is pushed, to wait on many queues at once
+
+        :param event: Event
+        :return:
+        """
+        self.__events.append(event)
+
+    def front(self):
+        if self.__queue.__len__() == 0:
+            return None
+        return self.__queue.__getitem__(0)
+
+    def back(self):
+        if self.__queue.__len__() == 0:
+            return None
+        return self.__queue.__getitem__(-1)
+
+    def available(self):
+        return self.__len__() > 0
+
+    def oldest_age(self) -> float:
+        """
+        Age of the oldest item from its stamp, i.e. how long it has been waiting by default
+
+        :return: Age in s, 0 if the queue is empty
+        """
+        if self.__stamps.__len__() == 0:
+            return 0.0
+        return time.monotonic() - self.__stamps[0]
+
+    async def __aiter(self) -> AsyncIterator:
+        while True:
+            await self.wait()
+            yield self.pop()
+
+    @staticmethod
+    async def __wait(event: asyncio.Event, timeout: float | None) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def __make_room(self) -> bool:
+        if self.__maxlen is None or len(self.__queue) < self.__maxlen:
+            return True
+        if self.__policy == AsyncQueue.DROP_OLDEST:
+            self.__queue.popleft()
+            self.__stamps.popleft()
+            self.__dropped += 1
+            return True
+        self.__dropped += 1
+        return False
+
+    def __notify(self):
+        self.__not_empty.set()
+        for event in self.__events:
+            event.set()
+
+    def __taken(self):
+        if self.__queue.__len__() == 0:
+            self.__not_empty.clear()
+        self.__not_full.set()
+
+    def __aiter__(self):
+        return self.__aiter()
+
+    def __len__(self):
+        return self.__queue.__len__()
+
+    def __repr__(self):
+        return self.__queue.__repr__()
+
+    def __getitem__(self, index):
+        return self.__queue.__getitem__(index)
+
+    @property
+    def dropped(self):
+        """
+        Number of items dropped because the queue was full
+
+        :return: Drop counter
+        """
+        return self.__dropped
+
+    @property
+    def maxlen(self):
+        return self.__maxlen
+
+    @property
+    def data(self):
+        return self.__queue
+
+
+class AsyncSerialReader:
+    def __init__(self, reader: SerialReader,
+                 interval: float = 0.050,
+                 poll_interval: float = 0.010,
+                 reconnect_interval: float = 2.000):
+        """
+        Awaitable SerialReader: ``async for`` yields every complete message as it arrives.
+
+        The event loop watches the file descriptor of the device (``loop.add_reader``), so waiting
+        costs nothing and bytes are read as soon as they arrive. Devices without descriptor
+        (see SerialReader.fileno) are polled instead. A lost port is reconnected here, so connect it
+        without auto reconnect.
+
+        :param reader: SerialReader object
+        :param interval: Maximum waiting time in s between two checks of the port, default is 50 ms
+        :param poll_interval: Polling interval in s of devices without descriptor, default is 10 ms
+        :param reconnect_interval: Time in s between reconnection attempts of a lost port, default is 2 s
+        """
+        self.__reader = reader
+        self.__interval = interval
+        self.__poll_interval = poll_interval
+        self.__reconnect_interval = reconnect_interval
+        self.__ready = asyncio.Event()
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__device = None
+        self.__fd: int | None = None
+        self.__closed = False
+        self.__reconnect_time = 0.0
+        self.__bytes = 0
+        self.__reconnects = 0
+        self.__logger = Logger(target='ASYNC_READER')
+
+    async def read(self) -> int:
+        """
+        Wait for incoming bytes and read them into the stream buffer
+
+        :return: Number of bytes read, 0 once closed
+        """
+        __empty = 0
+        while not self.__closed:
+            __port = self.__reader.port
+            if not __port.is_connected():
+                self.__unwatch()
+                await self.__reconnect()
+                continue
+
+            self.__watch(__port.device, self.__reader.fileno)
+            self.__ready.clear()
+            __no_read = self.__reader.read()
+            if __no_read:
+                self.__bytes += __no_read
+                return __no_read
+
+            if self.__fd is None:
+                await self.__wait(self.__poll_interval)
+                continue
+            if not await self.__wait(self.__interval) or self.__closed:
+                __empty = 0
+                continue
+            __no_read = self.__reader.read()
+            if __no_read:
+                self.__bytes += __no_read
+                return __no_read
+            # The first wakeup may be stale (bytes taken after a timeout in between),
+            # readable again without data: the device is gone
+            __empty += 1
+            if __empty > 1 and not self.__closed:
+                # Closed by drop, then no longer watched
+                __port.drop()
+                self.__unwatch()
+        return 0
+
+    async def get_messages(self) -> list[str | bytes]:
+        """
+        Wait for complete messages, empty lines are skipped
+
+        :return: List of messages, empty once closed
+        """
+        return (await self.get_messages_stamped())[0]
+
+    async def get_messages_stamped(self) -> tuple[list[str | bytes], list[float]]:
+        """
+        Same as get_messages, with the arrival time of each message, see SerialReader.get_messages_stamped
+
+        :return: List of messages and list of time.monotonic() arrivals in s, both empty once closed
+        """
+        while True:
+            msgs, arrivals = self.__reader.get_messages_stamped(skip_empty=True)
+            if msgs or self.__closed:
+                return msgs, arrivals
+            await self.read()
+
+    async def batches(self) -> AsyncIterator[list[str | bytes]]:
+        """
+        Every complete message received at once, until closed
+
+        :return: Async iterator of lists of messages
+        """
+        while True:
+            msgs = await self.get_messages()
+            if not msgs:
+                return
+            yield msgs
+
+    async def messages(self) -> AsyncIterator[str | bytes]:
+        """
+        Each complete message, until closed
+
+        :return: Async iterator of messages
+        """
+        async for msgs in self.batches():
+            for msg in msgs:
+                yield msg
+
+    def close(self):
+        """
+        Stop watching the port and end the iteration, the port itself stays connected.
+        Bytes already waiting can still be taken with the SerialReader.
+
+        :return:
+        """
+        self.__closed = True
+        self.__unwatch()
+        self.__ready.set()
+
+    async def __reconnect(self):
+        __delay = self.__reconnect_time + self.__reconnect_interval - time.monotonic()
+        if __delay > 0:
+            self.__ready.clear()
+            await self.__wait(__delay)
+            if self.__closed:
+                return
+        self.__reconnect_time = time.monotonic()
+        __port = self.__reader.port
+        self.__logger.warn('Attempting to reconnect...')
+        # Opening a port may block, keep the loop responsive
+        if await asyncio.to_thread(__port.reconnect):
+            self.__reconnects += 1
+
+    async def __wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.__ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def __watch(self, device, fd: int | None):
+        # Follow port (re)connections
+        if device is self.__device:
+            return
+        self.__unwatch()
+        self.__device = device
+        if fd is None:
+            return
+        try:
+            self.__loop = asyncio.get_running_loop()
+            self.__loop.add_reader(fd, self.__ready.set)
+            self.__fd = fd
+        except (NotImplementedError, OSError, ValueError):
+            # e.g. Windows proactor loop
+            self.__fd = None
+
+    def __unwatch(self):
+        if self.__fd is not None:
+            try:
+                self.__loop.remove_reader(self.__fd)
+            except (OSError, ValueError):
+                pass
+        self.__device = None
+        self.__fd = None
+
+    def __aiter__(self):
+        return self.messages()
+
+    @property
+    def reader(self):
+        return self.__reader
+
+    @property
+    def port(self):
+        return self.__reader.port
+
+    @property
+    def bytes(self):
+        return self.__bytes
+
+    @property
+    def reconnects(self):
+        return self.__reconnects
+
+    @property
+    def closed(self):
+        return self.__closed
+
+
+class AsyncSerial(AsyncBase):
+    def __init__(self, reader: SerialReader,
+                 parser: ParserBase,
+                 queue: AsyncQueue,
+                 interval: float = 0.050,
+                 timeout: float = 4.000,
+                 stats: LatencyStats = None):
+        """
+        Specialized Serial Task, ThreadSerial in batch mode on an event loop
+
+        :param reader: SerialReader object
+        :param parser: String or Bytes Parser object
+        :param queue: An AsyncQueue object
+        :param interval: Maximum time to wait for incoming bytes in s, default is 50 ms
+        :param timeout: Task stopping timeout in s
+        :param stats: Records "parse" time and "enqueue" latency since byte arrival, optional.
+            Messages are pushed with their arrival time as the queue stamp.
+        """
+        super().__init__(timeout)
+        self.__reader = reader
+        self.__parser = parser
+        self.__queue = queue
+        self.__interval = interval
+        self.__stats = stats
+        self.__async_reader: AsyncSerialReader | None = None
+        self.__last_batch = 0
+        self.__max_batch = 0
+        self.__logger = Logger(target='ASYNC_SERIAL')
+
+    async def _task(self):
+        self.__async_reader = AsyncSerialReader(self.__reader, interval=self.__interval)
+        try:
+            while True:
+                msgs, arrivals = await self.__async_reader.get_messages_stamped()
+                if not msgs:
+                    break
+                self.__drain(msgs, arrivals)
+        finally:
+            # Clear remaining data from the reader
+            self.__async_reader.close()
+            self.__reader.read()
+            self.__drain(*(await self.__async_reader.get_messages_stamped()))
+
+    def _wake(self):
+        if self.__async_reader is not None:
+            self.__async_reader.close()
+
+    def __drain(self, msgs: list, arrivals: list[float]):
+        self.__last_batch = parse_and_push(self.__parser, self.__queue, msgs, arrivals, self.__stats)
+        if self.__last_batch > self.__max_batch:
+            self.__max_batch = self.__last_batch
+
+    @property
+    def queue(self):
+        return self.__queue
+
+    @property
+    def backlog(self) -> dict:
+        """
+        Backlog metrics, same as ThreadSerial, with reconnection count
+
+        :return: Dictionary of backlog metrics
+        """
+        return {
+            'bytes': self.__reader.backlog,
+            'queue': len(self.__queue),
+            'last_batch': self.__last_batch,
+            'max_batch': self.__max_batch,
+            'reconnects': self.__async_reader.reconnects if self.__async_reader is not None else 0
+        }
+
+    @property
+    def _logger(self):
+        return self.__logger
+
+
+class AsyncFileWriter(AsyncBase):
+    def __init__(self, file_writer: FileWriter,
+                 queue_csv: AsyncQueue,
+                 queue_coord: AsyncQueue,
+                 queue_raw: AsyncQueue = None,
+                 interval: float = 0.050,
+                 timeout: float = 4.000,
+                 stats: LatencyStats = None):
+        """
+        Specialized File Writer Task, ThreadFileWriter on an event loop.
+
+        Items are taken from the queues on the loop, then each batch is written to the data, raw
+        and KML files in a worker thread (``asyncio.to_thread``), so flushing and syncing never
+        stall the other tasks. Batches are written one at a time, in order.
+
+        :param file_writer: FileWriter object
+        :param queue_csv: AsyncQueue for data list
+        :param queue_coord: AsyncQueue for coordinates
+        :param queue_raw: AsyncQueue for raw capture records (arrival time in ns, bytes), optional
+        :param interval: Maximum time to wait for new items in s, default is 50 ms
+        :param timeout: Task stopping timeout in s
+        :param stats: Records "file" latency of data rows from their queue stamp, optional
+        """
+        super().__init__(timeout)
+        self.__writer = file_writer
+        self.__queue_csv = queue_csv
+        self.__queue_coord = queue_coord
+        self.__queue_raw = queue_raw if queue_raw is not None else AsyncQueue()
+        self.__interval = interval
+        self.__sync = False
+        self.__stats = stats
+        self.__last_batch = 0
+        self.__max_batch = 0
+        self.__max_age = 0.0
+        self.__event = asyncio.Event()
+        for __queue in (self.__queue_csv, self.__queue_coord, self.__queue_raw):
+            __queue.subscribe(self.__event)
+        self.__logger = Logger(target='ASYNC_FILE')
+
+    def request_sync(self):
+        """
+        Ask the task to force written data to disk, e.g. on critical state changes
+
+        :return:
+        """
+        self.__sync = True
+
+    async def _task(self):
+        __pending: asyncio.Future | None = None
+        try:
+            while self._on:
+                # Woken up as soon as any queue receives an item
+                try:
+                    await asyncio.wait_for(self.__event.wait(), self.__interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.__event.clear()
+
+                __batch = self.__take()
+                __sync, self.__sync = self.__sync, False
+                __pending = asyncio.ensure_future(asyncio.to_thread(self.__write, *__batch, __sync))
+                # Shielded: a cancelled task still waits for the batch being written below
+                await asyncio.shield(__pending)
+        finally:
+            if __pending is not None and not __pending.done():
+                await asyncio.wait((__pending,))
+            # Clear remaining data from the queues
+            self.__write(*self.__take(), False)
+            self.__writer.close()
+
+    def _wake(self):
+        self.__event.set()
+
+    def __take(self) -> tuple[list, list, list]:
+        __age = max(q.oldest_age() for q in (self.__queue_csv, self.__queue_coord, self.__queue_raw))
+        if __age > self.__max_age:
+            self.__max_age = __age
+
+        __rows, __stamps = self.__queue_csv.get_many_stamped()
+        if self.__stats is not None and __stamps:
+            __now = time.monotonic()
+            self.__stats.record_many('file', (__now - stamp for stamp in __stamps))
+
+        self.__last_batch = len(__rows)
+        if self.__last_batch > self.__max_batch:
+            self.__max_batch = self.__last_batch
+        return __rows, self.__queue_coord.get_many(), self.__queue_raw.get_many()
+
+    def __write(self, rows: list, coords: list, captures: list, sync: bool):
+        self.__writer.append_many(rows)
+        self.__writer.append_coords(coords)
+        self.__writer.append_captures(captures)
+        if sync:
+            self.__writer.sync()
+        else:
+            self.__writer.flush_if_due()
+
+    @property
+    def queue_csv(self):
+        return self.__queue_csv
+
+    @property
+    def queue_coord(self):
+        return self.__queue_coord
+
+    @property
+    def queue_raw(self):
+        return self.__queue_raw
+
+    @property
+    def lag(self) -> dict:
+        """
+        Lag metrics, same as ThreadFileWriter
+
+        :return: Dictionary of lag metrics
+        """
+        return {
+            'csv': len(self.__queue_csv),
+            'coord': len(self.__queue_coord),
+            'raw': len(self.__queue_raw),
+            'age': max(q.oldest_age() for q in (self.__queue_csv, self.__queue_coord, self.__queue_raw)),
+            'max_age': self.__max_age,
+            'last_batch': self.__last_batch,
+            'max_batch': self.__max_batch
+        }
+
+    @property
+    def _logger(self):
+        return self.__logger
+
+
+class ThreadEventLoop(ThreadBase):
+    def __init__(self, timeout: float = 4.000):
+        """
+        Asyncio event loop running on its own thread, for programs whose main thread is taken,
+        e.g. by the Flask server. Other threads hand work to the loop with ``submit``, ``run`` and ``call``.
+        Tasks still running on stop are cancelled and awaited before the loop is closed.
+
+        :param timeout: Thread joining timeout in s
+        """
+        super().__init__(timeout)
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__ready = threading.Event()
+        self.__logger = Logger(target='THREAD_LOOP')
+
+    def start(self):
+        self.__ready.clear()
+        super().start()
+        self.__ready.wait(self._timeout)
+
+    def stop(self):
+        if self.__loop is not None and self._on:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+        super().stop()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the loop, thread-safe
+
+        :param coro: Coroutine
+        :return: Future of its result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.__loop)
+
+    def run(self, coro: Coroutine, timeout: float = None):
+        """
+        Run a coroutine on the loop and wait for its result, thread-safe.
+        Never call it from the loop itself.
+
+        :param coro: Coroutine
+        :param timeout: Maximum waiting time in s, default is forever
+        :return: Result of the coroutine
+        """
+        return self.submit(coro).result(timeout)
+
+    def call(self, func, *args, timeout: float = None):
+        """
+        Run a function on the loop and wait for its result, thread-safe,
+        e.g. to start AsyncBase tasks or touch AsyncQueue from another thread
+
+        :param func: Function
+        :param args: Arguments
+        :param timeout: Maximum waiting time in s, default is forever
+        :return: Result of the function
+        """
+        async def __call():
+            return func(*args)
+
+        return self.run(__call(), timeout)
+
+    def _task(self):
+        self.__loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.__loop)
+        self.__ready.set()
+        try:
+            self.__loop.run_forever()
+            __tasks = asyncio.all_tasks(self.__loop)
+            for __task in __tasks:
+                __task.cancel()
+            self.__loop.run_until_complete(asyncio.gather(*__tasks, return_exceptions=True))
+            self.__loop.run_until_complete(self.__loop.shutdown_default_executor())
+        finally:
+            self.__loop.close()
+            self.__loop = None
+
+    @property
+    def loop(self):
+        return self.__loop
+
+    @property
+    def _logger(self):
+        return self.__logger
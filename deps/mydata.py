@@ -1,3 +1,7 @@
+import sys
+import time
+import itertools
+import threading
 import pandas
 import pandas as pd
 import numpy as np
@@ -6,36 +10,204 @@ from collections import deque
 
 
 class Queue:
-    def __init__(self):
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    BLOCK = 'block'
+
+    def __init__(self, maxlen: int = None, policy: str = DROP_OLDEST):
         """
-        A deque wrapper for ease of use.
-        It is thread-safe according to Python docs.
+        A thread-safe deque wrapper for handing items between threads.
 
-        The queue is simply a "buffer"
+        The queue is simply a "buffer". Consumers can block on it (``get``, ``get_many``, ``wait``)
+        instead of polling, or subscribe a ``threading.Event`` to be woken up by several queues.
+        Every item keeps a time.monotonic() stamp, the enqueue time by default or a given one
+        (e.g. byte arrival), to measure consumer lag (``oldest_age``) and pass it downstream
+        (``get_many_stamped``).
 
+        :param maxlen: Maximum number of items, default is unbounded
+        :param policy: What to do when full: drop the oldest item (default), drop the new item,
+            or block the producer
         """
         self.__queue = deque()
+        self.__stamps = deque()
+        self.__cond = threading.Condition()
+        self.__maxlen = maxlen
+        self.__policy = policy
+        self.__events: list[threading.Event] = []
+        self.__dropped = 0
+
+    def push(self, item, timeout: float = None, stamp: float = None) -> bool:
+        """
+        Push an item, see policy for full queue
+
+        :param item: Item
+        :param timeout: Maximum blocking time in s for "block" policy, default is forever
+        :param stamp: time.monotonic() stamp of the item, default is now
+        :return: Item is pushed or not
+        """
+        with self.__cond:
+            if not self.__make_room(timeout):
+                return False
+            self.__queue.append(item)
+            self.__stamps.append(time.monotonic() if stamp is None else stamp)
+            self.__cond.notify_all()
+        self.__notify()
+        return True
+
+    def push_many(self, items: Iterable, timeout: float = None, stamp: float = None,
+                  stamps: Iterable[float] = None) -> int:
+        """
+        Push many items at once, see policy for full queue
 
-    def push(self, item):
-        self.__queue.append(item)
+        :param items: Items
+        :param timeout: Maximum blocking time in s (for each item) for "block" policy, default is forever
+        :param stamp: time.monotonic() stamp of the items, default is now
+        :param stamps: time.monotonic() stamp of each item instead, default is None
+        :return: Number of items pushed
+        """
+        __count = 0
+        with self.__cond:
+            if stamps is None:
+                stamps = itertools.repeat(time.monotonic() if stamp is None else stamp)
+            if self.__maxlen is None:
+                __len = len(self.__queue)
+                self.__queue.extend(items)
+                __count = len(self.__queue) - __len
+                self.__stamps.extend(itertools.islice(stamps, __count))
+            else:
+                for item, __stamp in zip(items, stamps):
+                    if self.__make_room(timeout):
+                        self.__queue.append(item)
+                        self.__stamps.append(__stamp)
+                        __count += 1
+            if __count > 0:
+                self.__cond.notify_all()
+        if __count > 0:
+            self.__notify()
+        return __count
 
     def pop(self):
-        if self.__queue.__len__() == 0:
-            return None
-        return self.__queue.popleft()
+        with self.__cond:
+            if self.__queue.__len__() == 0:
+                return None
+            item = self.__queue.popleft()
+            self.__stamps.popleft()
+            self.__cond.notify_all()
+            return item
+
+    def get(self, timeout: float = None):
+        """
+        Pop an item, blocking until one is available
+
+        :param timeout: Maximum blocking time in s, default is forever
+        :return: Item, or None on timeout
+        """
+        with self.__cond:
+            if not self.__cond.wait_for(self.__queue.__len__, timeout):
+                return None
+            item = self.__queue.popleft()
+            self.__stamps.popleft()
+            self.__cond.notify_all()
+            return item
+
+    def get_many(self, max_n: int = None, timeout: float = 0) -> list:
+        """
+        Pop up to max_n items at once, blocking until at least one is available
+
+        :param max_n: Maximum number of items, default is all
+        :param timeout: Maximum blocking time in s, default is 0 (non-blocking), None is forever
+        :return: List of items, empty on timeout
+        """
+        with self.__cond:
+            if not self.__cond.wait_for(self.__queue.__len__, timeout):
+                return []
+            __n = len(self.__queue) if max_n is None else min(max_n, len(self.__queue))
+            items = [self.__queue.popleft() for _ in range(__n)]
+            for _ in range(__n):
+                self.__stamps.popleft()
+            self.__cond.notify_all()
+            return items
+
+    def get_many_stamped(self, max_n: int = None, timeout: float = 0) -> tuple[list, list[float]]:
+        """
+        Same as get_many, also returning the stamp of each item
+
+        :param max_n: Maximum number of items, default is all
+        :param timeout: Maximum blocking time in s, default is 0 (non-blocking), None is forever
+        :return: List of items and list of their time.monotonic() stamps, empty on timeout
+        """
+        with self.__cond:
+            if not self.__cond.wait_for(self.__queue.__len__, timeout):
+                return [], []
+            __n = len(self.__queue) if max_n is None else min(max_n, len(self.__queue))
+            items = [self.__queue.popleft() for _ in range(__n)]
+            stamps = [self.__stamps.popleft() for _ in range(__n)]
+            self.__cond.notify_all()
+            return items, stamps
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until an item is available
+
+        :param timeout: Maximum blocking time in s, default is forever
+        :return: Item is available or not
+        """
+        with self.__cond:
+            return self.__cond.wait_for(self.__queue.__len__, timeout)
+
+    def subscribe(self, event: threading.Event):
+        """
+        Set the event whenever an item is pushed, to wait on many queues at once
+
+        :param event: Event
+        :return:
+        """
+        self.__events.append(event)
 
     def front(self):
-        if self.__queue.__len__() == 0:
-            return None
-        return self.__queue.__getitem__(0)
+        with self.__cond:
+            if self.__queue.__len__() == 0:
+                return None
+            return self.__queue.__getitem__(0)
 
     def back(self):
-        if self.__queue.__len__() == 0:
-            return None
-        return self.__queue.__getitem__(-1)
+        with self.__cond:
+            if self.__queue.__len__() == 0:
+                return None
+            return self.__queue.__getitem__(-1)
 
     def available(self):
-        return self.__len__() > 0
+        with self.__cond:
+            return self.__queue.__len__() > 0
+
+    def oldest_age(self) -> float:
+        """
+        Age of the oldest item from its stamp, i.e. how long it has been waiting by default
+
+        :return: Age in s, 0 if the queue is empty
+        """
+        with self.__cond:
+            if self.__stamps.__len__() == 0:
+                return 0.0
+            return time.monotonic() - self.__stamps[0]
+
+    def __make_room(self, timeout: float = None) -> bool:
+        if self.__maxlen is None or len(self.__queue) < self.__maxlen:
+            return True
+        if self.__policy == Queue.DROP_OLDEST:
+            self.__queue.popleft()
+            self.__stamps.popleft()
+            self.__dropped += 1
+            return True
+        if self.__policy == Queue.BLOCK and \
+                self.__cond.wait_for(lambda: len(self.__queue) < self.__maxlen, timeout):
+            return True
+        self.__dropped += 1
+        return False
+
+    def __notify(self):
+        for event in self.__events:
+            event.set()
 
     def __len__(self):
         return self.__queue.__len__()
@@ -49,89 +221,357 @@ class Queue:
     def __getitem__(self, index):
         return self.__queue.__getitem__(index)
 
+    @property
+    def dropped(self):
+        """
+        Number of items dropped because the queue was full
+
+        :return: Drop counter
+        """
+        return self.__dropped
+
+    @property
+    def maxlen(self):
+        return self.__maxlen
+
     @property
     def data(self):
         return self.__queue
 
 
 class Data:
-    def __init__(self, data_or_header: dict | pd.DataFrame | Iterable = None, trim_len: int = None):
-        """
-        A wrapper class around Pandas DataFrame for ease of usages.
-        Still, you can manipulate the DataFrame data directly.
+    OBJECT_BYTES = 56
 
-        :param data_or_header:
+    def __init__(self, data_or_header: dict | pd.DataFrame | Iterable = None, trim_len: int = None,
+                 capacity: int = None, max_age: float = None, max_bytes: int = None):
         """
+        A columnar ring buffer of rows backed by NumPy arrays.
+
+        Each column is a preallocated float64 array (None is stored as NaN), which is
+        promoted to an object array the first time a non-numeric value arrives.
+        Pushing a row and evicting the oldest row are O(1). Column views and tails are
+        cheap, a Pandas DataFrame is only materialized on demand (``df``, ``tail``).
+
+        Retention: rows beyond ``trim_len``, older than ``max_age`` or beyond ``max_bytes``
+        are evicted from the front in one step. Keep the full history on disk (FileWriter).
+        The buffer is allocated as it fills, never beyond these limits.
+
+        :param data_or_header: Data (dict or DataFrame) or header (iterable of column names)
+        :param trim_len: Maximum number of rows to keep, default is unlimited
+        :param capacity: Preallocated number of rows (at most what max_bytes allows), the oldest row
+            is evicted when full. If None, the buffer grows as needed up to the retention limits.
+        :param max_age: Maximum age of rows in s, default is unlimited
+        :param max_bytes: Maximum memory of the buffer in bytes (estimated), default is unlimited
+        """
+        __df = None
         if isinstance(data_or_header, dict) or isinstance(data_or_header, pd.DataFrame):
             # is data
             try:
-                self.__df = pd.DataFrame(data_or_header)
+                __df = pd.DataFrame(data_or_header)
             except ValueError:
-                self.__df = pd.DataFrame()
+                __df = pd.DataFrame()
+            __headers = __df.columns.values.tolist()
         else:
             # is header
-            self.__df = pd.DataFrame({k: [] for k in data_or_header})
+            __headers = list(data_or_header)
 
-        self.__headers = self.__df.columns.values.tolist()
+        self.__headers = __headers
         self.__dim = self.__headers.__len__()
+        self.__index = {k: j for j, k in enumerate(self.__headers)}
+        self.__preallocate = capacity is not None
+        self.__limit = capacity if self.__preallocate else trim_len
+        self.__max_age = max_age
+        self.__max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__reset()
+
+        if __df is not None:
+            for row in __df.itertuples(index=False):
+                self.__iadd__(row)
 
     def front(self) -> pd.Series:
-        return self.__df.iloc[0]
+        with self.__lock:
+            return self.__row(0)
 
     def back(self) -> pd.Series:
-        return self.__df.iloc[-1]
+        with self.__lock:
+            return self.__row(-1)
 
     def push(self, data: list | tuple | np.ndarray):
         self.__iadd__(data)
 
     def pop(self, n: int = -1):
-        self.__df.drop(self.__df.index[n], inplace=True)
-        self.__df.reset_index(drop=True, inplace=True)
-        self.__df = pd.DataFrame(data=self.__df.values, index=self.__df.index, columns=self.__df.columns)
+        """
+        Remove the row at position n, default is the latest row.
+        The sequence numbers of the other rows are kept, see tail_since.
+
+        :param n: Row position
+        :return:
+        """
+        with self.__lock:
+            if self.__size == 0:
+                return
+            n = n % self.__size
+            if n == self.__size - 1:
+                self.__size -= 1
+            elif n == 0:
+                self.__evict(1)
+            else:
+                # Shift the older rows up by one
+                __idx = self.__positions(0, n + 1)
+                for __col in (*self.__columns, self.__time, self.__seqs):
+                    __col[__idx[1:]] = __col[__idx[:-1]]
+                self.__evict(1)
 
     def pop_many(self, n: int):
+        """
+        Remove the latest n rows
+
+        :param n: Number of rows
+        :return:
+        """
         if n < 1:
             return
-        n = min(n, self.__len__())
-        for i in range(n):
-            self.__df.drop(self.__df.index[-1], inplace=True)
-        self.__df.reset_index(drop=True, inplace=True)
-        self.__df = pd.DataFrame(data=self.__df.values, index=self.__df.index, columns=self.__df.columns)
+        with self.__lock:
+            self.__size -= min(n, self.__size)
+
+    def pop_front(self, n: int = 1):
+        """
+        Remove the oldest n rows at once
+
+        :param n: Number of rows
+        :return:
+        """
+        if n < 1:
+            return
+        with self.__lock:
+            self.__evict(n)
 
     def available(self):
-        return self.__len__() > 0
+        with self.__lock:
+            return self.__size > 0
 
     def clear(self):
-        pass
+        with self.__lock:
+            self.__head, self.__size = 0, 0
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        Values of a column, oldest first. This is a view when the rows do not wrap around.
+
+        :param key: Column name
+        :return: Column array
+        """
+        with self.__lock:
+            return self.__window(self.__columns[self.__index[key]], 0, self.__size)
+
+    def tail(self, n: int = 5, columns: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Materialize the latest n rows as a DataFrame
+
+        :param n: Number of rows
+        :param columns: Columns to include, default is all
+        :return: DataFrame
+        """
+        __keys = self.__headers if columns is None else list(dict.fromkeys(columns))
+        with self.__lock:
+            __n = min(max(n, 0), self.__size)
+            return pd.DataFrame({
+                k: self.__window(self.__columns[self.__index[k]], self.__size - __n, self.__size) for k in __keys
+            }, columns=__keys)
+
+    def tail_since(self, seq: int, columns: Iterable[str] = None, max_rows: int = None) -> tuple[pd.DataFrame, int]:
+        """
+        Materialize the rows pushed after a sequence number, e.g. to stream only new points
+
+        :param seq: Sequence number already seen, see seq. If it is ahead (data was cleared), all rows are new
+        :param columns: Columns to include, default is all
+        :param max_rows: Maximum number of latest rows, default is no limit
+        :return: DataFrame and the current sequence number, taken atomically
+        """
+        __keys = self.__headers if columns is None else list(dict.fromkeys(columns))
+        with self.__lock:
+            __n = self.__size if seq > self.__seq else self.__count_since(seq)
+            if max_rows is not None:
+                __n = min(__n, max_rows)
+            return pd.DataFrame({
+                k: self.__window(self.__columns[self.__index[k]], self.__size - __n, self.__size) for k in __keys
+            }, columns=__keys), self.__seq
 
     def __getitem__(self, item):
-        return self.__df.__getitem__(item)
+        if isinstance(item, str):
+            return pd.Series(self.column(item), name=item)
+        return self.df.__getitem__(item)
 
     def __iadd__(self, other: list | tuple | np.ndarray):
-        if other.__len__() == self.__dim:
-            try:
-                self.__df.loc[self.__len__()] = other
-            except Exception:
-                pass
+        if other.__len__() != self.__dim:
             return self
+        with self.__lock:
+            __now = time.monotonic()
+            if self.__size >= self.__max_rows:
+                self.__evict(self.__size - self.__max_rows + 1)
+            if self.__size == self.__capacity:
+                if self.__capacity >= self.__max_rows:
+                    self.__evict(1)
+                else:
+                    self.__resize(min(2 * self.__capacity, self.__max_rows))
+            if self.__max_age is not None and self.__size > 0 and \
+                    self.__time[self.__head] < __now - self.__max_age:
+                self.__evict_older(__now - self.__max_age)
+            __pos = (self.__head + self.__size) % self.__capacity
+            self.__time[__pos] = __now
+            for j, v in enumerate(other):
+                __col = self.__columns[j]
+                if v is None:
+                    __col[__pos] = np.nan if __col.dtype == np.float64 else None
+                    continue
+                if isinstance(v, (bool, str, bytes)) or not isinstance(v, (int, float, np.number)):
+                    if __col.dtype == np.float64:
+                        __col = self.__promote(j)
+                        self.__max_rows = self.__retention_rows()
+                elif self.__integral[j] and not isinstance(v, (int, np.integer)):
+                    self.__integral[j] = False
+                __col[__pos] = v
+            self.__size += 1
+            self.__seq += 1
+            self.__seqs[__pos] = self.__seq
+            if self.__capacity > self.__max_rows:
+                # Object columns take more bytes per row, max_bytes allows fewer rows
+                self.__resize(self.__max_rows)
+        return self
 
     def __add__(self, other: list | tuple | np.ndarray):
-        __data = Data(self.__df)
+        __data = self.copy()
         __data.__iadd__(other)
         return __data
 
     def __len__(self):
-        return self.__df.__len__()
+        return self.__size
 
     def __str__(self):
-        return self.__df.__str__()
+        return self.df.__str__()
 
     def __repr__(self):
-        return self.__df.__repr__()
+        return self.df.__repr__()
+
+    def __reset(self):
+        self.__max_rows = self.__retention_rows(16 + 8 * self.__dim)
+        self.__capacity = max(min(self.__limit if self.__preallocate else 64, self.__max_rows), 1)
+        self.__columns = [np.full(self.__capacity, np.nan) for _ in range(self.__dim)]
+        self.__time = np.zeros(self.__capacity)
+        self.__seqs = np.zeros(self.__capacity, dtype=np.int64)
+        self.__integral = [True] * self.__dim
+        self.__head = 0
+        self.__size = 0
+        self.__seq = 0
+
+    def __row_bytes(self) -> int:
+        # Time stamp, sequence number, pointer or float per column, and an estimated boxed value per object column
+        return 16 + sum(8 if __col.dtype == np.float64 else 8 + self.OBJECT_BYTES for __col in self.__columns)
+
+    def __retention_rows(self, row_bytes: int = None) -> int:
+        __rows = self.__limit if self.__limit is not None else sys.maxsize
+        if self.__max_bytes is not None:
+            __row_bytes = self.__row_bytes() if row_bytes is None else row_bytes
+            __rows = min(__rows, max(self.__max_bytes // __row_bytes, 1))
+        return max(__rows, 1)
+
+    def __evict_older(self, t: float):
+        __n = int(np.searchsorted(self.__window(self.__time, 0, self.__size), t, side='left'))
+        self.__evict(__n)
+
+    def __evict(self, n: int):
+        n = min(n, self.__size)
+        self.__head = (self.__head + n) % self.__capacity
+        self.__size -= n
+        if self.__size == 0:
+            self.__head = 0
+
+    def __resize(self, capacity: int):
+        # Reallocate to a new capacity, the oldest rows are evicted if they do not fit
+        __capacity = max(capacity, 1)
+        if self.__size > __capacity:
+            self.__evict(self.__size - __capacity)
+        __columns = []
+        for __col in self.__columns:
+            __new = np.full(__capacity, np.nan if __col.dtype == np.float64 else None, dtype=__col.dtype)
+            __new[:self.__size] = self.__window(__col, 0, self.__size)
+            __columns.append(__new)
+        __time = np.zeros(__capacity)
+        __time[:self.__size] = self.__window(self.__time, 0, self.__size)
+        __seqs = np.zeros(__capacity, dtype=np.int64)
+        __seqs[:self.__size] = self.__window(self.__seqs, 0, self.__size)
+        self.__columns = __columns
+        self.__time = __time
+        self.__seqs = __seqs
+        self.__capacity = __capacity
+        self.__head = 0
+
+    def __promote(self, j: int) -> np.ndarray:
+        __col = self.__columns[j]
+        __new = np.empty(self.__capacity, dtype=object)
+        __new[:] = [self.__python_value(j, v) for v in __col.tolist()]
+        self.__columns[j] = __new
+        return __new
+
+    def __python_value(self, j: int, v):
+        if isinstance(v, float):
+            if v != v:
+                return None
+            if self.__integral[j] and self.__columns[j].dtype == np.float64:
+                return int(v)
+        return v
+
+    def __count_since(self, seq: int) -> int:
+        # Rows pushed after seq. Row sequence numbers increase from the oldest row, with gaps where rows were popped
+        __lo, __hi = 0, self.__size
+        while __lo < __hi:
+            __mid = (__lo + __hi) // 2
+            if self.__seqs[(self.__head + __mid) % self.__capacity] > seq:
+                __hi = __mid
+            else:
+                __lo = __mid + 1
+        return self.__size - __lo
+
+    def __positions(self, start: int, stop: int) -> np.ndarray:
+        return (self.__head + np.arange(start, stop)) % self.__capacity
+
+    def __window(self, __col: np.ndarray, start: int, stop: int) -> np.ndarray:
+        __start = self.__head + start
+        __stop = self.__head + stop
+        if __stop <= self.__capacity:
+            return __col[__start:__stop]
+        if __start >= self.__capacity:
+            return __col[__start - self.__capacity:__stop - self.__capacity]
+        return np.concatenate((__col[__start:], __col[:__stop - self.__capacity]))
+
+    def __row(self, n: int) -> pd.Series:
+        if self.__size == 0:
+            raise IndexError('Data is empty!')
+        __pos = (self.__head + n % self.__size) % self.__capacity
+        __values = [self.__python_value(j, __col[__pos].item() if __col.dtype == np.float64 else __col[__pos])
+                    for j, __col in enumerate(self.__columns)]
+        return pd.Series(__values, index=self.__headers, dtype=object)
+
+    def memory_usage(self, deep: bool = False) -> int:
+        """
+        Memory used by the buffer in bytes
+
+        :param deep: Also count the boxed values of object columns (slower)
+        :return: Number of bytes
+        """
+        with self.__lock:
+            __bytes = self.__time.nbytes + self.__seqs.nbytes + sum(__col.nbytes for __col in self.__columns)
+            if deep:
+                for __col in self.__columns:
+                    if __col.dtype == object:
+                        __bytes += sum(sys.getsizeof(v) for v in self.__window(__col, 0, self.__size)
+                                       if v is not None)
+        return __bytes
 
     @property
     def df(self):
-        return self.__df
+        return self.tail(self.__size)
 
     @property
     def headers(self):
@@ -141,6 +581,20 @@ class Data:
     def dim(self):
         return self.__dim
 
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    @property
+    def seq(self):
+        """
+        Total number of rows ever pushed, the sequence number of the latest pushed row.
+        Numbers of popped rows are not reused.
+
+        :return: Sequence number
+        """
+        return self.__seq
+
     @property
     def size(self):
         """
@@ -152,14 +606,29 @@ class Data:
 
     @df.setter
     def df(self, value: pd.DataFrame):
-        self.__df = value
+        with self.__lock:
+            self.__reset()
+        for row in value.itertuples(index=False):
+            self.__iadd__(row)
 
     @staticmethod
     def from_df(data: pandas.DataFrame):
         return Data(data)
 
     def __copy__(self):
-        return Data(self.__df)
+        __data = Data(self.__headers, trim_len=self.__limit, capacity=self.__limit if self.__preallocate else None,
+                      max_age=self.__max_age, max_bytes=self.__max_bytes)
+        with self.__lock:
+            __data.__columns = [__col.copy() for __col in self.__columns]
+            __data.__time = self.__time.copy()
+            __data.__seqs = self.__seqs.copy()
+            __data.__integral = self.__integral.copy()
+            __data.__capacity = self.__capacity
+            __data.__head = self.__head
+            __data.__size = self.__size
+            __data.__seq = self.__seq
+            __data.__max_rows = __data.__retention_rows()
+        return __data
 
     def copy(self):
         return self.__copy__()
@@ -1,4 +1,6 @@
 import os
+import time
+import struct
 import typing
 from collections.abc import Iterable
 import numpy as np
@@ -157,22 +159,155 @@ class FileUtil:
         return sum(bl.count('\n') for bl in FileUtil.blocks(file_object))
 
 
+class CaptureFile:
+    RECORD = struct.Struct('<qI')
+
+    def __init__(self, filename: str):
+        """
+        Reader for raw capture files.
+
+        A capture file is a sequence of records, each one is a little-endian header
+        of int64 time.monotonic_ns() at arrival and uint32 payload length,
+        followed by the payload bytes exactly as received from the device.
+
+        :param filename: Capture file name
+        """
+        self.filename = filename
+
+    @staticmethod
+    def pack(timestamp_ns: int, data: bytes) -> bytes:
+        """
+        Pack a record
+
+        :param timestamp_ns: Arrival time in ns
+        :param data: Payload
+        :return: Record bytes
+        """
+        return CaptureFile.RECORD.pack(timestamp_ns, len(data)) + data
+
+    def __iter__(self) -> typing.Iterator[tuple[int, bytes]]:
+        __size = CaptureFile.RECORD.size
+        with open(self.filename, mode='rb') as f:
+            while True:
+                __header = f.read(__size)
+                if len(__header) < __size:
+                    return
+                __timestamp, __len = CaptureFile.RECORD.unpack(__header)
+                __data = f.read(__len)
+                if len(__data) < __len:
+                    # Truncated last record, e.g. after power loss
+                    return
+                yield __timestamp, __data
+
+    def payload(self) -> bytes:
+        """
+        Concatenate every payload, i.e. the original byte stream
+
+        :return: Bytes
+        """
+        return b''.join(data for _, data in self)
+
+
+class KMLWriter:
+    def __init__(self, filename: str, color: str = _GoogleEarthKMLText.Color.WHITE):
+        """
+        Append-only Google Earth KML path writer.
+
+        The file handle stays open. Each coordinate is written over the closing footer,
+        then the footer is written again after it, so appending costs the same
+        regardless of the track length. The file is created on the first coordinate.
+
+        :param filename: KML file name
+        :param color: Line color
+        """
+        self.filename = filename
+        self.color = color
+        self.__file: typing.BinaryIO | None = None
+        self.__pos = 0
+        self.__footer = _GoogleEarthKMLText.earth_coord_2.lstrip('\n').encode('utf-8')
+
+    def append(self, coord: str):
+        """
+        Append a coordinate line
+
+        :param coord: Coordinate in KML format "lon,lat,alt"
+        :return:
+        """
+        self.append_many((coord,))
+
+    def append_many(self, coords: Iterable[str]):
+        """
+        Append many coordinate lines, the footer is rewritten only once
+
+        :param coords: Coordinates in KML format "lon,lat,alt"
+        :return:
+        """
+        __lines = ''.join(coord + '\n' for coord in coords)
+        if not __lines:
+            return
+        if self.__file is None:
+            self.__open()
+        self.__file.seek(self.__pos)
+        self.__file.write(__lines.encode('utf-8'))
+        self.__pos = self.__file.tell()
+        self.__file.write(self.__footer)
+        self.__file.truncate()
+        self.__file.flush()
+
+    def sync(self):
+        """
+        Force written data to disk
+
+        :return:
+        """
+        if self.__file is not None:
+            os.fsync(self.__file.fileno())
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __open(self):
+        if self.__pos > 0:
+            # Reopen after close, continue where it stopped
+            self.__file = open(self.filename, mode='r+b')
+            return
+        self.__file = open(self.filename, mode='w+b')
+        self.__file.write(_GoogleEarthKMLText.earth_coord_0.encode('utf-8'))
+        self.__file.write(self.color.encode('utf-8'))
+        self.__file.write(_GoogleEarthKMLText.earth_coord_1.encode('utf-8'))
+        self.__pos = self.__file.tell()
+
+    def __del__(self):
+        self.close()
+
+
 class FileWriter:
     ref_cnt = 0
+    BUFFER_SIZE = 2 ** 16
 
     def __init__(self, root_file: str,
                  save_name: str,
                  extension: str = 'csv', /, *,
                  device_id: int | str = 0,
-                 folder_name: str = 'data'):
+                 folder_name: str = 'data',
+                 flush_rows: int = 64,
+                 flush_interval: float = 0.500):
         """
         File logger for writing delimited data file and Google Earth KML file
 
+        Files are kept open and buffered. Buffered data is flushed every ``flush_rows`` rows
+        or every ``flush_interval`` s, whichever comes first, and synced to disk by ``sync``
+        (e.g. on critical state changes) and ``close``.
+
         :param root_file: Manually type "__file__" here
         :param save_name: Name of the file
         :param extension: Extension of the delimited file, default is "csv"
         :param device_id: Device id, default is 0
         :param folder_name: Folder name, default is "data"
+        :param flush_rows: Flush after this many rows, default is 64
+        :param flush_interval: Flush after this many seconds, default is 500 ms
         """
         # Arguments saving
         self.root_file = root_file
@@ -181,6 +316,8 @@ class FileWriter:
         self.save_name = save_name
         self.extension = extension.strip('.')
         self.folder_name = folder_name
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
 
         # File postfix naming
         self.__dev = '_dev{}'.format(self.device_id)
@@ -205,12 +342,6 @@ class FileWriter:
             'coord_live{}.kml'.format(self.__dev)
         )
 
-        # Initialize file pointer (cursor)
-        self.__ptr_save, self.__ptr_ref = 0, 0
-
-        # Pair KML files
-        self.__kml_pair = (self.name_kml_save, self.name_kml_ref)
-
         # Initialize directory
         FileUtil.mkdir(self.folder_name)
         self.__renew_kml()
@@ -219,6 +350,17 @@ class FileWriter:
 
         FileWriter.ref_cnt += 1
 
+        # KML writers (opened on first coordinate)
+        color = _GoogleEarthKMLText.colors[self.id]
+        self.__kml_ref = KMLWriter(self.name_kml_ref, color)
+        self.__kml_save = KMLWriter(self.name_kml_save, color)
+
+        # Buffered files (opened on first write)
+        self.__file_csv: typing.TextIO | None = None
+        self.__file_raw: typing.BinaryIO | None = None
+        self.__pending = 0
+        self.__last_flush = time.monotonic()
+
     def append_csv(self, data: np.ndarray | list | tuple | Iterable, delimiter: str = ','):
         """
         Append list or numpy array of data to the file in delimited format
@@ -229,9 +371,92 @@ class FileWriter:
         """
         if len(data) < 1:
             return
-        with open(self.name_csv_save, mode='a', encoding='utf-8') as f:
-            f.write(delimiter.join(str(e) for e in data))
-            f.write('\n')
+        __file = self.__open_csv()
+        __file.write(delimiter.join(str(e) for e in data))
+        __file.write('\n')
+        self.__written(1)
+
+    def append_many(self, data: Iterable[np.ndarray | list | tuple | Iterable], delimiter: str = ','):
+        """
+        Append many rows to the file in delimited format with a single write
+
+        :param data: Rows of data in list or numpy array
+        :param delimiter: Delimiter, default is comma ","
+        :return:
+        """
+        __lines = [delimiter.join(str(e) for e in row) + '\n' for row in data if len(row) > 0]
+        if not __lines:
+            return
+        self.__open_csv().writelines(__lines)
+        self.__written(len(__lines))
+
+    def append_raw(self, data: bytes):
+        """
+        Append raw bytes to the raw file
+
+        :param data: Bytes
+        :return:
+        """
+        if len(data) < 1:
+            return
+        if self.__file_raw is None:
+            self.__file_raw = open(self.name_raw_save, mode='ab', buffering=self.BUFFER_SIZE)
+        self.__file_raw.write(data)
+        self.__written(0)
+
+    def append_captures(self, records: Iterable[tuple[int, bytes]]):
+        """
+        Append raw capture records to the raw file with a single write, see CaptureFile
+
+        :param records: Tuples of (arrival time in ns, bytes)
+        :return:
+        """
+        self.append_raw(b''.join(CaptureFile.pack(timestamp, data) for timestamp, data in records))
+
+    def flush(self, fsync: bool = False):
+        """
+        Flush buffered data to the files
+
+        :param fsync: Also force the data to disk
+        :return:
+        """
+        for __file in (self.__file_csv, self.__file_raw):
+            if __file is not None:
+                __file.flush()
+                if fsync:
+                    os.fsync(__file.fileno())
+        if fsync:
+            self.__kml_ref.sync()
+            self.__kml_save.sync()
+        self.__pending = 0
+        self.__last_flush = time.monotonic()
+
+    def flush_if_due(self):
+        """
+        Flush if the flush interval has passed, call it periodically when idle
+
+        :return:
+        """
+        if time.monotonic() - self.__last_flush >= self.flush_interval:
+            self.flush()
+
+    def sync(self):
+        """
+        Flush and force all data to disk
+
+        :return:
+        """
+        self.flush(fsync=True)
+
+    def __open_csv(self) -> typing.TextIO:
+        if self.__file_csv is None:
+            self.__file_csv = open(self.name_csv_save, mode='a', encoding='utf-8', buffering=self.BUFFER_SIZE)
+        return self.__file_csv
+
+    def __written(self, n: int):
+        self.__pending += n
+        if self.__pending >= self.flush_rows or time.monotonic() - self.__last_flush >= self.flush_interval:
+            self.flush()
 
     def append_coord(self, coord: GeoCoordinate):
         """
@@ -241,33 +466,38 @@ class FileWriter:
         :param coord: GeoCoordinate object
         :return:
         """
-        if not coord.valid():
-            return
-        __lat, __lon, __alt = (
-            '{:.6f}'.format(coord.lat),
-            '{:.6f}'.format(coord.lon),
-            '{:.2f}'.format(coord.alt)
-        )
+        self.append_coords((coord,))
 
-        __coord = '{},{},{}'.format(__lon, __lat, __alt)
+    def append_coords(self, coords: Iterable[GeoCoordinate]):
+        """
+        Append many coordinates to the Google Earth KML files at once, invalid coordinates are skipped
 
-        color = _GoogleEarthKMLText.colors[self.id]
+        :param coords: GeoCoordinate objects
+        :return:
+        """
+        __coords = [
+            '{:.6f},{:.6f},{:.2f}'.format(coord.lon, coord.lat, coord.alt)
+            for coord in coords if coord.valid()
+        ]
+        if not __coords:
+            return
 
-        self.__ptr_ref = self.__append_kml(__coord, self.name_kml_ref, self.__ptr_ref, color)
-        self.__ptr_save = self.__append_kml(__coord, self.name_kml_save, self.__ptr_save, color)
+        self.__kml_ref.append_many(__coords)
+        self.__kml_save.append_many(__coords)
 
-    @staticmethod
-    def __append_kml(__coord, __filename, __file_ptr, __color):
-        if __file_ptr == 0:
-            with open(__filename, mode='w', encoding='utf-8') as f:
-                f.write(_GoogleEarthKMLText.earth_coord_0)
-                f.write(__color)
-                f.write(_GoogleEarthKMLText.earth_coord_1)
-                f.write(__coord)
-                f.write(_GoogleEarthKMLText.earth_coord_2)
-
-        __file_ptr_new = FileUtil.insert_at_line(__filename, -5, __coord, __file_ptr)
-        return __file_ptr_new
+    def close(self):
+        """
+        Close all open files. Writing again reopens them.
+
+        :return:
+        """
+        self.sync()
+        for __file in (self.__file_csv, self.__file_raw):
+            if __file is not None:
+                __file.close()
+        self.__file_csv, self.__file_raw = None, None
+        self.__kml_ref.close()
+        self.__kml_save.close()
 
     @property
     def __root_path(self):
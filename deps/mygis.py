@@ -1,58 +1,66 @@
 import math
 import dataclasses
+import numpy as np
+from collections.abc import Iterable
 
 
-@dataclasses.dataclass(order=True, eq=True)
+@dataclasses.dataclass(order=True, eq=True, slots=True)
 class GeoCoordinate:
     """
     Coordinate set: latitude, longitude, altitude
+
+    The constructor stores floats as given, with no conversion, for the per-message path.
+    Use GeoCoordinate.parse for raw values (strings, None).
     """
-    lat: int | float | str = 0.0
-    lon: int | float | str = 0.0
-    alt: int | float | str = 0.0
+    lat: float = 0.0
+    lon: float = 0.0
+    alt: float = 0.0
 
-    def __post_init__(self):
+    @staticmethod
+    def parse(lat: int | float | str | None, lon: int | float | str | None, alt: int | float | str | None):
         """
-        Convert to float
+        Validating constructor, None and invalid values are 0.0
 
-        :return:
+        :param lat: Latitude in degrees
+        :param lon: Longitude in degrees
+        :param alt: Altitude in m
+        :return: GeoCoordinate of floats
         """
-
         try:
-            if self.lat is None:
-                self.lat = 0.0
-            else:
-                self.lat = float(self.lat)
-        except ValueError:
-            self.lat = 0.0
-
-        try:
-            if self.lon is None:
-                self.lon = 0.0
-            else:
-                self.lon = float(self.lon)
-        except ValueError:
-            self.lon = 0.0
+            return GeoCoordinate(float(lat), float(lon), float(alt))
+        except (TypeError, ValueError):
+            return GeoCoordinate(
+                GeoCoordinate.to_float(lat), GeoCoordinate.to_float(lon), GeoCoordinate.to_float(alt)
+            )
+
+    @staticmethod
+    def to_float(value: int | float | str | None) -> float:
+        """
+        Convert a raw value to float, None and invalid values are 0.0
 
+        :param value: Raw value
+        :return: Float value
+        """
+        if type(value) is float:
+            return value
+        if value is None:
+            return 0.0
         try:
-            if self.alt is None:
-                self.alt = 0.0
-            else:
-                self.alt = float(self.alt)
-        except ValueError:
-            self.alt = 0.0
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
 
     def __bool__(self):
         return self.__len__() > 0
 
     def __len__(self):
-        return sum((x is not None for x in dataclasses.asdict(self).values()))
+        return (self.lat is not None) + (self.lon is not None) + (self.alt is not None)
 
     def __str__(self):
         return f'({self.lat}, {self.lon}, {self.alt})'
 
     def __repr__(self):
-        self.__str__()
+        return f'GeoCoordinate(lat={self.lat!r}, lon={self.lon!r}, alt={self.alt!r})'
 
     def valid(self) -> bool:
         if self.lat is None or self.lon is None or self.alt is None:
@@ -152,6 +160,158 @@ class GeoPair:
         return math.degrees(math.atan2(self.alt, self.arc_length))
 
 
+class GeoPairArray:
+    def __init__(self, lat0: float | Iterable, lon0: float | Iterable, alt0: float | Iterable,
+                 lat1: float | Iterable, lon1: float | Iterable, alt1: float | Iterable):
+        """
+        Vectorized GeoPair: the same quantities, computed with NumPy for arrays of pairs at once.
+        Arguments are broadcast together, e.g. a single start point against a whole track.
+        Values are converted like GeoCoordinate.parse, None and invalid strings are 0.0.
+
+        :param lat0: Start latitudes in degrees
+        :param lon0: Start longitudes in degrees
+        :param alt0: Start altitudes in m
+        :param lat1: End latitudes in degrees
+        :param lon1: End longitudes in degrees
+        :param alt1: End altitudes in m
+        """
+        self.lat0, self.lon0, self.a0, self.lat1, self.lon1, self.a1 = np.broadcast_arrays(
+            np.radians(GeoPairArray.__array(lat0)),
+            np.radians(GeoPairArray.__array(lon0)),
+            GeoPairArray.__array(alt0),
+            np.radians(GeoPairArray.__array(lat1)),
+            np.radians(GeoPairArray.__array(lon1)),
+            GeoPairArray.__array(alt1)
+        )
+
+        self.dlat = self.lat1 - self.lat0
+        self.dlon = self.lon1 - self.lon0
+        self.alt = self.a1 - self.a0
+
+    @staticmethod
+    def from_home(home: GeoCoordinate, lat: Iterable, lon: Iterable, alt: Iterable):
+        """
+        Pairs from a fixed position (e.g. the ground station) to every point of a track
+
+        :param home: Start coordinate
+        :param lat: Latitudes in degrees
+        :param lon: Longitudes in degrees
+        :param alt: Altitudes in m
+        :return: GeoPairArray of the same length as the track
+        """
+        return GeoPairArray(home.lat, home.lon, home.alt, lat, lon, alt)
+
+    @staticmethod
+    def along(lat: Iterable, lon: Iterable, alt: Iterable):
+        """
+        Pairs of consecutive points of a track, (0, 1), (1, 2), ...
+
+        :param lat: Latitudes in degrees
+        :param lon: Longitudes in degrees
+        :param alt: Altitudes in m
+        :return: GeoPairArray one shorter than the track
+        """
+        lat, lon, alt = GeoPairArray.__array(lat), GeoPairArray.__array(lon), GeoPairArray.__array(alt)
+        return GeoPairArray(lat[:-1], lon[:-1], alt[:-1], lat[1:], lon[1:], alt[1:])
+
+    @staticmethod
+    def __array(values) -> np.ndarray:
+        __values = np.asarray(values)
+        if __values.dtype.kind in 'biuf':
+            return __values.astype(np.float64, copy=False)
+        # Same conversion as GeoCoordinate.parse, element by element
+        return np.fromiter(
+            (GeoCoordinate.to_float(v) for v in __values.ravel()), dtype=np.float64, count=__values.size
+        ).reshape(__values.shape)
+
+    def __len__(self):
+        return self.lat0.size
+
+    @property
+    def arc_radians(self) -> np.ndarray:
+        """
+        Calculate arc angles in radians, see GeoPair.arc_radians
+
+        :return: Arc angles in radians
+        """
+        a = np.sin(self.dlat / 2) ** 2
+        a += np.cos(self.lat0) * np.cos(self.lat1) * np.sin(self.dlon / 2) ** 2
+        return 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    @property
+    def arc_degrees(self) -> np.ndarray:
+        """
+        Calculate arc angles in degrees
+
+        :return: Arc angles in degrees
+        """
+        return np.degrees(self.arc_radians)
+
+    @property
+    def arc_length(self, r0=6_371_000) -> np.ndarray:
+        """
+        Calculate arc lengths in meters respect to earth radius
+
+        :param r0: Radius
+        :return: Arc lengths
+        """
+        return r0 * self.arc_radians
+
+    @property
+    def ground_distance(self) -> np.ndarray:
+        """
+        Ground distances, alias for arc length
+
+        :return: Ground distances in meters
+        """
+        return self.arc_length
+
+    @property
+    def line_of_sight(self, r0=6_371_000) -> np.ndarray:
+        """
+        Calculate lines of sight in meters respect to earth radius, see GeoPair.line_of_sight
+
+        :param r0: Radius
+        :return: Line of sight distances
+        """
+        r = r0 + self.a1
+        ar = self.arc_radians
+        base_length = 2 * r * np.cos((np.pi - ar) / 2)
+
+        los = base_length ** 2 + self.alt ** 2 - 2 * base_length * self.alt * np.cos((np.pi + ar) / 2)
+
+        return np.sqrt(np.abs(los))
+
+    @property
+    def azimuth(self) -> np.ndarray:
+        """
+        Calculate azimuth angles in degrees
+
+        :return: Azimuth angles in degrees
+        """
+        a = np.sin(self.dlon) * np.cos(self.lat1)
+        b = np.cos(self.lat0) * np.sin(self.lat1) - np.sin(self.lat0) * np.cos(self.lat1) * np.cos(self.dlon)
+        return np.degrees(np.arctan2(a, b))
+
+    @property
+    def elevation_approx(self) -> np.ndarray:
+        """
+        Calculate elevation angles by triangle approximation
+
+        :return: Elevation angles in degrees
+        """
+        return np.degrees(np.arctan2(self.alt, self.arc_length))
+
+    @property
+    def track_length(self) -> float:
+        """
+        Total ground distance of consecutive pairs, see along
+
+        :return: Sum of ground distances in meters
+        """
+        return float(self.ground_distance.sum())
+
+
 if __name__ == '__main__':
     g1 = GeoCoordinate()
     g2 = GeoCoordinate()
@@ -1,14 +1,18 @@
 from .base.__Parser import *
 from .base.__CustomException import ConstructorException
 import re
+import struct
+import binascii
+import numpy as np
 
 
 class StringParser(ParserBase):
     def __init__(self,
-                 data_format: list[str] | Iterable[str] | Sized,
+                 data_format: list[str | dict] | Iterable[str | dict] | Sized,
                  delimiter: str = ',',
                  header: str = None,
                  tail: str = None,
+                 keep_empty: bool = False,
                  *args, **kwargs):
         """
         Parse string with delimiter, header (if any), and tail (if any).
@@ -17,10 +21,18 @@ class StringParser(ParserBase):
 
         None type is defined as missing values in fields
 
+        The delimiter pattern, field keys and per-field converters are built once here.
+        Fields with a declared type skip type guessing.
+
+        Consecutive delimiters count as one by default, so padded fields (e.g. space-delimited
+        with alignment) parse correctly. With keep_empty, an empty field between two delimiters
+        is a missing value instead, which round-trips what unparse writes for None.
+
         :param data_format: Data format, iterable, sized
         :param delimiter: Delimiter of string (default: comma)
         :param header: Header of string (if any)
         :param tail: Tail of string (if any)
+        :param keep_empty: Empty fields are missing values instead of collapsed delimiters (default: False)
         :param args:
         :param kwargs:
         """
@@ -28,17 +40,25 @@ class StringParser(ParserBase):
         self.__header = header or None
         self.__delimiter = delimiter or ','
         self.__tail = tail or None
+        self.__keep_empty = keep_empty
 
         if self.__delimiter is None:
             raise ConstructorException('Delimiter cannot be None')
         if self.__tail is not None and self.__header is None:
             raise ConstructorException('Header is None but Tail is not None!')
 
+        self.__pattern = re.compile(re.escape(self.__delimiter) + '+')
+        self.__delimiter_twice = self.__delimiter * 2
+        self.__keys = tuple(self.data_format)
+        self.__converters = tuple(self.make_converter(t) for t in self.data_types)
+        self.__blank = self.make_blank()
+
     def parse(self, data: str) -> dict:
         """
         Parse the data according to the preset.
 
         **Note that the behavior of having trailing delimiter is defined as missing value.**
+        Consecutive delimiters count as one, unless keep_empty is set.
 
         :param data:
         :return:
@@ -49,6 +69,105 @@ class StringParser(ParserBase):
             return self.__parse_with_header(data)
         return self.__parse_with_tail(data)
 
+    def parse_many(self, data: Iterable[str]) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """
+        Parse many messages at once into columns.
+
+        All rows are split in one pass and converted as a whole table with NumPy,
+        falling back to per-column conversion when the table is not purely numeric.
+        A row is invalid when its header/tail does not match, its number of fields differs
+        from the data format, or one of its values does not fit the declared type
+        (e.g. "3.5" in an integer column). Invalid rows are kept in place and flagged in the mask,
+        with NaN (float), 0 (int) or None (others) as their values. Consecutive delimiters
+        are handled the same as parse.
+
+        Declared integer columns are int64, or float64 if a valid row misses a value.
+        "str" columns and undeclared non-numeric columns are object arrays, others are float64.
+
+        :param data: Iterable of messages
+        :return: Dictionary of column arrays, and boolean mask of valid rows
+        """
+        __lines = data if isinstance(data, list) else list(data)
+        __n = len(__lines)
+        __dim = len(self.__keys)
+
+        __payloads = []
+        __rows_idx = []
+        for i, __line in enumerate(__lines):
+            __payload = self.__strip(__line)
+            if __payload is None:
+                continue
+            __payload = self.__remove_consecutive_delimiter(__payload)
+            if __payload.count(self.__delimiter) == __dim - 1:
+                __payloads.append(__payload)
+                __rows_idx.append(i)
+
+        __rows_idx = np.asarray(__rows_idx, dtype=np.intp)
+        __valid = np.zeros(__n, dtype=bool)
+        __valid[__rows_idx] = True
+        __fields = self.__delimiter.join(__payloads).split(self.__delimiter) if __payloads else []
+
+        __table = None
+        if 'str' not in self.data_types:
+            try:
+                __table = np.array(__fields, dtype=np.float64).reshape(len(__payloads), __dim)
+            except ValueError:
+                pass
+        if __table is None:
+            __table = np.array(__fields, dtype=str).reshape(len(__payloads), __dim)
+
+        __columns = {}
+        for j, (k, dtype) in enumerate(zip(self.__keys, self.data_types)):
+            __column, __ok = self.__convert_column(__table[:, j], dtype)
+            if __column.dtype == np.float64:
+                __out = np.full(__n, np.nan)
+            elif __column.dtype == np.int64:
+                __out = np.zeros(__n, dtype=np.int64)
+            else:
+                __out = np.full(__n, None, dtype=object)
+            __out[__rows_idx] = __column
+            __valid[__rows_idx[~__ok]] = False
+            __columns[k] = __out
+
+        return __columns, __valid
+
+    @staticmethod
+    def __convert_column(__column: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray]:
+        __ok = np.ones(len(__column), dtype=bool)
+
+        if __column.dtype != np.float64:
+            if dtype == 'str':
+                __values = np.empty(len(__column), dtype=object)
+                __values[:] = [v or None for v in __column.tolist()]
+                return __values, __ok
+            try:
+                __column = np.where(__column == '', 'nan', __column).astype(np.float64)
+            except ValueError:
+                # Convert each value, flag the values that do not fit the declared type
+                if dtype == 'auto':
+                    __values = np.empty(len(__column), dtype=object)
+                    __values[:] = [ParserBase.final_type(v) for v in __column.tolist()]
+                    return __values, __ok
+                __values = np.full(len(__column), np.nan)
+                for i, v in enumerate(__column.tolist()):
+                    if v == '':
+                        continue
+                    try:
+                        __values[i] = float(v)
+                    except ValueError:
+                        __ok[i] = False
+                __column = __values
+
+        if dtype == 'auto' or dtype.startswith('float'):
+            return __column, __ok
+
+        # Declared integer: a value with a fraction invalidates its row, the column stays integer
+        __missing = np.isnan(__column)
+        __ok &= __missing | (np.mod(__column, 1) == 0)
+        if np.any(__missing & __ok):
+            return np.where(__ok, __column, np.nan), __ok
+        return np.where(__ok, __column, 0).astype(np.int64), __ok
+
     def unparse(self, data: dict):
         """
         Unparse dictionary data into preset string
@@ -66,31 +185,235 @@ class StringParser(ParserBase):
         return self.__header + __payload + self.__tail
 
     def __remove_consecutive_delimiter(self, __data: str):
-        pattern = re.escape(self.__delimiter) + '+'
-        return re.sub(pattern, self.__delimiter, __data)
+        if self.__keep_empty or self.__delimiter_twice not in __data:
+            return __data
+        return self.__pattern.sub(self.__delimiter, __data)
 
     def __parse_delim_only(self, __data: str):
         __data_cleaned = self.__remove_consecutive_delimiter(__data)
         __data_list = __data_cleaned.split(self.__delimiter)
-        __data_dict = self.make_blank()
-        for k, v in zip(__data_dict.keys(), __data_list):
-            __data_dict[k] = self.final_type(v)
+        __data_dict = self.__blank.copy()
+        for k, convert, v in zip(self.__keys, self.__converters, __data_list):
+            __data_dict[k] = convert(v)
         return __data_dict
 
     def __parse_with_header(self, __data: str):
-        if __data.find(self.__header) != 0:
-            return self.make_blank()
+        if not __data.startswith(self.__header):
+            return self.__blank.copy()
         return self.__parse_delim_only(__data[len(self.__header):])
 
+    def __strip(self, __data: str) -> str | None:
+        if self.__header is None:
+            return __data
+        if self.__tail is None:
+            return __data[len(self.__header):] if __data.startswith(self.__header) else None
+        if not __data.startswith(self.__header) or not __data.endswith(self.__tail):
+            return None
+        return __data[len(self.__header):-len(self.__tail)]
+
     def __parse_with_tail(self, __data: str):
-        if __data.rfind(self.__tail) != len(__data) - len(self.__tail):
-            return self.make_blank()
+        if not __data.endswith(self.__tail):
+            return self.__blank.copy()
         return self.__parse_with_header(__data[:-len(self.__tail)])
 
 
 class BytesParser(ParserBase):
-    def parse(self, *args, **kwargs) -> dict:
-        pass
+    FRAMING_COBS = 'cobs'
+    FRAMING_SLIP = 'slip'
+
+    SLIP_END = 0xC0
+    SLIP_ESC = 0xDB
+    SLIP_ESC_END = 0xDC
+    SLIP_ESC_ESC = 0xDD
+
+    def __init__(self,
+                 data_format: list[dict] | Iterable[dict] | Sized,
+                 byteorder: str = '<',
+                 framing: str = FRAMING_COBS,
+                 crc: bool = True,
+                 *args, **kwargs):
+        """
+        Parse binary frames with a fixed layout declared in the data format.
+
+        Every field must declare a binary type, e.g. {"name": "Battery Voltage", "type": "float32"}.
+        A frame is the packed fields, followed by CRC-16/CCITT-FALSE of the fields (if enabled),
+        then encoded with COBS (terminated by 0x00) or SLIP (terminated by 0xC0).
+
+        Frames with wrong length or CRC are counted as errors and parsed as blank.
+
+        :param data_format: Data format with declared binary types
+        :param byteorder: Byte order of the layout, "<" little-endian (default) or ">" big-endian
+        :param framing: Framing, "cobs" (default) or "slip"
+        :param crc: Frames carry a CRC-16 after the fields, default is True
+        :param args:
+        :param kwargs:
+        """
+        super().__init__(data_format, args, kwargs)
+
+        if byteorder not in ('<', '>'):
+            raise ConstructorException('Byte order must be "<" or ">"!')
+        if framing not in (self.FRAMING_COBS, self.FRAMING_SLIP):
+            raise ConstructorException('Unknown framing "{}"!'.format(framing))
+        for dtype in self.data_types:
+            if dtype not in self.BINARY_TYPES:
+                raise ConstructorException('Field type "{}" has no binary layout!'.format(dtype))
+
+        self.__struct = struct.Struct(byteorder + ''.join(self.BINARY_TYPES[t] for t in self.data_types))
+        self.__struct_crc = struct.Struct(byteorder + 'H')
+        self.__framing = framing
+        self.__crc = crc
+        self.__frame_size = self.__struct.size + (self.__struct_crc.size if crc else 0)
+        self.__keys = tuple(self.data_format)
+        self.__blank = self.make_blank()
+        self.__errors = 0
+
+    def parse(self, data: bytes) -> dict:
+        """
+        Parse one frame, without its terminator
 
-    def unparse(self, *args, **kwargs):
-        pass
+        :param data: Encoded frame
+        :return: Dictionary of fields
+        """
+        try:
+            if self.__framing == self.FRAMING_COBS:
+                __frame = self.cobs_decode(data)
+            else:
+                __frame = self.slip_decode(data)
+        except ValueError:
+            __frame = b''
+
+        if len(__frame) != self.__frame_size:
+            self.__errors += 1
+            return self.__blank.copy()
+
+        __payload = __frame[:self.__struct.size]
+        if self.__crc:
+            __crc, = self.__struct_crc.unpack_from(__frame, self.__struct.size)
+            if __crc != self.crc16(__payload):
+                self.__errors += 1
+                return self.__blank.copy()
+
+        return dict(zip(self.__keys, self.__struct.unpack(__payload)))
+
+    def unparse(self, data: dict) -> bytes:
+        """
+        Pack dictionary data into an encoded frame, including its terminator.
+        Missing fields are packed as zero.
+
+        :param data: Dictionary of fields
+        :return: Encoded frame
+        """
+        __payload = self.__struct.pack(*(data.get(k) or 0 for k in self.__keys))
+        if self.__crc:
+            __payload += self.__struct_crc.pack(self.crc16(__payload))
+
+        if self.__framing == self.FRAMING_COBS:
+            return self.cobs_encode(__payload) + b'\x00'
+        return self.slip_encode(__payload)
+
+    @property
+    def terminator(self) -> bytes:
+        """
+        Frame terminator to split the serial stream with
+
+        :return: Terminator byte
+        """
+        if self.__framing == self.FRAMING_COBS:
+            return b'\x00'
+        return bytes((self.SLIP_END,))
+
+    @property
+    def errors(self) -> int:
+        """
+        Number of frames dropped because of wrong length or CRC
+
+        :return: Error counter
+        """
+        return self.__errors
+
+    @staticmethod
+    def crc16(data: bytes) -> int:
+        """
+        CRC-16/CCITT-FALSE (polynomial 0x1021, initial value 0xFFFF)
+
+        :param data: Bytes
+        :return: CRC
+        """
+        return binascii.crc_hqx(data, 0xFFFF)
+
+    @staticmethod
+    def cobs_encode(data: bytes) -> bytes:
+        """
+        Consistent Overhead Byte Stuffing, the result has no zero byte
+
+        :param data: Bytes
+        :return: Encoded bytes, without the 0x00 terminator
+        """
+        __out = bytearray()
+        for __block in data.split(b'\x00'):
+            while len(__block) >= 254:
+                __out.append(255)
+                __out += __block[:254]
+                __block = __block[254:]
+            __out.append(len(__block) + 1)
+            __out += __block
+        return bytes(__out)
+
+    @staticmethod
+    def cobs_decode(data: bytes) -> bytes:
+        """
+        Decode Consistent Overhead Byte Stuffing
+
+        :param data: Encoded bytes, without the 0x00 terminator
+        :return: Decoded bytes
+        """
+        __out = bytearray()
+        __idx = 0
+        while __idx < len(data):
+            __code = data[__idx]
+            if __code == 0 or __idx + __code > len(data):
+                raise ValueError('Invalid COBS frame')
+            __out += data[__idx + 1:__idx + __code]
+            __idx += __code
+            if __code < 255 and __idx < len(data):
+                __out.append(0)
+        return bytes(__out)
+
+    @staticmethod
+    def slip_encode(data: bytes) -> bytes:
+        """
+        Serial Line Internet Protocol framing
+
+        :param data: Bytes
+        :return: Encoded bytes, including both END bytes
+        """
+        __end = bytes((BytesParser.SLIP_END,))
+        __esc = bytes((BytesParser.SLIP_ESC,))
+        __data = data.replace(__esc, __esc + bytes((BytesParser.SLIP_ESC_ESC,)))
+        __data = __data.replace(__end, __esc + bytes((BytesParser.SLIP_ESC_END,)))
+        return __end + __data + __end
+
+    @staticmethod
+    def slip_decode(data: bytes) -> bytes:
+        """
+        Decode Serial Line Internet Protocol framing
+
+        :param data: Encoded bytes, without END bytes
+        :return: Decoded bytes
+        """
+        __out = bytearray()
+        __escaped = False
+        for __byte in data:
+            if __escaped:
+                if __byte == BytesParser.SLIP_ESC_END:
+                    __out.append(BytesParser.SLIP_END)
+                elif __byte == BytesParser.SLIP_ESC_ESC:
+                    __out.append(BytesParser.SLIP_ESC)
+                else:
+                    raise ValueError('Invalid SLIP escape')
+                __escaped = False
+            elif __byte == BytesParser.SLIP_ESC:
+                __escaped = True
+            else:
+                __out.append(__byte)
+        return bytes(__out)
@@ -0,0 +1,108 @@
+import json
+import time
+import typing
+import threading
+from collections.abc import Iterator
+
+
+class Publisher:
+    def __init__(self, interval: float = 0.100, keepalive: float = 15.0):
+        """
+        Thread-safe latest-value channel pushing state changes to any number of subscribers,
+        e.g. browsers over server-sent events (``stream``).
+
+        Producers publish a JSON-serializable payload per topic, only the latest payload of each
+        topic is kept. A subscriber is woken up as soon as a topic changes and receives every topic
+        changed since its previous message, at most once per interval, so bursts are coalesced
+        instead of queued.
+
+        :param interval: Minimum time in s between two messages to a subscriber, default is 100 ms
+        :param keepalive: Idle time in s before a stream sends a comment to detect closed clients, default is 15 s
+        """
+        self.__interval = interval
+        self.__keepalive = keepalive
+        self.__payloads: dict[str, typing.Any] = {}
+        self.__versions: dict[str, int] = {}
+        self.__version = 0
+        self.__subscribers = 0
+        self.__closed = False
+        self.__cond = threading.Condition()
+
+    def publish(self, topic: str, payload=None):
+        """
+        Replace the payload of a topic and wake up subscribers
+
+        :param topic: Topic name
+        :param payload: JSON-serializable payload
+        :return:
+        """
+        with self.__cond:
+            self.__version += 1
+            self.__payloads[topic] = payload
+            self.__versions[topic] = self.__version
+            self.__cond.notify_all()
+
+    def changes(self, version: int = 0, timeout: float = None) -> tuple[dict, int]:
+        """
+        Wait for topics published after a version
+
+        :param version: Version returned by the previous call, 0 for every topic
+        :param timeout: Maximum waiting time in s, default is forever
+        :return: Dictionary of topic : payload changed since version (empty on timeout), and the latest version
+        """
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.__version > version or self.__closed, timeout)
+            return {
+                topic: self.__payloads[topic] for topic, v in self.__versions.items() if v > version
+            }, self.__version
+
+    def stream(self) -> Iterator[str]:
+        """
+        Server-sent events stream of one subscriber, starting with every topic.
+        Each message is an "update" event whose data is a JSON object of topic : payload.
+        Runs until close, or until the client is gone and the server stops iterating.
+
+        :return: Iterator of event strings
+        """
+        with self.__cond:
+            self.__subscribers += 1
+        try:
+            __version = 0
+            __last = 0.0
+            while not self.__closed:
+                __delay = __last + self.__interval - time.monotonic()
+                if __delay > 0:
+                    time.sleep(__delay)
+                __changes, __version = self.changes(__version, self.__keepalive)
+                if self.__closed:
+                    break
+                if not __changes:
+                    yield ': keepalive\n\n'
+                    continue
+                __last = time.monotonic()
+                yield 'id: {}\nevent: update\ndata: {}\n\n'.format(__version, json.dumps(__changes))
+        finally:
+            with self.__cond:
+                self.__subscribers -= 1
+
+    def close(self):
+        """
+        End every stream
+
+        :return:
+        """
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+
+    @property
+    def interval(self):
+        return self.__interval
+
+    @property
+    def subscribers(self):
+        return self.__subscribers
+
+    @property
+    def topics(self):
+        return tuple(self.__payloads.keys())
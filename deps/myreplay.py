@@ -0,0 +1,283 @@
+import os
+import time
+import typing
+from .base.__HardwareCommunication import SerialReader
+from .myfile import CaptureFile
+from .mylogger import Logger
+
+
+class ReplayDevice:
+    CHUNK_SIZE = 2 ** 16
+
+    def __init__(self, records: typing.Callable[[], typing.Iterator[tuple[int, bytes]]],
+                 speed: float | None = 1.0,
+                 loop: bool = False):
+        """
+        File-backed stand-in for serial.Serial, used by ReplayPort.
+
+        Records are released when their time is due, relative to the first record.
+        Only the parts of serial.Serial used by SerialReader are implemented.
+
+        :param records: Function returning a new iterator of (time in ns, bytes)
+        :param speed: Playback speed, 1.0 is real time, None or 0 is as fast as possible
+        :param loop: Start over at the end of the file
+        """
+        self.timeout: float | None = None
+        self.__records = records
+        self.__speed = speed
+        self.__loop = loop
+        self.__pending = bytearray()
+        self.__iter: typing.Iterator[tuple[int, bytes]] = iter(())
+        self.__next: tuple[int, bytes] | None = None
+        self.__first = 0
+        self.__t0 = 0.0
+        self.__count = 0
+        self.__bytes = 0
+        self.__started = 0.0
+        self.rewind()
+
+    def rewind(self):
+        """
+        Start playback from the beginning of the file
+
+        :return:
+        """
+        self.__iter = self.__records()
+        self.__next = next(self.__iter, None)
+        self.__first = self.__next[0] if self.__next is not None else 0
+        self.__t0 = time.monotonic()
+        if self.__count == 0:
+            self.__started = self.__t0
+
+    @property
+    def in_waiting(self) -> int:
+        self.__release()
+        return len(self.__pending)
+
+    def readinto(self, buffer) -> int:
+        """
+        Read into a writable buffer, blocking up to timeout until bytes are due
+
+        :param buffer: Writable buffer
+        :return: Number of bytes read
+        """
+        self.__release()
+        if not self.__pending:
+            self.__wait(self.timeout)
+            self.__release()
+        __n = min(len(buffer), len(self.__pending))
+        buffer[:__n] = self.__pending[:__n]
+        del self.__pending[:__n]
+        return __n
+
+    def write(self, data: bytes) -> int:
+        # Uplink goes nowhere
+        return len(data)
+
+    def close(self):
+        self.__iter = iter(())
+        self.__next = None
+        self.__pending.clear()
+
+    def __due(self, timestamp: int) -> float:
+        return self.__t0 + (timestamp - self.__first) / 1e9 / self.__speed
+
+    def __release(self):
+        __now = time.monotonic()
+        while self.__next is not None and len(self.__pending) < ReplayDevice.CHUNK_SIZE:
+            if self.__speed and self.__due(self.__next[0]) > __now:
+                break
+            self.__pending += self.__next[1]
+            self.__count += 1
+            self.__bytes += len(self.__next[1])
+            self.__next = next(self.__iter, None)
+            if self.__next is None and self.__loop:
+                self.rewind()
+
+    def __wait(self, timeout: float | None):
+        if self.__next is None:
+            # End of file, behave like an idle device
+            time.sleep(timeout if timeout is not None else 0.100)
+            return
+        if not self.__speed:
+            return
+        __delay = self.__due(self.__next[0]) - time.monotonic()
+        if timeout is not None:
+            __delay = min(__delay, timeout)
+        if __delay > 0:
+            time.sleep(__delay)
+
+    @property
+    def finished(self) -> bool:
+        return self.__next is None and not self.__pending
+
+    @property
+    def progress(self) -> dict:
+        """
+        Playback progress: records and bytes released, wall time since start and
+        achieved throughput in records/s.
+
+        :return: Dictionary of playback metrics
+        """
+        __elapsed = time.monotonic() - self.__started
+        return {
+            'records': self.__count,
+            'bytes': self.__bytes,
+            'elapsed': __elapsed,
+            'rate': self.__count / __elapsed if __elapsed > 0 else 0.0,
+            'finished': self.finished
+        }
+
+
+class ReplayPort:
+    def __init__(self, filename: str,
+                 speed: float | None = 1.0,
+                 loop: bool = False,
+                 rate: float = 10.0,
+                 prefix: str = '',
+                 delimiter: str = ',',
+                 terminator: str | bytes = '\n'):
+        """
+        Drop-in replacement for SerialPort playing back a recorded file.
+
+        A raw capture file (``.raw``, see CaptureFile) is played with its recorded timing.
+        Any other file is read as a saved delimited data file, one row every 1/rate s,
+        rebuilt into the device's message format with prefix, delimiter and terminator.
+
+        :param filename: Capture or data file name
+        :param speed: Playback speed, 1.0 is real time, N is N times faster, None or 0 is as fast as possible
+        :param loop: Start over at the end of the file
+        :param rate: Rows per second at real time for data files, default is 10
+        :param prefix: Message header for data files, e.g. "<45>,"
+        :param delimiter: Message delimiter for data files, default is comma ","
+        :param terminator: Message terminator for data files, default is newline
+        """
+        self.filename = filename
+        self.speed = speed
+        self.loop = loop
+        self.rate = rate
+        self.prefix = prefix
+        self.delimiter = delimiter
+        self.terminator = terminator if isinstance(terminator, str) else terminator.decode('ascii')
+        self.__device: ReplayDevice | None = None
+        self.__port_pair = {}
+        self.__logger = Logger(target='LOG_REPLAY')
+
+    def refresh(self):
+        pass
+
+    def connect(self, name: str = None, baud: int | str = None,
+                auto_reconnect: bool = False, override: bool = False,
+                attempt_reconnect: bool = False) -> bool:
+        """
+        Start playback, the arguments only exist for SerialPort compatibility
+
+        :return: Connection successful or not
+        """
+        if not os.path.isfile(self.filename):
+            self.__logger.warn('Replay file "{}" not found!'.format(self.filename))
+            return False
+        self.__device = ReplayDevice(self.__records, speed=self.speed, loop=self.loop)
+        self.__logger.info('Replaying "{}" at {}.'.format(
+            self.filename, '{}x'.format(self.speed) if self.speed else 'full speed'
+        ))
+        return True
+
+    def disconnect(self, *, destructor=False):
+        if self.__device is not None:
+            self.__device.close()
+            self.__device = None
+            if not destructor:
+                self.__logger.info('Replay of "{}" stopped.'.format(self.filename))
+
+    def is_connected(self) -> bool:
+        return self.__device is not None
+
+    def reconnect(self) -> bool:
+        # Playback only stops on disconnect
+        return self.is_connected()
+
+    def drop(self):
+        self.__device = None
+
+    def __records(self) -> typing.Iterator[tuple[int, bytes]]:
+        if not self.data_file:
+            return iter(CaptureFile(self.filename))
+        return self.__rows()
+
+    def __rows(self) -> typing.Iterator[tuple[int, bytes]]:
+        with open(self.filename, mode='r', encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                line = line.rstrip('\r\n')
+                if not line:
+                    continue
+                if self.delimiter != ',':
+                    line = self.delimiter.join(line.split(','))
+                yield int(i * 1e9 / self.rate), (self.prefix + line + self.terminator).encode('utf-8')
+
+    @property
+    def port_pair(self):
+        return self.__port_pair
+
+    @property
+    def data_file(self) -> bool:
+        """
+        Playing a saved data file instead of a raw capture. Its rows were written after the
+        backend modifications (e.g. unit conversions), which must not be applied again.
+
+        :return: Data file or not
+        """
+        return not self.filename.endswith('.raw')
+
+    @property
+    def device(self):
+        return self.__device
+
+    @property
+    def progress(self) -> dict:
+        """
+        Playback progress, see ReplayDevice.progress
+
+        :return: Dictionary of playback metrics, empty if not playing
+        """
+        return self.__device.progress if self.__device is not None else {}
+
+
+class ReplayReader(SerialReader):
+    def __init__(self, filename: str,
+                 speed: float | None = 1.0,
+                 loop: bool = False,
+                 rate: float = 10.0,
+                 prefix: str = '',
+                 delimiter: str = ',',
+                 terminator: str | bytes = '\n',
+                 encoding: str | None = 'ascii',
+                 errors: str = 'ignore',
+                 buffer_size: int = 2 ** 18,
+                 capture=None):
+        """
+        SerialReader fed by a recorded file instead of hardware, see ReplayPort.
+        It goes through exactly the same read path, so it can be handed to ThreadSerial as is.
+        Call ``port.connect()`` to start playback.
+
+        :param filename: Capture or data file name
+        :param speed: Playback speed, 1.0 is real time, N is N times faster, None or 0 is as fast as possible
+        :param loop: Start over at the end of the file
+        :param rate: Rows per second at real time for data files, default is 10
+        :param prefix: Message header for data files, e.g. "<45>,"
+        :param delimiter: Message delimiter for data files, default is comma ","
+        :param terminator: Terminator string to read each message, default is newline
+        :param encoding: Encoding, default is "ascii". If None, messages are raw bytes (binary framing)
+        :param errors: Encoding errors handling, default is "ignore"
+        :param buffer_size: Maximum number of unparsed bytes kept, default is 256 KiB
+        :param capture: Queue (any object with push) receiving raw chunks, default is None
+        """
+        super().__init__(
+            ReplayPort(filename, speed=speed, loop=loop, rate=rate,
+                       prefix=prefix, delimiter=delimiter, terminator=terminator),
+            terminator=terminator,
+            encoding=encoding,
+            errors=errors,
+            buffer_size=buffer_size,
+            capture=capture
+        )
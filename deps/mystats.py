@@ -0,0 +1,104 @@
+import threading
+import numpy as np
+from collections.abc import Iterable
+
+
+class LatencyStats:
+    def __init__(self, window: int = 4096):
+        """
+        Thread-safe registry of rolling latency samples per pipeline stage.
+
+        Each stage keeps the latest ``window`` samples in a preallocated array,
+        so recording is a slice assignment and percentiles are only computed on request.
+
+        :param window: Number of latest samples kept per stage, default is 4096
+        """
+        self.__window = window
+        self.__samples: dict[str, np.ndarray] = {}
+        self.__index: dict[str, int] = {}
+        self.__count: dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        """
+        Record a single latency sample
+
+        :param stage: Stage name
+        :param seconds: Latency in s
+        :return:
+        """
+        with self.__lock:
+            __samples = self.__stage(stage)
+            __idx = self.__index[stage]
+            __samples[__idx] = seconds
+            self.__index[stage] = (__idx + 1) % self.__window
+            self.__count[stage] += 1
+
+    def record_many(self, stage: str, seconds: Iterable[float]):
+        """
+        Record many latency samples at once
+
+        :param stage: Stage name
+        :param seconds: Latencies in s
+        :return:
+        """
+        __values = np.fromiter(seconds, dtype=np.float64)
+        __total = len(__values)
+        if __total == 0:
+            return
+        __values = __values[-self.__window:]
+        __n = len(__values)
+        with self.__lock:
+            __samples = self.__stage(stage)
+            __idx = self.__index[stage]
+            __first = min(__n, self.__window - __idx)
+            __samples[__idx:__idx + __first] = __values[:__first]
+            __samples[:__n - __first] = __values[__first:]
+            self.__index[stage] = (__idx + __n) % self.__window
+            self.__count[stage] += __total
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Rolling percentiles of every stage over its window
+
+        :return: Dictionary of stage : {count, p50, p95, p99, max}, latencies in ms
+        """
+        with self.__lock:
+            __stages = {
+                stage: (self.__samples[stage][:min(self.__count[stage], self.__window)].copy(), self.__count[stage])
+                for stage in self.__samples
+            }
+        __summary = {}
+        for stage, (values, count) in __stages.items():
+            if len(values) == 0:
+                continue
+            __p50, __p95, __p99 = np.percentile(values, [50, 95, 99]) * 1e3
+            __summary[stage] = {
+                'count': count,
+                'p50': float(__p50),
+                'p95': float(__p95),
+                'p99': float(__p99),
+                'max': float(values.max() * 1e3)
+            }
+        return __summary
+
+    def clear(self):
+        with self.__lock:
+            self.__samples.clear()
+            self.__index.clear()
+            self.__count.clear()
+
+    def __stage(self, stage: str) -> np.ndarray:
+        if stage not in self.__samples:
+            self.__samples[stage] = np.zeros(self.__window, dtype=np.float64)
+            self.__index[stage] = 0
+            self.__count[stage] = 0
+        return self.__samples[stage]
+
+    @property
+    def window(self):
+        return self.__window
+
+    @property
+    def stages(self):
+        return tuple(self.__samples.keys())
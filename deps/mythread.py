@@ -1,25 +1,70 @@
 import time
+import typing
+import threading
+import selectors
+import concurrent.futures
 from .base.__ThreadBase import ThreadBase
 from .base.__Parser import ParserBase
 from .base.__HardwareCommunication import SerialReader
 from .myfile import FileWriter
 from .mydata import Queue
+from .mystats import LatencyStats
 from .mylogger import Logger
 
 
+def parse_and_push(parser: ParserBase, queue, msgs: list, arrivals: list[float], stats: LatencyStats = None) -> int:
+    """
+    Parse messages and push them with their arrival time as the queue stamp,
+    the common step of ThreadSerial, ThreadReactor and AsyncSerial
+
+    :param parser: String or Bytes Parser object
+    :param queue: Queue or AsyncQueue object
+    :param msgs: Messages, see SerialReader.get_messages_stamped
+    :param arrivals: time.monotonic() arrival of each message in s. Messages without (0) are stamped now
+        and not sampled
+    :param stats: Records "parse" time and "enqueue" latency since byte arrival, optional
+    :return: Number of messages pushed
+    """
+    if stats is None:
+        parsed_msgs = [parser.parse(msg) for msg in msgs]
+    else:
+        parsed_msgs = []
+        __times = []
+        for msg in msgs:
+            __t0 = time.perf_counter()
+            parsed_msgs.append(parser.parse(msg))
+            __times.append(time.perf_counter() - __t0)
+        stats.record_many('parse', __times)
+
+    __now = time.monotonic()
+    queue.push_many(parsed_msgs, stamps=[arrival or __now for arrival in arrivals])
+    if stats is not None:
+        __now = time.monotonic()
+        stats.record_many('enqueue', [__now - arrival for arrival in arrivals if arrival > 0])
+    return len(parsed_msgs)
+
+
 class ThreadSerial(ThreadBase):
     def __init__(self, reader: SerialReader,
                  parser: ParserBase,
                  queue: Queue,
                  interval: float = 0.050,
-                 timeout: float = 4.000):
+                 timeout: float = 4.000,
+                 blocking: bool = True,
+                 batch: bool = True,
+                 stats: LatencyStats = None):
         """
         Specialized Serial Thread
 
         :param reader: SerialReader object
         :param parser: String or Bytes Parser object
         :param queue: A multithread Queue object
-        :param interval: Serial Buffer polling interval in s, default is 50 ms
+        :param interval: Serial Buffer polling interval in s, default is 50 ms.
+            In blocking mode, this is the maximum time to wait for incoming bytes.
+        :param blocking: Wake up as soon as bytes arrive instead of sleeping between polls, default is True
+        :param batch: Take, parse and push every complete message in one go, default is True
+        :param stats: Records "parse" time and "enqueue" latency since byte arrival, optional.
+            Messages are pushed with their arrival time as the queue stamp.
         """
 
         super().__init__(timeout)
@@ -27,33 +72,65 @@ class ThreadSerial(ThreadBase):
         self.__parser = parser
         self.__queue = queue
         self.__interval = interval
+        self.__blocking = blocking
+        self.__batch = batch
+        self.__stats = stats
+        self.__last_batch = 0
+        self.__max_batch = 0
         self.__logger = Logger(target='THREAD_SERIAL')
 
     def _task(self):
         while self._on:
-            self.__reader.read()
-            if self.__reader.available():
-                msg = self.__reader.get_message()
-                if len(msg) > 0:
-                    parsed_msg = self.__parser.parse(msg)
-                    self.__queue.push(parsed_msg)
+            if self.__blocking:
+                self.__reader.read(timeout=self.__interval)
+            else:
+                self.__reader.read()
+            self.__drain()
 
-            time.sleep(self.__interval)
+            if not self.__blocking:
+                time.sleep(self.__interval)
 
         # Clear remaining data from the queue
         self.__reader.read()
+        self.__drain()
+
+    def __drain(self):
+        if self.__batch:
+            msgs, arrivals = self.__reader.get_messages_stamped(skip_empty=True)
+            self.__update_batch(parse_and_push(self.__parser, self.__queue, msgs, arrivals, self.__stats))
+            return
+
+        count = 0
         while self.__reader.available():
-            msg = self.__reader.get_message()
+            msg, arrival = self.__reader.get_message_stamped()
             if len(msg) > 0:
-                parsed_msg = self.__parser.parse(msg)
-                print(msg)
-                print(parsed_msg)
-                self.__queue.push(parsed_msg)
+                count += parse_and_push(self.__parser, self.__queue, [msg], [arrival], self.__stats)
+        self.__update_batch(count)
+
+    def __update_batch(self, count: int):
+        self.__last_batch = count
+        if count > self.__max_batch:
+            self.__max_batch = count
 
     @property
     def queue(self):
         return self.__queue
 
+    @property
+    def backlog(self) -> dict:
+        """
+        Backlog metrics: bytes waiting in the reader, parsed messages waiting
+        in the queue, and the latest and largest batch sizes.
+
+        :return: Dictionary of backlog metrics
+        """
+        return {
+            'bytes': self.__reader.backlog,
+            'queue': len(self.__queue),
+            'last_batch': self.__last_batch,
+            'max_batch': self.__max_batch
+        }
+
     @property
     def _logger(self):
         return self.__logger
@@ -65,14 +142,18 @@ class ThreadFileWriter(ThreadBase):
                  queue_coord: Queue,
                  queue_raw: Queue = None,
                  interval: float = 0.050,
-                 timeout: float = 4.000):
+                 timeout: float = 4.000,
+                 stats: LatencyStats = None):
         """
         Specialized Thread for writing files in the background without blocking main thread.
 
         :param file_writer: FileWriter object
         :param queue_csv: Queue for data list
         :param queue_coord: Queue for coordinates
-        :param interval: Serial Buffer polling interval in s, default is 50 ms
+        :param queue_raw: Queue for raw capture records (arrival time in ns, bytes), optional
+        :param interval: Maximum time to wait for new items in s, default is 50 ms.
+            Everything available is written as one batch per wakeup.
+        :param stats: Records "file" latency of data rows from their queue stamp, optional
         """
 
         super().__init__(timeout)
@@ -81,32 +162,57 @@ class ThreadFileWriter(ThreadBase):
         self.__queue_coord = queue_coord
         self.__queue_raw = queue_raw if queue_raw is not None else Queue()
         self.__interval = interval
+        self.__sync = False
+        self.__stats = stats
+        self.__last_batch = 0
+        self.__max_batch = 0
+        self.__max_age = 0.0
+        self.__event = threading.Event()
+        for __queue in (self.__queue_csv, self.__queue_coord, self.__queue_raw):
+            __queue.subscribe(self.__event)
         self.__logger = Logger(target='THREAD_FILE')
 
+    def request_sync(self):
+        """
+        Ask the thread to force written data to disk, e.g. on critical state changes
+
+        :return:
+        """
+        self.__sync = True
+
     def _task(self):
         while self._on:
-            if self.__queue_csv.available():
-                dat = self.__queue_csv.pop()
-                self.__writer.append_csv(dat)
+            # Woken up as soon as any queue receives an item
+            self.__event.wait(self.__interval)
+            self.__event.clear()
+            self.__drain()
 
-            if self.__queue_coord.available():
-                dat = self.__queue_coord.pop()
-                self.__writer.append_coord(dat)
+            if self.__sync:
+                self.__sync = False
+                self.__writer.sync()
+            else:
+                self.__writer.flush_if_due()
 
-            if self.__queue_raw.available():
-                dat = self.__queue_raw.pop()
-                self.__writer.append_csv(dat)
+        # Clear remaining data from the queues
+        self.__drain()
+        self.__writer.close()
 
-            time.sleep(self.__interval)
+    def __drain(self):
+        __age = max(q.oldest_age() for q in (self.__queue_csv, self.__queue_coord, self.__queue_raw))
+        if __age > self.__max_age:
+            self.__max_age = __age
 
-        # Clear remaining data from the queue
-        while self.__queue_csv.available():
-            dat = self.__queue_csv.pop()
-            self.__writer.append_csv(dat)
+        __rows, __stamps = self.__queue_csv.get_many_stamped()
+        self.__writer.append_many(__rows)
+        if self.__stats is not None and __stamps:
+            __now = time.monotonic()
+            self.__stats.record_many('file', (__now - stamp for stamp in __stamps))
+        self.__writer.append_coords(self.__queue_coord.get_many())
+        self.__writer.append_captures(self.__queue_raw.get_many())
 
-        while self.__queue_coord.available():
-            dat = self.__queue_coord.pop()
-            self.__writer.append_coord(dat)
+        self.__last_batch = len(__rows)
+        if self.__last_batch > self.__max_batch:
+            self.__max_batch = self.__last_batch
 
     @property
     def queue_csv(self):
@@ -120,6 +226,248 @@ class ThreadFileWriter(ThreadBase):
     def queue_raw(self):
         return self.__queue_raw
 
+    @property
+    def lag(self) -> dict:
+        """
+        Lag metrics: items waiting in each queue, age of the oldest waiting item in s
+        (and the largest age seen on wakeup), and the latest and largest csv batch sizes.
+
+        :return: Dictionary of lag metrics
+        """
+        return {
+            'csv': len(self.__queue_csv),
+            'coord': len(self.__queue_coord),
+            'raw': len(self.__queue_raw),
+            'age': max(q.oldest_age() for q in (self.__queue_csv, self.__queue_coord, self.__queue_raw)),
+            'max_age': self.__max_age,
+            'last_batch': self.__last_batch,
+            'max_batch': self.__max_batch
+        }
+
+    @property
+    def _logger(self):
+        return self.__logger
+
+
+class ReactorChannel:
+    def __init__(self, reader: SerialReader, parser: ParserBase, queue: Queue):
+        """
+        One port of ThreadReactor: reader, parser and output queue, with throughput counters
+
+        :param reader: SerialReader object
+        :param parser: String or Bytes Parser object
+        :param queue: A multithread Queue object
+        """
+        self.reader = reader
+        self.parser = parser
+        self.queue = queue
+        self.device = None
+        self.fd: int | None = None
+        self.bytes = 0
+        self.messages = 0
+        self.reconnects = 0
+        self.reconnecting: concurrent.futures.Future | None = None
+        self.__window = (time.monotonic(), 0, 0)
+        self.__rates = (0.0, 0.0)
+
+    def update_rates(self, now: float, window: float):
+        """
+        Recompute the byte and message rates once per window
+
+        :param now: time.monotonic() in s
+        :param window: Rate window in s
+        :return:
+        """
+        __t, __bytes, __messages = self.__window
+        if now - __t < window:
+            return
+        self.__rates = ((self.bytes - __bytes) / (now - __t), (self.messages - __messages) / (now - __t))
+        self.__window = (now, self.bytes, self.messages)
+
+    @property
+    def throughput(self) -> dict:
+        return {
+            'connected': self.reader.port.is_connected(),
+            'bytes': self.bytes,
+            'messages': self.messages,
+            'bytes_per_s': self.__rates[0],
+            'messages_per_s': self.__rates[1],
+            'backlog': self.reader.backlog,
+            'queue': len(self.queue),
+            'reconnects': self.reconnects
+        }
+
+
+class ThreadReactor(ThreadBase):
+    def __init__(self, interval: float = 0.050,
+                 timeout: float = 4.000,
+                 reconnect_interval: float = 2.000,
+                 rate_window: float = 1.000,
+                 stats: LatencyStats = None):
+        """
+        Single I/O thread for any number of serial ports, instead of one ThreadSerial per port.
+
+        Ports are attached with their parser and queue. The thread waits on all of them at once
+        with selectors and reads, parses and pushes whichever port has bytes, like ThreadSerial in
+        batch mode. Devices without file descriptor (see SerialReader.fileno) are polled every interval
+        instead. Lost ports are reconnected here, so connect them without auto reconnect. Opening a port
+        may block (port scan, driver), so the attempts run on a worker thread and the other ports keep
+        being read meanwhile.
+
+        :param interval: Maximum waiting time in s, and polling interval of devices without descriptor,
+            default is 50 ms
+        :param timeout: Thread joining timeout in s
+        :param reconnect_interval: Time in s between reconnection attempts of a lost port, default is 2 s
+        :param rate_window: Throughput measurement window in s, default is 1 s
+        :param stats: Records "parse" time and "enqueue" latency since byte arrival, optional
+        """
+        super().__init__(timeout)
+        self.__interval = interval
+        self.__reconnect_interval = reconnect_interval
+        self.__rate_window = rate_window
+        self.__stats = stats
+        self.__channels: dict[typing.Hashable, ReactorChannel] = {}
+        self.__selector = selectors.DefaultSelector()
+        self.__lock = threading.Lock()
+        self.__reconnect_time = 0.0
+        self.__executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self.__logger = Logger(target='THREAD_REACTOR')
+
+    def attach(self, key: typing.Hashable, reader: SerialReader, parser: ParserBase, queue: Queue):
+        """
+        Start reading a port, thread-safe
+
+        :param key: Channel key, e.g. the device index
+        :param reader: SerialReader object
+        :param parser: String or Bytes Parser object
+        :param queue: A multithread Queue object
+        :return:
+        """
+        with self.__lock:
+            if key in self.__channels:
+                self.__detach(key)
+            self.__channels[key] = ReactorChannel(reader, parser, queue)
+
+    def detach(self, key: typing.Hashable):
+        """
+        Stop reading a port after taking its remaining messages, thread-safe
+
+        :param key: Channel key
+        :return:
+        """
+        with self.__lock:
+            if key not in self.__channels:
+                return
+            __channel = self.__detach(key)
+        self.__read(__channel)
+
+    def _task(self):
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='reactor_reconnect')
+        while self._on:
+            with self.__lock:
+                __polled = self.__register()
+            __wait = min(self.__interval, 0.010) if __polled else self.__interval
+            if self.__selector.get_map():
+                __events = self.__selector.select(__wait)
+            else:
+                __events = []
+                time.sleep(__wait)
+
+            with self.__lock:
+                for __key, _ in __events:
+                    __channel = self.__channels.get(__key.data)
+                    if __channel is None or __channel.fd != __key.fd:
+                        continue
+                    if self.__read(__channel) == 0:
+                        # Ready without data: the device is gone, closed here and reconnected in housekeeping
+                        __channel.reader.port.drop()
+                        self.__unregister(__channel)
+                for __channel in __polled:
+                    self.__read(__channel)
+                self.__housekeeping()
+
+        with self.__lock:
+            for __key in list(self.__channels):
+                self.__read(self.__detach(__key))
+        # An attempt in progress finishes on its own, the port is then left connected
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __register(self) -> list[ReactorChannel]:
+        # Follow port (re)connections, return the channels to poll
+        __polled = []
+        for __key, __channel in self.__channels.items():
+            __attempt = __channel.reconnecting
+            if __attempt is not None and __attempt.done():
+                __channel.reconnecting = None
+                if not __attempt.cancelled() and __attempt.exception() is None and __attempt.result():
+                    __channel.reconnects += 1
+            __port = __channel.reader.port
+            __device = __port.device if __port.is_connected() else None
+            if __device is not __channel.device:
+                self.__unregister(__channel)
+                __channel.device = __device
+                __channel.fd = __channel.reader.fileno if __device is not None else None
+                if __channel.fd is not None:
+                    self.__selector.register(__channel.fd, selectors.EVENT_READ, __key)
+            if __device is not None and __channel.fd is None:
+                __polled.append(__channel)
+        return __polled
+
+    def __unregister(self, channel: ReactorChannel):
+        # By descriptor, the device may already be closed
+        if channel.fd is not None:
+            try:
+                self.__selector.unregister(channel.fd)
+            except KeyError:
+                pass
+        channel.device = None
+        channel.fd = None
+
+    def __detach(self, key: typing.Hashable) -> ReactorChannel:
+        __channel = self.__channels.pop(key)
+        self.__unregister(__channel)
+        return __channel
+
+    def __read(self, channel: ReactorChannel) -> int:
+        __no_read = channel.reader.read()
+        channel.bytes += __no_read
+        self.__drain(channel)
+        return __no_read
+
+    def __drain(self, channel: ReactorChannel):
+        msgs, arrivals = channel.reader.get_messages_stamped(skip_empty=True)
+        if msgs:
+            channel.messages += parse_and_push(channel.parser, channel.queue, msgs, arrivals, self.__stats)
+
+    def __housekeeping(self):
+        __now = time.monotonic()
+        for __channel in self.__channels.values():
+            __channel.update_rates(__now, self.__rate_window)
+
+        if __now - self.__reconnect_time < self.__reconnect_interval:
+            return
+        self.__reconnect_time = __now
+        for __key, __channel in self.__channels.items():
+            if __channel.reconnecting is None and not __channel.reader.port.is_connected():
+                self.__logger.warn('Attempting to reconnect channel {}...'.format(__key))
+                # Registered by the next __register pass once connected
+                __channel.reconnecting = self.__executor.submit(__channel.reader.port.reconnect)
+
+    @property
+    def channels(self):
+        return tuple(self.__channels.keys())
+
+    @property
+    def throughput(self) -> dict:
+        """
+        Per-channel throughput: connection state, bytes and messages received, their rates over
+        the latest window, bytes and messages waiting, and reconnection count.
+
+        :return: Dictionary of channel key : throughput metrics
+        """
+        with self.__lock:
+            return {key: channel.throughput for key, channel in self.__channels.items()}
+
     @property
     def _logger(self):
         return self.__logger
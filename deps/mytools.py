@@ -1,9 +1,95 @@
 import numpy as np
 
 
+def __edges(n: int, n_buckets: int) -> np.ndarray:
+    # Start index of each of n_buckets near-equal buckets, none is empty when n >= n_buckets
+    return np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+
+
 def rebin_np(data: np.ndarray, new_length: int):
-    pass
+    """
+    Downsample by averaging near-equal buckets, NaN is ignored
+
+    :param data: 1D array
+    :param new_length: Number of buckets
+    :return: Array of bucket means, data itself if it is not longer than new_length
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if new_length < 1 or len(data) <= new_length:
+        return data
+    __starts = __edges(len(data), new_length)
+    __valid = ~np.isnan(data)
+    __count = np.add.reduceat(__valid.astype(np.int64), __starts)
+    __sum = np.add.reduceat(np.where(__valid, data, 0.0), __starts)
+    return np.divide(__sum, __count, out=np.full(new_length, np.nan), where=__count > 0)
 
 
 def rebin(data: list, new_length: int):
-    pass
+    """
+    Same as rebin_np for lists
+
+    :param data: List of numbers
+    :param new_length: Number of buckets
+    :return: List of bucket means
+    """
+    return rebin_np(np.asarray(data, dtype=np.float64), new_length).tolist()
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Min/max decimation: indices of the minimum and maximum of each near-equal bucket,
+    keeps every spike of the signal. NaN is ignored.
+
+    :param y: 1D array
+    :param n_buckets: Number of buckets, at most 2 points are kept per bucket
+    :return: Sorted unique indices
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if n_buckets < 1 or len(y) <= 2 * n_buckets:
+        return np.arange(len(y))
+    __starts = __edges(len(y), n_buckets)
+    __sizes = np.diff(np.append(__starts, len(y)))
+    __positions = np.arange(len(y))
+    __idx = []
+    for __fill, __reduce in ((np.inf, np.minimum), (-np.inf, np.maximum)):
+        __y = np.where(np.isnan(y), __fill, y)
+        __extreme = np.repeat(__reduce.reduceat(__y, __starts), __sizes)
+        # First position of the extreme in each bucket
+        __idx.append(np.minimum.reduceat(np.where(__y == __extreme, __positions, len(y)), __starts))
+    return np.unique(np.concatenate(__idx))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets decimation: keeps the first and last points, and from each
+    bucket in between, the point forming the largest triangle with the previous kept point
+    and the mean of the next bucket. NaN points are never chosen unless a bucket is all NaN.
+
+    :param x: 1D array of x values
+    :param y: 1D array of y values
+    :param n_out: Number of points to keep, at least 3
+    :return: Sorted indices
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    __n = len(y)
+    if n_out < 3 or __n <= n_out:
+        return np.arange(__n)
+
+    __bounds = np.linspace(1, __n - 1, n_out - 1).astype(np.int64)
+    __idx = np.empty(n_out, dtype=np.int64)
+    __idx[0], __idx[-1] = 0, __n - 1
+    __prev = 0
+    for i in range(n_out - 2):
+        __start, __stop = __bounds[i], __bounds[i + 1]
+        __next_start, __next_stop = __stop, (__bounds[i + 2] if i + 2 < len(__bounds) else __n)
+        __mx = np.nanmean(x[__next_start:__next_stop]) if __next_stop > __next_start else x[-1]
+        __my = np.nanmean(y[__next_start:__next_stop]) if __next_stop > __next_start else y[-1]
+        __area = np.abs(
+            (x[__prev] - __mx) * (y[__start:__stop] - y[__prev]) -
+            (x[__prev] - x[__start:__stop]) * (__my - y[__prev])
+        )
+        __area = np.where(np.isnan(__area), -1.0, __area)
+        __prev = __start + int(np.argmax(__area))
+        __idx[i + 1] = __prev
+    return __idx
@@ -0,0 +1,224 @@
+import time
+import threading
+import numpy as np
+import serial
+from .base.__ThreadBase import ThreadBase
+from .base.__HardwarePort import SerialPort
+from .mygis import GeoCoordinate, GeoPair
+from .mylogger import Logger
+
+
+class AlphaBetaFilter:
+    def __init__(self, alpha: float = 0.85, beta: float = 0.6, max_extrapolation: float = 2.0):
+        """
+        Alpha-beta (constant velocity) filter of a position vector, for prediction between sparse fixes.
+
+        The velocity starts from the first two fixes, then each fix corrects the predicted
+        position by alpha and the velocity by beta times the residual.
+        The default gains are close to beta = alpha^2 / (2 - alpha) (Benedict-Bordner), so the velocity
+        follows an acceleration (e.g. a boost off the pad) within a few fixes. A small beta smooths
+        a noisy velocity but freezes it, then the prediction lags further than holding the latest fix.
+
+        :param alpha: Position gain, 0 to 1, default is 0.85
+        :param beta: Velocity gain, 0 to 2, default is 0.6
+        :param max_extrapolation: Prediction horizon in s after the latest fix, the position is held beyond it,
+            default is 2 s
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.max_extrapolation = max_extrapolation
+        self.__x: np.ndarray | None = None
+        self.__v: np.ndarray | None = None
+        self.__t = 0.0
+        self.__count = 0
+
+    def reset(self):
+        self.__x = None
+        self.__v = None
+        self.__t = 0.0
+        self.__count = 0
+
+    def update(self, t: float, z) -> np.ndarray:
+        """
+        Correct the state with a new fix, fixes older than the latest one are ignored
+
+        :param t: Time of the fix in s, e.g. time.monotonic() at byte arrival
+        :param z: Measured position vector
+        :return: Filtered position
+        """
+        z = np.asarray(z, dtype=np.float64)
+        if self.__x is None:
+            self.__x, self.__v, self.__t = z.copy(), np.zeros_like(z), t
+            self.__count = 1
+            return self.__x
+        __dt = t - self.__t
+        if __dt <= 0:
+            return self.__x
+
+        if self.__count == 1:
+            # Two-point start, instead of converging from zero velocity
+            self.__v = (z - self.__x) / __dt
+            self.__x = z.copy()
+        else:
+            __predicted = self.__x + self.__v * __dt
+            __residual = z - __predicted
+            self.__x = __predicted + self.alpha * __residual
+            self.__v = self.__v + (self.beta / __dt) * __residual
+        self.__t = t
+        self.__count += 1
+        return self.__x
+
+    def predict(self, t: float) -> np.ndarray | None:
+        """
+        Extrapolated position at a time
+
+        :param t: Time in s, same clock as update
+        :return: Position, None before the first fix
+        """
+        if self.__x is None:
+            return None
+        __dt = min(max(t - self.__t, 0.0), self.max_extrapolation)
+        return self.__x + self.__v * __dt
+
+    @property
+    def ready(self) -> bool:
+        return self.__x is not None
+
+    @property
+    def position(self):
+        return self.__x
+
+    @property
+    def velocity(self):
+        return self.__v
+
+    @property
+    def last_update(self) -> float:
+        return self.__t
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+
+class ThreadTracker(ThreadBase):
+    def __init__(self, port: SerialPort,
+                 home: GeoCoordinate,
+                 rate: float = 50.0,
+                 alpha: float = 0.85,
+                 beta: float = 0.6,
+                 max_extrapolation: float = 2.0,
+                 command: str = '{az:.2f},{el:.2f}\n',
+                 timeout: float = 1.000):
+        """
+        Antenna tracker pointing thread.
+
+        GPS fixes (``update``) go through an alpha-beta filter on latitude, longitude and altitude.
+        At a fixed rate, the position is extrapolated to now, pointed at from home,
+        and the command is written to the tracker port.
+
+        :param port: SerialPort of the tracker, the thread does not connect it
+        :param home: Tracker (ground station) coordinate
+        :param rate: Command rate in Hz, default is 50
+        :param alpha: Position gain of the filter, default is 0.85
+        :param beta: Velocity gain of the filter, default is 0.6
+        :param max_extrapolation: Prediction horizon in s after the latest fix, default is 2 s
+        :param command: Command format, with fields az (0 to 360 degrees), el (degrees), los and hcd (m),
+            default is "{az:.2f},{el:.2f}" and newline
+        :param timeout: Thread joining timeout in s
+        """
+        super().__init__(timeout)
+        self.__port = port
+        self.__home = home
+        self.__rate = rate
+        self.__command = command
+        self.__filter = AlphaBetaFilter(alpha, beta, max_extrapolation)
+        self.__lock = threading.Lock()
+        self.__pointing = {}
+        self.__sent = 0
+        self.__errors = 0
+        self.__late = 0
+        self.__logger = Logger(target='THREAD_TRACKER')
+
+    def update(self, t: float, coord: GeoCoordinate):
+        """
+        Feed a GPS fix, thread-safe
+
+        :param t: Time of the fix in s, time.monotonic() clock
+        :param coord: Coordinate of the fix
+        :return:
+        """
+        with self.__lock:
+            self.__filter.update(t, (coord.lat, coord.lon, coord.alt))
+
+    def point(self, t: float) -> dict | None:
+        """
+        Pointing from home to the position predicted at a time
+
+        :param t: Time in s, time.monotonic() clock
+        :return: Dictionary of az, el, los, hcd and the age of the latest fix in s, None before the first fix
+        """
+        with self.__lock:
+            __position = self.__filter.predict(t)
+            __age = t - self.__filter.last_update
+        if __position is None:
+            return None
+        __pair = GeoPair(self.__home, GeoCoordinate(*__position.tolist()))
+        return {
+            'az': __pair.azimuth % 360.0,
+            'el': __pair.elevation_approx,
+            'los': __pair.line_of_sight,
+            'hcd': __pair.ground_distance,
+            'age': __age
+        }
+
+    def _task(self):
+        __period = 1.0 / self.__rate
+        __next = time.monotonic()
+        while self._on:
+            __now = time.monotonic()
+            if __now < __next:
+                time.sleep(__next - __now)
+                __now = time.monotonic()
+            __next += __period
+            if __next < __now:
+                # Fell behind by more than one period, skip the missed ticks
+                self.__late += 1
+                __next = __now + __period
+
+            __pointing = self.point(__now)
+            if __pointing is None:
+                continue
+            self.__pointing = __pointing
+            self.__send(self.__command.format(**__pointing))
+
+    def __send(self, command: str):
+        if not self.__port.is_connected():
+            return
+        try:
+            self.__port.device.write(command.encode('ascii'))
+            self.__sent += 1
+        except (serial.SerialException, OSError, AttributeError):
+            # Port closed in between, auto reconnect takes over
+            self.__errors += 1
+
+    @property
+    def filter(self):
+        return self.__filter
+
+    @property
+    def port(self):
+        return self.__port
+
+    @property
+    def pointing(self) -> dict:
+        """
+        Latest pointing sent and command counters
+
+        :return: Dictionary of az, el, los, hcd, age, sent, errors and late ticks
+        """
+        return {**self.__pointing, 'sent': self.__sent, 'errors': self.__errors, 'late': self.__late}
+
+    @property
+    def _logger(self):
+        return self.__logger
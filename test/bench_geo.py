@@ -0,0 +1,140 @@
+"""
+Micro-benchmark of the per-message coordinate path: GeoCoordinate construction, truth test,
+KML validity check and pointing from home, against the dataclass it replaced,
+plus the vectorized GeoPairArray over a whole track.
+
+Example: python test/bench_geo.py --count 100000
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import tracemalloc
+import dataclasses
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+
+
+@dataclasses.dataclass(order=True, eq=True)
+class LegacyGeoCoordinate:
+    """
+    Reference of GeoCoordinate before slots: converting __post_init__, asdict in __len__
+    """
+    lat: int | float | str = 0.0
+    lon: int | float | str = 0.0
+    alt: int | float | str = 0.0
+
+    def __post_init__(self):
+        try:
+            if self.lat is None:
+                self.lat = 0.0
+            else:
+                self.lat = float(self.lat)
+        except ValueError:
+            self.lat = 0.0
+
+        try:
+            if self.lon is None:
+                self.lon = 0.0
+            else:
+                self.lon = float(self.lon)
+        except ValueError:
+            self.lon = 0.0
+
+        try:
+            if self.alt is None:
+                self.alt = 0.0
+            else:
+                self.alt = float(self.alt)
+        except ValueError:
+            self.alt = 0.0
+
+    def __bool__(self):
+        return self.__len__() > 0
+
+    def __len__(self):
+        return sum((x is not None for x in dataclasses.asdict(self).values()))
+
+    def valid(self) -> bool:
+        return 1 <= math.fabs(self.lat) <= 90 and 1 <= math.fabs(self.lon) <= 180
+
+
+def bench(name: str, func, count: int, repeat: int = 5):
+    # Best of repeat runs
+    dt = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        dt = min(dt, time.perf_counter() - t0)
+    print('{:<32}{:>10.3f} us/msg{:>14.0f} msg/s'.format(name, 1e6 * dt / count, count / dt))
+    return dt
+
+
+def memory(name: str, make, count: int):
+    tracemalloc.start()
+    objects = make()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<32}{:>10.1f} B/object'.format(name, size / count))
+    return objects
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description='GeoCoordinate micro-benchmark')
+    args.add_argument('--count', type=int, default=100_000, help='Number of messages')
+    args.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = args.parse_args()
+    random.seed(args.seed)
+
+    n = args.count
+    rows = [(13.7 + random.gauss(0, 0.5), 100.5 + random.gauss(0, 0.5), random.uniform(0, 30_000)) for _ in range(n)]
+    raw = [tuple(str(v) for v in row) for row in rows]
+    home = GeoCoordinate(13.73, 100.52, 12.0)
+
+    assert GeoCoordinate.parse(*raw[0]) == GeoCoordinate(*(float(v) for v in raw[0]))
+    assert GeoCoordinate.parse(None, 'x', '') == GeoCoordinate()
+
+    print('construction')
+    t_legacy = bench('legacy (floats)', lambda: [LegacyGeoCoordinate(*row) for row in rows], n)
+    t_fast = bench('GeoCoordinate (floats)', lambda: [GeoCoordinate(*row) for row in rows], n)
+    t_parse = bench('GeoCoordinate.parse (floats)', lambda: [GeoCoordinate.parse(*row) for row in rows], n)
+    bench('legacy (strings)', lambda: [LegacyGeoCoordinate(*row) for row in raw], n)
+    bench('GeoCoordinate.parse (strings)', lambda: [GeoCoordinate.parse(*row) for row in raw], n)
+    print('speedup fast: {:.2f}x, parse: {:.2f}x'.format(t_legacy / t_fast, t_legacy / t_parse))
+
+    print('\ntruth test and KML check')
+    legacy = [LegacyGeoCoordinate(*row) for row in rows]
+    coords = [GeoCoordinate(*row) for row in rows]
+    t_legacy = bench('legacy', lambda: [bool(c) and c.valid() for c in legacy], n)
+    t_fast = bench('GeoCoordinate', lambda: [bool(c) and c.valid() for c in coords], n)
+    print('speedup: {:.2f}x'.format(t_legacy / t_fast))
+
+    print('\nmemory')
+    del legacy, coords
+    memory('legacy', lambda: [LegacyGeoCoordinate(*row) for row in rows], n)
+    memory('GeoCoordinate', lambda: [GeoCoordinate(*row) for row in rows], n)
+
+    print('\npointing from home')
+    lat, lon, alt = (np.array(col) for col in zip(*rows))
+    t_scalar = bench('GeoPair per message', lambda: [
+        (p.azimuth, p.elevation_approx, p.line_of_sight, p.ground_distance)
+        for p in (GeoPair(home, GeoCoordinate(*row)) for row in rows)
+    ], n)
+
+    def vectorized():
+        pairs = GeoPairArray.from_home(home, lat, lon, alt)
+        return pairs.azimuth, pairs.elevation_approx, pairs.line_of_sight, pairs.ground_distance
+
+    t_vector = bench('GeoPairArray over the track', vectorized, n)
+    print('speedup: {:.2f}x'.format(t_scalar / t_vector))
+
+    pairs = GeoPairArray.from_home(home, lat, lon, alt)
+    for key in ('azimuth', 'elevation_approx', 'line_of_sight', 'ground_distance'):
+        scalar = np.array([getattr(GeoPair(home, GeoCoordinate(*row)), key) for row in rows[:1000]])
+        assert np.allclose(getattr(pairs, key)[:1000], scalar, rtol=1e-12, atol=1e-9), key
@@ -0,0 +1,65 @@
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+
+
+def parse_legacy(parser: ParserBase, delimiter: str, data: str):
+    """
+    Reference of the per-message path before the parser was precompiled
+    """
+    __data_cleaned = re.sub(re.escape(delimiter) + '+', delimiter, data)
+    __data_dict = parser.make_blank()
+    for k, v in zip(__data_dict.keys(), __data_cleaned.split(delimiter)):
+        __data_dict[k] = ParserBase.final_type(v)
+    return __data_dict
+
+
+def make_line(n_fields: int, i: int):
+    fields = [str(i), str(i * 10), str(i * 100)]
+    fields += ['{:.4f}'.format(random.uniform(-100, 100)) if j % 2 else str(random.randint(0, 9))
+               for j in range(3, n_fields)]
+    return ','.join(fields)
+
+
+def bench(name: str, func, lines: list[str]):
+    t0 = time.perf_counter()
+    for line in lines:
+        func(line)
+    dt = time.perf_counter() - t0
+    print('{:<24}{:>10.2f} us/msg{:>12.0f} msg/s'.format(name, 1e6 * dt / len(lines), len(lines) / dt))
+    return dt
+
+
+if __name__ == '__main__':
+    data_format = PreferencesTree.from_file(
+        os.path.join(os.path.dirname(__file__), '..', 'data_format.json')
+    )
+    names = ParserBase.field_names(data_format['0'])
+    typed = [{'name': k, 'type': 'float' if j % 2 else 'int'} if j >= 3 else {'name': k, 'type': 'int'}
+             for j, k in enumerate(names)]
+
+    lines = [make_line(len(names), i) for i in range(50_000)]
+
+    parser_auto = StringParser(names)
+    parser_typed = StringParser(typed)
+
+    assert parser_auto.parse(lines[0]) == parse_legacy(parser_auto, ',', lines[0])
+    assert parser_typed.parse(lines[0]) == parse_legacy(parser_auto, ',', lines[0])
+
+    t_legacy = bench('legacy', lambda x: parse_legacy(parser_auto, ',', x), lines)
+    t_auto = bench('precompiled (auto)', parser_auto.parse, lines)
+    t_typed = bench('precompiled (typed)', parser_typed.parse, lines)
+
+    print('speedup auto: {:.2f}x, typed: {:.2f}x'.format(t_legacy / t_auto, t_legacy / t_typed))
+
+    t0 = time.perf_counter()
+    columns, valid = parser_typed.parse_many(lines)
+    dt = time.perf_counter() - t0
+    assert valid.all()
+    print('{:<24}{:>10.2f} us/msg{:>12.0f} msg/s'.format('parse_many (typed)', 1e6 * dt / len(lines), len(lines) / dt))
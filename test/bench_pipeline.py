@@ -0,0 +1,212 @@
+"""
+End-to-end pipeline benchmark over pseudo-terminal pairs (Linux/macOS only).
+
+For each device, a sender writes synthetic frames matching data_format.json into the master
+side of a PTY at a fixed rate. The slave side goes through the real pipeline:
+SerialPort -> SerialReader -> ThreadSerial -> StringParser -> Queue -> consumer (like the GUI backend)
+-> Queue -> ThreadFileWriter -> FileWriter.
+
+Every frame carries its sequence number, so each stage can be timed per frame:
+    serial  send -> parse start (PTY, read and framing)
+    parse   parse start -> parse end
+    queue   parse end -> consumer pop
+    file    consumer pop -> FileWriter.append_many
+    total   send -> FileWriter.append_many
+
+Example: python test/bench_pipeline.py --rate 200 --duration 10
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import threading
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+
+SETTINGS = os.path.join(os.path.dirname(__file__), '..', 'settings.json')
+DATA_FORMAT = os.path.join(os.path.dirname(__file__), '..', 'data_format.json')
+
+
+class TimedParser(ParserBase):
+    def __init__(self, parser: ParserBase, seq_key: str):
+        """
+        Parser wrapper recording parse start and end of each frame by sequence number
+        """
+        super().__init__(parser.data_format)
+        self.parser = parser
+        self.seq_key = seq_key
+        self.parse_start = {}
+        self.parse_end = {}
+
+    def parse(self, data):
+        __t0 = time.monotonic_ns()
+        __dict = self.parser.parse(data)
+        __t1 = time.monotonic_ns()
+        __seq = __dict[self.seq_key]
+        self.parse_start[__seq] = __t0
+        self.parse_end[__seq] = __t1
+        return __dict
+
+
+class TimedFileWriter(FileWriter):
+    def __init__(self, *args, seq_index: int, **kwargs):
+        """
+        FileWriter recording when each row reached the file buffer by sequence number
+        """
+        super().__init__(*args, **kwargs)
+        self.seq_index = seq_index
+        self.written = {}
+
+    def append_many(self, data, delimiter: str = ','):
+        super().append_many(data, delimiter)
+        __t = time.monotonic_ns()
+        for row in data:
+            self.written[row[self.seq_index]] = __t
+
+
+class Device:
+    def __init__(self, device_id: str, names: list[str], header: str, delimiter: str, folder: str):
+        self.device_id = device_id
+        self.names = names
+        self.header = header
+        self.delimiter = delimiter
+        self.seq_index = names.index('Packet Counter') if 'Packet Counter' in names else 0
+        self.sent = {}
+        self.popped = {}
+
+        self.master, self.slave = os.openpty()
+        self.port = SerialPort()
+        if not self.port.connect(os.ttyname(self.slave), 115200, auto_reconnect=False, override=True):
+            raise NoDeviceFoundException('Cannot open PTY "{}"!'.format(os.ttyname(self.slave)))
+
+        self.reader = SerialReader(self.port)
+        self.parser = TimedParser(
+            StringParser(names, delimiter=delimiter, header=header or None), names[self.seq_index]
+        )
+        self.queue = Queue()
+        self.queue_csv = Queue()
+        self.writer = TimedFileWriter(
+            os.path.join(folder, 'bench'), 'bench', 'csv',
+            device_id=device_id, folder_name=folder, seq_index=self.seq_index
+        )
+        self.thread_serial = ThreadSerial(self.reader, self.parser, self.queue)
+        self.thread_writer = ThreadFileWriter(self.writer, self.queue_csv, Queue())
+        self.__on = False
+        self.__thread_consumer = threading.Thread(target=self.__consume, daemon=True)
+
+    def frame(self, seq: int) -> bytes:
+        fields = ['{:.4f}'.format(random.uniform(-100, 100)) for _ in self.names]
+        fields[self.seq_index] = str(seq)
+        return (self.header + self.delimiter.join(fields) + '\n').encode('ascii')
+
+    def start(self):
+        self.__on = True
+        self.thread_writer.start()
+        self.thread_serial.start()
+        self.__thread_consumer.start()
+
+    def stop(self):
+        self.thread_serial.stop()
+        self.__on = False
+        self.__thread_consumer.join()
+        self.thread_writer.stop()
+        self.port.disconnect()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def __consume(self):
+        # Same hand-off as the GUI backend: pop everything, push rows to the file writer
+        while self.__on or self.queue.available():
+            items = self.queue.get_many(timeout=0.100)
+            __t = time.monotonic_ns()
+            for item in items:
+                self.popped[item[self.names[self.seq_index]]] = __t
+            self.queue_csv.push_many(list(item.values()) for item in items)
+
+
+def send(devices: list[Device], rate: float, duration: float):
+    """
+    Write one frame per device every 1/rate s on an absolute schedule
+    """
+    __period = 1.0 / rate
+    __count = int(rate * duration)
+    __t0 = time.monotonic()
+    for seq in range(__count):
+        __delay = __t0 + seq * __period - time.monotonic()
+        if __delay > 0:
+            time.sleep(__delay)
+        for device in devices:
+            __frame = device.frame(seq)
+            device.sent[seq] = time.monotonic_ns()
+            os.write(device.master, __frame)
+    return time.monotonic() - __t0
+
+
+def percentiles(name: str, start: dict, end: dict):
+    __keys = start.keys() & end.keys()
+    if not __keys:
+        print('{:<10}{:>12}'.format(name, 'n/a'))
+        return
+    __us = np.fromiter((end[k] - start[k] for k in __keys), dtype=np.float64, count=len(__keys)) / 1e3
+    __p = np.percentile(__us, [50, 95, 99])
+    print('{:<10}{:>12.1f}{:>12.1f}{:>12.1f}{:>12.1f}'.format(name, *__p, __us.max()))
+
+
+def report(device: Device, elapsed: float):
+    __sent = len(device.sent)
+    __received = len(device.parser.parse_end)
+    __written = len(device.writer.written)
+    print('\n[device {}] sent {}, parsed {}, written {}, dropped {} in {:.2f} s'.format(
+        device.device_id, __sent, __received, __written, __sent - __written, elapsed
+    ))
+    print('sustained {:.0f} msg/s, reader overflow {} B, queue dropped {}, max batch {}'.format(
+        __written / elapsed, device.reader.overflow, device.queue.dropped, device.thread_serial.backlog['max_batch']
+    ))
+    print('{:<10}{:>12}{:>12}{:>12}{:>12}'.format('stage (us)', 'p50', 'p95', 'p99', 'max'))
+    percentiles('serial', device.sent, device.parser.parse_start)
+    percentiles('parse', device.parser.parse_start, device.parser.parse_end)
+    percentiles('queue', device.parser.parse_end, device.popped)
+    percentiles('file', device.popped, device.writer.written)
+    percentiles('total', device.sent, device.writer.written)
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description='PTY loopback pipeline benchmark')
+    args.add_argument('--rate', type=float, default=100.0, help='Frames per second per device')
+    args.add_argument('--duration', type=float, default=5.0, help='Sending time in s')
+    args.add_argument('--devices', nargs='+', default=['0', '1'], help='Device ids from data_format.json')
+    args.add_argument('--seed', type=int, default=0, help='Random seed for frame content')
+    args = args.parse_args()
+    random.seed(args.seed)
+
+    settings = PreferencesTree.from_file(SETTINGS)
+    data_format = PreferencesTree.from_file(DATA_FORMAT)
+    folder = tempfile.mkdtemp(prefix='bench_pipeline_')
+
+    devices = [Device(
+        i,
+        ParserBase.field_names(data_format[i]),
+        settings['headers'][i] if i in settings['headers'] else '',
+        settings['delimiters'][i] if i in settings['delimiters'] else ',',
+        folder
+    ) for i in args.devices]
+
+    for device in devices:
+        device.start()
+    elapsed = send(devices, args.rate, args.duration)
+    # Let the pipeline drain before stopping
+    time.sleep(0.500)
+    for device in devices:
+        device.stop()
+
+    print('{} frames/s x {} device(s) for {:.0f} s, files in {}'.format(
+        args.rate, len(devices), args.duration, folder
+    ))
+    for device in devices:
+        report(device, elapsed)
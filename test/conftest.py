@@ -0,0 +1,2 @@
+# Hardware scripts, they open a serial port on import
+collect_ignore = ['img/test_jpeg_deser.py']
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+
+
+def test_ring_wraparound():
+    data = Data(['a', 'b'], capacity=4)
+    for k in range(1, 7):
+        data.push([k, k * 10])
+    assert len(data) == 4 and data.capacity == 4
+    assert data.column('a').tolist() == [3, 4, 5, 6]
+    assert data.front().tolist() == [3, 30] and data.back().tolist() == [6, 60]
+    assert data.tail(2)['b'].tolist() == [50, 60]
+
+
+def test_values():
+    data = Data(['a', 'b', 'c'])
+    data.push([1, None, 2.5])
+    data.push([2, 3, 'x'])
+    assert data.back().tolist() == [2, 3, 'x']
+    assert isinstance(data.front()['a'], int) and data.front()['b'] is None
+    assert np.isnan(data.column('b')[0])
+    # Non-numeric values promote the column to objects
+    assert data.column('c').dtype == object and data.column('c').tolist() == [2.5, 'x']
+    # Rows of the wrong width are ignored
+    data.push([1, 2])
+    assert len(data) == 2
+
+
+def test_retention_rows():
+    data = Data(['a'], trim_len=5)
+    for k in range(8):
+        data.push([k])
+    assert data.column('a').tolist() == [3, 4, 5, 6, 7]
+    assert data.capacity <= 8
+
+
+def test_retention_age():
+    data = Data(['a'], max_age=0.05)
+    data.push([1])
+    data.push([2])
+    time.sleep(0.1)
+    data.push([3])
+    assert data.column('a').tolist() == [3]
+
+
+def test_retention_bytes():
+    # Time stamp and sequence number, and 2 float columns: 32 bytes per row
+    data = Data(['a', 'b'], max_bytes=320)
+    for k in range(20):
+        data.push([k, k])
+    assert len(data) == 10 and data.capacity == 10
+    assert data.column('a').tolist() == list(range(10, 20))
+
+    # An object column takes more bytes per row, fewer rows are kept
+    data.push([20, 'x'])
+    assert len(data) == 320 // (16 + 8 + 8 + Data.OBJECT_BYTES)
+    assert data.back().tolist() == [20, 'x']
+    assert data.memory_usage() <= 320
+
+
+def test_tail_since():
+    data = Data(['a'], trim_len=4)
+    assert data.tail_since(0)[0].empty
+    data.push([1])
+    data.push([2])
+    rows, seq = data.tail_since(0)
+    assert rows['a'].tolist() == [1, 2] and seq == 2
+    data.push([3])
+    assert data.tail_since(seq)[0]['a'].tolist() == [3]
+    assert data.tail_since(0, max_rows=2)[0]['a'].tolist() == [2, 3]
+
+    # Popped rows are not streamed, nor do they shift the rows after them
+    data.pop()
+    data.push([4])
+    assert data.tail_since(seq)[0]['a'].tolist() == [4]
+    data.pop(0)
+    assert data.tail_since(0)[0]['a'].tolist() == [2, 4]
+    assert data.tail_since(1)[0]['a'].tolist() == [2, 4]
+
+    # Evicted by retention, wrapped around the ring
+    for k in range(5, 10):
+        data.push([k])
+    rows, seq = data.tail_since(7)
+    assert rows['a'].tolist() == [8, 9] and seq == data.seq
+    assert data.tail_since(0)[0]['a'].tolist() == [6, 7, 8, 9]
+
+    # Ahead of the data (cleared meanwhile): everything is new
+    data.clear()
+    data.push([10])
+    assert data.tail_since(seq + 5)[0]['a'].tolist() == [10]
+
+
+def test_copy():
+    data = Data(['a'], trim_len=3)
+    for k in range(5):
+        data.push([k])
+    copied = data.copy()
+    data.push([5])
+    assert copied.column('a').tolist() == [2, 3, 4]
+    assert copied.tail_since(4)[0]['a'].tolist() == [4]
+
+
+if __name__ == '__main__':
+    test_ring_wraparound()
+    test_values()
+    test_retention_rows()
+    test_retention_age()
+    test_retention_bytes()
+    test_tail_since()
+    test_copy()
+    print('OK')
@@ -1,6 +1,86 @@
-import time
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
 from deps import *
-import threading
+
+
+def test_cobs():
+    for data in (b'', b'\x00', b'\x11\x22\x00\x33', bytes(range(1, 255)), bytes(300)):
+        assert BytesParser.cobs_decode(BytesParser.cobs_encode(data)) == data
+
+    # Truncated frames: the last code byte points past the end
+    for frame in (b'\x03\x11', b'\x02\x11\x03\x22', b'\x05\x11\x22\x33'):
+        try:
+            BytesParser.cobs_decode(frame)
+        except ValueError:
+            continue
+        raise AssertionError('Truncated frame {} was decoded'.format(frame))
+
+
+
+GPS_FORMAT = [
+    {'name': 'lat', 'type': 'float'},
+    {'name': 'lon', 'type': 'float'},
+    {'name': 'alt', 'type': 'int'},
+    {'name': 'sats', 'type': 'int'}
+]
+
+
+def test_padded_space_delimiter():
+    parser = StringParser(GPS_FORMAT, delimiter=' ', header='@ GPS_STAT ')
+    line = '@ GPS_STAT 13.7  100.5   42 7'
+    assert parser.parse(line) == {'lat': 13.7, 'lon': 100.5, 'alt': 42, 'sats': 7}
+
+    columns, valid = parser.parse_many([line, '@ GPS_STAT 1 2 3 4', 'GPS 1 2 3 4'])
+    assert valid.tolist() == [True, True, False]
+    assert columns['lon'][:2].tolist() == [100.5, 2.0]
+    assert columns['alt'].dtype == np.int64 and columns['alt'][:2].tolist() == [42, 3]
+
+
+def test_declared_types():
+    parser = StringParser(GPS_FORMAT)
+    columns, valid = parser.parse_many(['1.5,2,3,4', '1,2,3.5,4', '1,2,x,4', '1,2,3'])
+    assert valid.tolist() == [True, False, False, False]
+    assert columns['lat'].dtype == np.float64 and columns['lat'][0] == 1.5
+    assert columns['alt'].dtype == np.int64 and columns['alt'].tolist() == [3, 0, 0, 0]
+    assert parser.parse('1,2,3,4') == {'lat': 1.0, 'lon': 2.0, 'alt': 3, 'sats': 4}
+
+
+def test_empty_int_field():
+    # Collapsed by default: the row is one field short
+    parser = StringParser(GPS_FORMAT)
+    columns, valid = parser.parse_many(['1,2,,4', '1,2,3,4'])
+    assert valid.tolist() == [False, True]
+    assert columns['alt'].dtype == np.int64
+
+    # Opt-in: a missing value of a valid row, the integer column becomes float with NaN
+    parser = StringParser(GPS_FORMAT, keep_empty=True)
+    assert parser.parse('1,2,,4') == {'lat': 1.0, 'lon': 2.0, 'alt': None, 'sats': 4}
+    columns, valid = parser.parse_many(['1,2,,4', '1,2,3,4'])
+    assert valid.tolist() == [True, True]
+    assert columns['alt'].dtype == np.float64
+    assert np.isnan(columns['alt'][0]) and columns['alt'][1] == 3
+    assert columns['sats'].dtype == np.int64
+
+
+def test_unparse_round_trip():
+    row = {'lat': 13.7, 'lon': -100.5, 'alt': 42, 'sats': 7}
+    for parser in (StringParser(GPS_FORMAT, delimiter=' ', header='@ GPS_STAT '),
+                   StringParser(GPS_FORMAT, header='<1>', tail='!')):
+        assert parser.parse(parser.unparse(row)) == row
+
+    parser = StringParser(GPS_FORMAT, keep_empty=True)
+    row = {'lat': 13.7, 'lon': None, 'alt': 42, 'sats': None}
+    assert parser.parse(parser.unparse(row)) == row
+
 
 if __name__ == '__main__':
-    pass
+    test_cobs()
+    test_padded_space_delimiter()
+    test_declared_types()
+    test_empty_int_field()
+    test_unparse_round_trip()
+    print('OK')
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+
+
+def later(delay: float, function, *args):
+    thread = threading.Timer(delay, function, args)
+    thread.start()
+    return thread
+
+
+def test_drop_oldest():
+    queue = Queue(maxlen=3)
+    assert all(queue.push(k) for k in range(3))
+    assert queue.push(3)
+    assert queue.push_many([4, 5]) == 2
+    assert queue.get_many() == [3, 4, 5]
+    assert queue.dropped == 3
+
+
+def test_drop_newest():
+    queue = Queue(maxlen=3, policy=Queue.DROP_NEWEST)
+    assert queue.push_many(range(5)) == 3
+    assert not queue.push(5)
+    assert queue.get_many() == [0, 1, 2]
+    assert queue.dropped == 3
+
+
+def test_block():
+    queue = Queue(maxlen=1, policy=Queue.BLOCK)
+    assert queue.push(0)
+    t0 = time.monotonic()
+    assert not queue.push(1, timeout=0.05)
+    assert time.monotonic() - t0 >= 0.05
+    assert queue.dropped == 1
+
+    # The producer waits until the consumer makes room
+    later(0.05, queue.get)
+    assert queue.push(2, timeout=1.0)
+    assert queue.get_many() == [2]
+
+
+def test_blocking_get():
+    queue = Queue()
+    assert queue.get(timeout=0.01) is None
+    assert queue.get_many(timeout=0.01) == []
+    later(0.05, queue.push_many, [1, 2, 3])
+    t0 = time.monotonic()
+    assert queue.get_many(max_n=2, timeout=1.0) == [1, 2]
+    assert time.monotonic() - t0 < 0.5
+    assert queue.front() == 3 and queue.back() == 3 and queue.available()
+    assert queue.get() == 3
+    assert queue.front() is None and not queue.available()
+
+
+def test_stamps():
+    queue = Queue()
+    queue.push(0, stamp=1.0)
+    queue.push_many([1, 2], stamp=2.0)
+    queue.push_many([3, 4], stamps=[3.0, 4.0])
+    t0 = time.monotonic()
+    queue.push(5)
+    items, stamps = queue.get_many_stamped()
+    assert items == [0, 1, 2, 3, 4, 5]
+    assert stamps[:5] == [1.0, 2.0, 2.0, 3.0, 4.0] and stamps[5] >= t0
+    assert queue.oldest_age() == 0.0
+
+
+def test_subscribe():
+    queues = [Queue(), Queue()]
+    event = threading.Event()
+    for queue in queues:
+        queue.subscribe(event)
+
+    # One event wakes up the consumer of many queues
+    later(0.05, queues[1].push, 'x')
+    assert event.wait(1.0)
+    event.clear()
+    assert queues[1].get_many() == ['x']
+
+    queues[0].push_many([])
+    assert not event.is_set()
+    queues[0].push_many([1])
+    assert event.is_set()
+
+
+if __name__ == '__main__':
+    test_drop_oldest()
+    test_drop_newest()
+    test_block()
+    test_blocking_get()
+    test_stamps()
+    test_subscribe()
+    print('OK')
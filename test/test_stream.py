@@ -0,0 +1,124 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+from deps.base.__HardwareCommunication import StreamBuffer
+
+
+class ChunkDevice:
+    """ serial.Serial stand-in handing out queued chunks, one per readinto """
+
+    def __init__(self):
+        self.chunks = []
+        self.timeout = None
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def readinto(self, view):
+        chunk = self.chunks.pop(0)
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class ChunkPort:
+    def __init__(self):
+        self.device = ChunkDevice()
+
+    def is_connected(self):
+        return True
+
+    def drop(self):
+        pass
+
+
+def test_take_and_find():
+    stream = StreamBuffer(16)
+    stream.extend(b'ab\ncd\nef')
+    assert stream.find(b'\n') == 2 and stream.rfind(b'\n') == 5
+    assert stream.take(2, 1) == b'ab'
+    # Positions are relative to the read cursor
+    assert stream.find(b'\n') == 2 and stream.rfind(b'\n') == 2
+    assert stream.take(2, 1) == b'cd'
+    assert stream.getvalue() == b'ef' and len(stream) == 2
+
+
+def test_wraparound():
+    stream = StreamBuffer(16)
+    stream.extend(b'0123456789')
+    assert stream.take(8) == b'01234567'
+    # No room at the end: unread bytes move back to the front
+    stream.extend(b'abcdefghij')
+    assert stream.getvalue() == b'89abcdefghij'
+    assert stream.last(3) == b'hij'
+    assert stream.overflow == 0
+
+    # Taking everything resets the cursors
+    stream.take(len(stream))
+    assert len(stream) == 0
+    assert stream.fill(lambda view: view.__setitem__(slice(0, 4), b'wxyz') or 4, 4) == 4
+    assert stream.getvalue() == b'wxyz'
+
+
+def test_overflow():
+    stream = StreamBuffer(8)
+    stream.extend(b'abcdef')
+    # Full: the oldest bytes are dropped
+    stream.extend(b'ghijkl')
+    assert stream.getvalue() == b'efghijkl'
+    assert stream.overflow == 4
+
+    stream.extend(b'0123456789')
+    assert stream.getvalue() == b'23456789'
+    assert stream.overflow == 4 + 8 + 2
+
+
+def test_arrival_stamps():
+    port = ChunkPort()
+    reader = SerialReader(port, buffer_size=64)
+    assert reader.get_messages_stamped() == ([], [])
+    assert reader.get_message_stamped() == ('', 0.0)
+
+    arrivals = []
+    for chunk in (b'a,1\nb,', b'2\n\nc', b',3\nd'):
+        port.device.chunks.append(chunk)
+        reader.read()
+        arrivals.append(reader.last_read)
+
+    # Each message gets the arrival of the chunk holding its terminator
+    msgs, stamps = reader.get_messages_stamped()
+    assert msgs == ['a,1', 'b,2', '', 'c,3']
+    assert stamps == [arrivals[0], arrivals[1], arrivals[1], arrivals[2]]
+    assert reader.get_messages_stamped(skip_empty=True) == ([], [])
+
+    port.device.chunks.append(b'\ne\n')
+    reader.read()
+    assert reader.get_message_stamped() == ('d', reader.last_read)
+    assert reader.get_message_stamped() == ('e', reader.last_read)
+    assert reader.backlog == 0
+
+
+def test_arrival_stamps_overflow():
+    port = ChunkPort()
+    reader = SerialReader(port, buffer_size=64)
+    # 50 unterminated bytes, then a message pushing them partly out of the buffer
+    port.device.chunks.append(b'x' * 50)
+    reader.read()
+    port.device.chunks.append(b'y' * 40 + b'\n')
+    reader.read()
+    msgs, stamps = reader.get_messages_stamped()
+    assert msgs == ['x' * 23 + 'y' * 40]
+    assert stamps == [reader.last_read]
+    assert reader.overflow == 27
+
+
+if __name__ == '__main__':
+    test_take_and_find()
+    test_wraparound()
+    test_overflow()
+    test_arrival_stamps()
+    test_arrival_stamps_overflow()
+    print('OK')
@@ -0,0 +1,67 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from deps import *
+
+HOME = GeoCoordinate(32.940366, -106.921924, 1383.0)
+PAD = (32.949366, -106.921924, 1383.0)  # About 1 km north of home
+METERS_PER_DEGREE = 111_320.0
+
+
+def boost(t: float, pad_time: float = 10.0, accel: float = 100.0) -> np.ndarray:
+    climb = max(t - pad_time, 0.0)
+    return np.array([PAD[0], PAD[1], PAD[2] + 0.5 * accel * climb ** 2])
+
+
+def elevation(position) -> float:
+    return GeoPair(HOME, GeoCoordinate(*np.asarray(position).tolist())).elevation_approx
+
+
+def max_elevation_error(tracker: AlphaBetaFilter | None, seed: int, duration: float = 20.0,
+                        fix_rate: float = 2.0, command_rate: float = 50.0, noise: float = 3.0) -> float:
+    """
+    Worst elevation error pointing at the prediction (or the latest fix without filter) on the command clock
+
+    :return: Maximum error in degrees
+    """
+    rng = np.random.default_rng(seed)
+    scale = np.array([METERS_PER_DEGREE, METERS_PER_DEGREE, 1.0])
+    fixes = np.arange(0.0, duration, 1.0 / fix_rate)
+    latest = None
+    error = 0.0
+    i = 0
+    for t in np.arange(0.0, duration, 1.0 / command_rate):
+        while i < len(fixes) and fixes[i] <= t:
+            latest = boost(fixes[i]) + rng.normal(0.0, noise, 3) / scale
+            if tracker is not None:
+                tracker.update(fixes[i], latest)
+            i += 1
+        pointed = latest if tracker is None else tracker.predict(t)
+        error = max(error, abs(elevation(pointed) - elevation(boost(t))))
+    return error
+
+
+def test_boost_beats_hold():
+    for seed in range(5):
+        hold = max_elevation_error(None, seed)
+        filtered = max_elevation_error(AlphaBetaFilter(), seed)
+        assert filtered < 0.6 * hold, (seed, filtered, hold)
+
+
+def test_constant_velocity():
+    tracker = AlphaBetaFilter()
+    for k in range(20):
+        tracker.update(k * 0.5, (0.0, 0.0, 100.0 * k * 0.5))
+    assert np.allclose(tracker.velocity, (0.0, 0.0, 100.0))
+    assert np.allclose(tracker.predict(10.0), (0.0, 0.0, 1000.0))
+    # Held beyond the prediction horizon
+    assert np.allclose(tracker.predict(60.0), tracker.predict(9.5 + tracker.max_extrapolation))
+
+
+if __name__ == '__main__':
+    test_boost_beats_hold()
+    test_constant_velocity()
+    print('OK')